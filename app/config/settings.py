@@ -1,16 +1,86 @@
 from decouple import config
 
 class Settings:
-    # API Keys
-    GEMINI_API_KEY: str = config("GEMINI_API_KEY")
+    # API Keys (only required once the LLM is called)
+    GEMINI_API_KEY: str = config("GEMINI_API_KEY", default="")
     
     # Server configuration
     HOST: str = config("HOST", default="localhost")
     PORT: int = config("PORT", default=8000, cast=int)
     DEBUG: bool = config("DEBUG", default=True, cast=bool)
     
+    # Production server (serve.py: prefork workers sharing preloaded state)
+    SERVER_WORKERS: int = config("SERVER_WORKERS", default=0, cast=int)  # 0 = one per CPU
+    SERVER_LOOP: str = config("SERVER_LOOP", default="auto")  # auto | asyncio | uvloop
+    SERVER_HTTP: str = config("SERVER_HTTP", default="auto")  # auto | h11 | httptools
+    SERVER_BACKLOG: int = config("SERVER_BACKLOG", default=2048, cast=int)
+    SERVER_GRACEFUL_TIMEOUT: int = config("SERVER_GRACEFUL_TIMEOUT", default=30, cast=int)
+    
     # Model configuration
     MAX_INPUT_LENGTH: int = config("MAX_INPUT_LENGTH", default=10000, cast=int)
     TIMEOUT_SECONDS: int = config("TIMEOUT_SECONDS", default=30, cast=int)
+    LLM_MAX_CONCURRENCY: int = config("LLM_MAX_CONCURRENCY", default=8, cast=int)
+    # Gemini REST endpoint (e.g. http://127.0.0.1:9100 for loadtest/fake_llm.py); empty = google-generativeai SDK
+    LLM_BASE_URL: str = config("LLM_BASE_URL", default="")
+    
+    # Model routing (fast model by default, strong model on long inputs or failed validation)
+    LLM_FAST_MODEL: str = config("LLM_FAST_MODEL", default="gemini-2.5-flash")
+    LLM_STRONG_MODEL: str = config("LLM_STRONG_MODEL", default="gemini-2.5-pro")
+    LLM_LATENCY_SLO_SECONDS: float = config("LLM_LATENCY_SLO_SECONDS", default=10.0, cast=float)
+    LLM_ROUTER_LONG_INPUT_CHARS: int = config("LLM_ROUTER_LONG_INPUT_CHARS", default=2000, cast=int)
+    LLM_ROUTER_WINDOW: int = config("LLM_ROUTER_WINDOW", default=100, cast=int)
+    # Latency samples older than this are ignored (0 = never expire)
+    LLM_ROUTER_SAMPLE_MAX_AGE_SECONDS: float = config("LLM_ROUTER_SAMPLE_MAX_AGE_SECONDS", default=300.0, cast=float)
+    # One of every N requests diverted to the strong model probes the fast one (0 = no probes)
+    LLM_ROUTER_PROBE_EVERY: int = config("LLM_ROUTER_PROBE_EVERY", default=20, cast=int)
+    LLM_REPAIR_MAX_ATTEMPTS: int = config("LLM_REPAIR_MAX_ATTEMPTS", default=2, cast=int)
+    
+    # Micro-batching of LLM calls (several descriptions per prompt)
+    LLM_BATCH_ENABLED: bool = config("LLM_BATCH_ENABLED", default=False, cast=bool)
+    LLM_BATCH_WINDOW_MS: int = config("LLM_BATCH_WINDOW_MS", default=50, cast=int)
+    LLM_BATCH_MAX_ITEMS: int = config("LLM_BATCH_MAX_ITEMS", default=20, cast=int)
+    LLM_BATCH_MAX_RESENDS: int = config("LLM_BATCH_MAX_RESENDS", default=1, cast=int)
+    
+    # Circuit breaker (fail fast and degrade while the LLM is down or slow)
+    LLM_BREAKER_ENABLED: bool = config("LLM_BREAKER_ENABLED", default=True, cast=bool)
+    LLM_BREAKER_WINDOW: int = config("LLM_BREAKER_WINDOW", default=20, cast=int)
+    LLM_BREAKER_MIN_CALLS: int = config("LLM_BREAKER_MIN_CALLS", default=5, cast=int)
+    LLM_BREAKER_FAILURE_RATE: float = config("LLM_BREAKER_FAILURE_RATE", default=0.5, cast=float)
+    LLM_BREAKER_SLOW_CALL_SECONDS: float = config("LLM_BREAKER_SLOW_CALL_SECONDS", default=20.0, cast=float)
+    LLM_BREAKER_SLOW_CALL_RATE: float = config("LLM_BREAKER_SLOW_CALL_RATE", default=0.8, cast=float)
+    LLM_BREAKER_OPEN_SECONDS: float = config("LLM_BREAKER_OPEN_SECONDS", default=30.0, cast=float)
+    
+    # Parsing executor configuration
+    PARSE_WORKERS: int = config("PARSE_WORKERS", default=4, cast=int)
+    PARSE_QUEUE_DEPTH: int = config("PARSE_QUEUE_DEPTH", default=32, cast=int)
+    PARSE_RETRY_AFTER_SECONDS: int = config("PARSE_RETRY_AFTER_SECONDS", default=1, cast=int)
+    PARSE_CACHE_SIZE: int = config("PARSE_CACHE_SIZE", default=1024, cast=int)
+    # Languages whose frontend pool is built in the background at startup (e.g. "pseudocode,python")
+    FRONTEND_WARMUP: str = config("FRONTEND_WARMUP", default="")
+    
+    # Data directory (persistent caches)
+    DATA_DIR: str = config("DATA_DIR", default="data")
+    
+    # LLM response cache
+    LLM_CACHE_ENABLED: bool = config("LLM_CACHE_ENABLED", default=True, cast=bool)
+    LLM_CACHE_TTL_SECONDS: int = config("LLM_CACHE_TTL_SECONDS", default=7 * 24 * 3600, cast=int)
+    LLM_CACHE_MAX_ENTRIES: int = config("LLM_CACHE_MAX_ENTRIES", default=10000, cast=int)
+    
+    # Local algorithm templates (answered without calling the LLM)
+    TEMPLATES_ENABLED: bool = config("TEMPLATES_ENABLED", default=True, cast=bool)
+    TEMPLATE_MIN_SCORE: float = config("TEMPLATE_MIN_SCORE", default=0.65, cast=float)
+    # Share of the request's IDF weight that the matched phrase must contain
+    TEMPLATE_MIN_COVERAGE: float = config("TEMPLATE_MIN_COVERAGE", default=0.6, cast=float)
+    # POST /templates (runtime templates persisted in DATA_DIR); admin only
+    TEMPLATES_ADMIN_ENABLED: bool = config("TEMPLATES_ADMIN_ENABLED", default=False, cast=bool)
+    
+    # Per-request profiling (?profile=1 and /admin/memory-profile); admin only
+    PROFILING_ENABLED: bool = config("PROFILING_ENABLED", default=False, cast=bool)
+    PROFILE_TOP_N: int = config("PROFILE_TOP_N", default=25, cast=int)
+    
+    # Batch configuration
+    BATCH_CONCURRENCY: int = config("BATCH_CONCURRENCY", default=8, cast=int)
+    # Pending parse jobs above which batch items wait (kept below the executor capacity)
+    BATCH_MAX_PENDING: int = config("BATCH_MAX_PENDING", default=16, cast=int)
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -1,13 +1,32 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+import json
 import logging
+import os
+import tempfile
 from pathlib import Path
 import datetime
+import math
+import time
 from typing import Optional, Literal
 
-from app.services.gemini_service import gemini_service
-from app.models.schemas import InputRequest, PseudocodeResponse, InputType
-from app.services.ast_service import build_ast
+from app.config.settings import settings
+from app.core.metrics import stage_seconds
+from app.services.gemini_service import gemini_service, LLMTimeoutError
+from app.services.circuit_breaker import CircuitOpenError
+from app.models.schemas import InputRequest, PseudocodeResponse, InputType, AlgorithmTemplate
+from app.services.ast_service import (
+    build_ast, analyze_complexity, frontend_stats, parse_cache, parse_program, transpile_pseudocode,
+    python_to_pseudocode
+)
+from app.services.input_detector import detect_input_type
+from app.services.pipeline_service import run_pipeline
+from app.services.llm_cache import llm_cache
+from app.services.template_service import template_library
+from app.services.batch_service import stream_batch, iter_json_items, iter_ndjson_lines
+from app.services.parse_executor import parse_executor, QueueFullError
+from app.services.profiler import RequestProfile, memory_profile
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +40,18 @@ async def health_check():
     return {
         "status": "healthy",
         "service": "Analizador de Complejidades",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "worker_pid": os.getpid(),
+        "caches": {
+            "parse": parse_cache.stats(),
+            "llm": llm_cache.stats()
+        },
+        "frontends": frontend_stats(),
+        "llm_router": gemini_service.router.stats(),
+        "llm_repair": gemini_service.repair_stats(),
+        "llm_breaker": gemini_service.breaker_stats(),
+        "llm_batch": gemini_service.batch_stats(),
+        "templates": template_library.stats()
     }
 
 
@@ -30,6 +60,38 @@ class GenerateRequest(BaseModel):
     filename: Optional[str] = None
 
 
+SAVE_DIR = Path("docs/ejemplos/algoritmos_guardados")
+
+
+def _save_path(filename: Optional[str]) -> Path:
+    """Ruta del archivo a guardar: nombre dado o alg_<timestamp>, siempre .py"""
+    save_dir = SAVE_DIR.resolve()
+    save_dir.mkdir(parents=True, exist_ok=True)
+
+    timestamp = datetime.datetime.utcnow().strftime("%Y%m%d%H%M%S")
+    base_name = filename.strip() if filename else f"alg_{timestamp}"
+    # Asegurar extensión .py
+    if not base_name.endswith('.py'):
+        base_name = f"{base_name}.py"
+
+    return save_dir / base_name
+
+
+def _prompt_comment(description: str) -> str:
+    """El prompt original como comentario al inicio del archivo"""
+    return "# Prompt:\n" + "# " + description.replace("\n", "\n# ") + "\n\n"
+
+
+def _llm_unavailable(e: CircuitOpenError) -> HTTPException:
+    """503 mientras el circuito del LLM está abierto y no hay respuesta local"""
+    logger.warning(f"LLM no disponible: {e}")
+    return HTTPException(
+        status_code=503,
+        detail=f"llm_unavailable: {str(e)}",
+        headers={"Retry-After": str(math.ceil(e.retry_after))}
+    )
+
+
 @router.post("/generate")
 async def generate_and_save(req: GenerateRequest):
     """Recibe una descripción en lenguaje natural, pide a Gemini el código Python y lo guarda.
@@ -41,26 +103,20 @@ async def generate_and_save(req: GenerateRequest):
 
     try:
         code = await gemini_service.generate_python_code(req.description)
+    except CircuitOpenError as e:
+        raise _llm_unavailable(e)
+    except LLMTimeoutError as e:
+        logger.error(f"Timeout llamando a Gemini: {e}")
+        raise HTTPException(status_code=504, detail=f"llm_timeout: {str(e)}")
     except Exception as e:
         logger.error(f"Error llamando a Gemini: {e}")
         raise HTTPException(status_code=500, detail=f"Error generando código: {str(e)}")
 
     # Guardar el prompt y el código en un archivo dentro de docs/ejemplos/algoritmos_guardados/
-    save_dir = Path("docs/ejemplos/algoritmos_guardados").resolve()
-    save_dir.mkdir(parents=True, exist_ok=True)
-
-    timestamp = datetime.datetime.utcnow().strftime("%Y%m%d%H%M%S")
-    base_name = req.filename.strip() if req.filename else f"alg_{timestamp}"
-    # Asegurar extensión .py
-    if not base_name.endswith('.py'):
-        base_name = f"{base_name}.py"
-
-    file_path = save_dir / base_name
-
-    # Preparamos el contenido con el prompt como comentario al inicio
-    prompt_comment = "# Prompt:\n" + "# " + req.description.replace("\n", "\n# ") + "\n\n"
+    file_path = _save_path(req.filename)
     try:
-        file_path.write_text(prompt_comment + code, encoding="utf-8")
+        with stage_seconds.time(stage="file_write", lang="python"):
+            file_path.write_text(_prompt_comment(req.description) + code, encoding="utf-8")
     except Exception as e:
         logger.error(f"Error guardando archivo {file_path}: {e}")
         raise HTTPException(status_code=500, detail=f"Error guardando archivo: {str(e)}")
@@ -68,6 +124,23 @@ async def generate_and_save(req: GenerateRequest):
     return {"saved_path": str(file_path), "code": code}
 
 
+async def _run_local(fn, *args):
+    """Trabajo local en el executor de parsing, o None si el contenido no se puede procesar"""
+    try:
+        execution = await parse_executor.run(fn, *args)
+    except QueueFullError as e:
+        logger.warning(f"Parse queue full: {e}")
+        raise HTTPException(
+            status_code=429,
+            detail="server_busy: parse queue is full",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except Exception as e:
+        logger.info(f"El contenido no se pudo procesar localmente: {e}")
+        return None
+    return execution.value
+
+
 @router.post("/normalize", response_model=PseudocodeResponse)
 async def normalize_to_pseudocode(req: InputRequest):
     """
@@ -75,21 +148,54 @@ async def normalize_to_pseudocode(req: InputRequest):
     
     Este endpoint recibe una descripción en lenguaje natural y utiliza Gemini
     para generar pseudocódigo estructurado siguiendo la gramática del proyecto.
+    Sin input_type, el tipo se detecta: el pseudocódigo válido se devuelve tal
+    cual y el código Python se traduce localmente desde el IR.
     """
     if not req.content or not req.content.strip():
         raise HTTPException(status_code=400, detail="'content' es requerido y no puede estar vacío")
 
+    input_type = req.input_type or detect_input_type(req.content)
+
+    if input_type == InputType.PSEUDOCODE:
+        # Ya es pseudocódigo del proyecto: basta con comprobar que parsea
+        if await _run_local(parse_program, req.content, "pseudocode") is not None:
+            return PseudocodeResponse(
+                original_content=req.content,
+                normalized_pseudocode=req.content,
+                input_type_detected=InputType.PSEUDOCODE,
+                is_valid_pseudocode=True,
+                correction_applied=False
+            )
+
+    if input_type == InputType.PYTHON:
+        # Código Python: traducción determinista desde el IR, sin llamar a Gemini
+        pseudocode = await _run_local(python_to_pseudocode, req.content)
+        if pseudocode is not None:
+            return PseudocodeResponse(
+                original_content=req.content,
+                normalized_pseudocode=pseudocode,
+                input_type_detected=InputType.PYTHON,
+                is_valid_pseudocode=True,
+                correction_applied=False
+            )
+
     try:
-        # Normalizar a pseudocódigo usando Gemini
-        normalized = await gemini_service.normalize_to_pseudocode(req.content)
+        # Normalizar a pseudocódigo usando Gemini; el resultado se valida con el parser
+        result = await gemini_service.normalize_validated(req.content)
         
         return PseudocodeResponse(
             original_content=req.content,
-            normalized_pseudocode=normalized,
-            input_type_detected=InputType.NATURAL_LANGUAGE,
-            is_valid_pseudocode=True,
-            correction_applied=True
+            normalized_pseudocode=result.text,
+            input_type_detected=input_type,
+            is_valid_pseudocode=result.error is None,
+            correction_applied=result.repairs > 0,
+            degraded=result.degraded
         )
+    except CircuitOpenError as e:
+        raise _llm_unavailable(e)
+    except LLMTimeoutError as e:
+        logger.error(f"Timeout normalizando con Gemini: {e}")
+        raise HTTPException(status_code=504, detail=f"llm_timeout: {str(e)}")
     except Exception as e:
         logger.error(f"Error normalizando con Gemini: {e}")
         raise HTTPException(status_code=500, detail=f"Error normalizando: {str(e)}")
@@ -101,24 +207,238 @@ async def generate_code(req: InputRequest):
     Genera código Python a partir de una descripción en lenguaje natural o pseudocódigo.
     
     Este endpoint recibe una descripción y retorna código Python implementable.
-    Útil para obtener solo el código sin guardarlo.
+    Útil para obtener solo el código sin guardarlo. Sin input_type, el tipo se
+    detecta: el pseudocódigo válido se traduce localmente y el código Python
+    válido se devuelve tal cual.
     """
     if not req.content or not req.content.strip():
         raise HTTPException(status_code=400, detail="'content' es requerido y no puede estar vacío")
 
+    input_type = req.input_type or detect_input_type(req.content)
+
+    if input_type == InputType.PSEUDOCODE:
+        # Pseudocódigo válido: traducción determinista, sin llamar a Gemini
+        code = await _run_local(transpile_pseudocode, req.content)
+        if code is not None:
+            return {
+                "description": req.content,
+                "generated_code": code,
+                "language": "python",
+                "source": "transpiler"
+            }
+
+    if input_type == InputType.PYTHON:
+        if await _run_local(parse_program, req.content, "python") is not None:
+            return {
+                "description": req.content,
+                "generated_code": req.content,
+                "language": "python",
+                "source": "input"
+            }
+
     try:
-        code = await gemini_service.generate_python_code(req.content)
+        result = await gemini_service.generate_python_validated(req.content)
         
         return {
             "description": req.content,
-            "generated_code": code,
-            "language": "python"
+            "generated_code": result.text,
+            "language": "python",
+            "source": "llm",
+            "degraded": result.degraded
         }
+    except CircuitOpenError as e:
+        raise _llm_unavailable(e)
+    except LLMTimeoutError as e:
+        logger.error(f"Timeout generando código con Gemini: {e}")
+        raise HTTPException(status_code=504, detail=f"llm_timeout: {str(e)}")
     except Exception as e:
         logger.error(f"Error generando código con Gemini: {e}")
         raise HTTPException(status_code=500, detail=f"Error generando código: {str(e)}")
 
 
+def _request_profile(profile: bool) -> Optional[RequestProfile]:
+    """Perfil de la petición si se pidió ?profile=1 y está habilitado"""
+    if not profile:
+        return None
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=403, detail="profiling_disabled: set PROFILING_ENABLED=true")
+    return RequestProfile(settings.PROFILE_TOP_N)
+
+
+PROFILE_QUERY = Query(False, description="Incluir desglose por etapa y cProfile (requiere PROFILING_ENABLED)")
+
+
+@router.post("/analyze")
+async def analyze(req: InputRequest, profile: bool = PROFILE_QUERY):
+    """
+    Pipeline completo en una sola petición: pseudocódigo, Python y, para cada
+    uno, AST y complejidad.
+    
+    Las dos cadenas (pseudocódigo → análisis y Python → análisis) corren
+    concurrentemente. Cada etapa devuelve su estado, su inicio relativo a la
+    petición (started_ms) y su duración (elapsed_ms); un fallo en una etapa no
+    impide devolver las demás.
+    """
+    if not req.content or not req.content.strip():
+        raise HTTPException(status_code=400, detail="'content' es requerido y no puede estar vacío")
+    
+    return await run_pipeline(req.content, req.input_type, _request_profile(profile))
+
+
+# ============================================================================
+# PLANTILLAS LOCALES
+# ============================================================================
+
+@router.get("/templates")
+async def list_templates():
+    """Plantillas de algoritmos que se responden sin llamar a Gemini"""
+    return {
+        "templates": [t.model_dump() for t in template_library.list()],
+        "min_score": template_library.min_score,
+        "min_coverage": template_library.min_coverage
+    }
+
+
+@router.post("/templates", status_code=201)
+async def add_template(template: AlgorithmTemplate):
+    """
+    Añade una plantilla en tiempo de ejecución.
+    
+    El pseudocódigo y el Python deben pasar los parsers del proyecto; la
+    plantilla queda indexada de inmediato y se persiste en DATA_DIR.
+    
+    Errors:
+        400: Algún código no parsea
+        403: TEMPLATES_ADMIN_ENABLED desactivado
+        409: Ya existe una plantilla con ese id
+    """
+    if not settings.TEMPLATES_ADMIN_ENABLED:
+        raise HTTPException(status_code=403, detail="templates_admin_disabled: set TEMPLATES_ADMIN_ENABLED=true")
+    if any(t.id == template.id for t in template_library.list()):
+        raise HTTPException(status_code=409, detail=f"Ya existe una plantilla con id '{template.id}'")
+    try:
+        template_library.add(template)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"id": template.id, "templates": len(template_library.list())}
+
+
+# ============================================================================
+# STREAMING (Server-Sent Events)
+# ============================================================================
+
+SSE_MEDIA_TYPE = "text/event-stream"
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def _sse(event: str, data: dict) -> str:
+    """Formatea un evento SSE; data va en JSON para conservar saltos de línea"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _sse_error(e: Exception) -> str:
+    if isinstance(e, CircuitOpenError):
+        logger.warning(f"LLM no disponible en streaming: {e}")
+        return _sse("error", {"status": 503, "detail": f"llm_unavailable: {str(e)}"})
+    if isinstance(e, LLMTimeoutError):
+        logger.error(f"Timeout en streaming con Gemini: {e}")
+        return _sse("error", {"status": 504, "detail": f"llm_timeout: {str(e)}"})
+    logger.error(f"Error en streaming con Gemini: {e}")
+    return _sse("error", {"status": 500, "detail": f"Error en streaming: {str(e)}"})
+
+
+async def _relay(chunks):
+    """Reenvía cada fragmento como evento 'chunk' y cierra con 'done'"""
+    parts = []
+    try:
+        async for chunk in chunks:
+            parts.append(chunk)
+            yield _sse("chunk", {"text": chunk})
+        yield _sse("done", {"text": "".join(parts)})
+    except Exception as e:
+        yield _sse_error(e)
+
+
+@router.post("/normalize/stream")
+async def normalize_stream(req: InputRequest):
+    """
+    Variante en streaming de /normalize.
+    
+    Emite eventos SSE: 'chunk' con cada fragmento que produce Gemini, 'done'
+    con el pseudocódigo completo o 'error' si la generación falla.
+    """
+    if not req.content or not req.content.strip():
+        raise HTTPException(status_code=400, detail="'content' es requerido y no puede estar vacío")
+    
+    chunks = gemini_service.stream_normalize_to_pseudocode(req.content)
+    return StreamingResponse(_relay(chunks), media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
+
+
+@router.post("/generate-code/stream")
+async def generate_code_stream(req: InputRequest):
+    """Variante en streaming de /generate-code (mismos eventos que /normalize/stream)"""
+    if not req.content or not req.content.strip():
+        raise HTTPException(status_code=400, detail="'content' es requerido y no puede estar vacío")
+    
+    chunks = gemini_service.stream_python_code(req.content)
+    return StreamingResponse(_relay(chunks), media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
+
+
+@router.post("/generate/stream")
+async def generate_and_save_stream(req: GenerateRequest):
+    """
+    Variante en streaming de /generate.
+    
+    El archivo se escribe de forma incremental a medida que llegan los
+    fragmentos, en un temporal del mismo directorio que sólo se renombra a su
+    nombre final al terminar: un error o una desconexión no dejan archivos a
+    medias. El evento 'done' incluye la ruta guardada y el código completo.
+    """
+    if not req.description or not req.description.strip():
+        raise HTTPException(status_code=400, detail="'description' es requerido y no puede estar vacío")
+    
+    file_path = _save_path(req.filename)
+    
+    async def events():
+        parts = []
+        # Sólo el tiempo de escritura, sin la espera por los fragmentos del LLM
+        write_seconds = 0.0
+        tmp_path = None
+        try:
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp", delete=False
+            ) as f:
+                tmp_path = Path(f.name)
+                f.write(_prompt_comment(req.description))
+                async for chunk in gemini_service.stream_python_code(req.description):
+                    # Igual que /generate: sin espacios iniciales en el código
+                    if not parts:
+                        chunk = chunk.lstrip()
+                        if not chunk:
+                            continue
+                    parts.append(chunk)
+                    started = time.perf_counter()
+                    f.write(chunk)
+                    f.flush()
+                    write_seconds += time.perf_counter() - started
+                    yield _sse("chunk", {"text": chunk})
+            os.replace(tmp_path, file_path)
+            tmp_path = None
+            stage_seconds.observe(write_seconds, stage="file_write", lang="python")
+            yield _sse("done", {"saved_path": str(file_path), "code": "".join(parts).rstrip()})
+        except OSError as e:
+            logger.error(f"Error guardando archivo {file_path}: {e}")
+            yield _sse("error", {"status": 500, "detail": f"Error guardando archivo: {str(e)}"})
+        except Exception as e:
+            yield _sse_error(e)
+        finally:
+            # Error o cliente desconectado antes de 'done'
+            if tmp_path is not None:
+                tmp_path.unlink(missing_ok=True)
+    
+    return StreamingResponse(events(), media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
+
+
 # ============================================================================
 # NUEVO ENDPOINT: AST
 # ============================================================================
@@ -129,8 +449,14 @@ class ASTRequest(BaseModel):
     from_lang: Literal["python", "pseudocode"] = "python"
 
 
+def _with_profile(response: dict, request_profile: Optional[RequestProfile]) -> dict:
+    if request_profile is not None:
+        response["profile"] = request_profile.report()
+    return response
+
+
 @router.post("/ast")
-async def build_ast_endpoint(req: ASTRequest):
+async def build_ast_endpoint(req: ASTRequest, profile: bool = PROFILE_QUERY):
     """
     Construye un AST (Representación Intermedia) desde código Python o pseudocódigo.
     
@@ -139,20 +465,37 @@ async def build_ast_endpoint(req: ASTRequest):
     Args:
         content: Código fuente (Python o pseudocódigo)
         from_lang: Lenguaje fuente ("python" o "pseudocode")
+        profile: Con ?profile=1 añade "profile" con etapas y cProfile
         
     Returns:
-        JSON con el AST en formato IR
+        JSON con el AST en formato IR y los tiempos de cola y de proceso
         
     Errors:
         400: Sintaxis no soportada o from_lang inválido
+        403: ?profile=1 sin PROFILING_ENABLED
+        429: Cola de parsing llena (incluye cabecera Retry-After)
         500: Error interno
     """
     if not req.content or not req.content.strip():
         raise HTTPException(status_code=400, detail="'content' es requerido y no puede estar vacío")
     
+    request_profile = _request_profile(profile)
     try:
-        ast_dict = build_ast(req.content, req.from_lang)
-        return {"ast": ast_dict}
+        # El parsing es CPU-bound: se ejecuta fuera del event loop
+        if request_profile is None:
+            execution = await parse_executor.run(build_ast, req.content, req.from_lang)
+        else:
+            execution = await parse_executor.run(request_profile.wrap(build_ast), req.content, req.from_lang, True)
+        return _with_profile({"ast": execution.value, "timing": execution.timings()}, request_profile)
+    
+    except QueueFullError as e:
+        # Backpressure: fallar rápido en lugar de acumular trabajo
+        logger.warning(f"Parse queue full: {e}")
+        raise HTTPException(
+            status_code=429,
+            detail="server_busy: parse queue is full",
+            headers={"Retry-After": str(e.retry_after)}
+        )
     
     except ValueError as e:
         # from_lang inválido
@@ -181,4 +524,179 @@ async def build_ast_endpoint(req: ASTRequest):
         raise HTTPException(
             status_code=500,
             detail=f"internal_error: An unexpected error occurred"
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/complexity")
+async def complexity_endpoint(req: ASTRequest, profile: bool = PROFILE_QUERY):
+    """
+    Calcula la complejidad simbólica de cada función del código fuente.
+    
+    Errors:
+        400: Sintaxis no soportada o from_lang inválido
+        403: ?profile=1 sin PROFILING_ENABLED
+        429: Cola de parsing llena (incluye cabecera Retry-After)
+        500: Error interno
+    """
+    if not req.content or not req.content.strip():
+        raise HTTPException(status_code=400, detail="'content' es requerido y no puede estar vacío")
+    
+    request_profile = _request_profile(profile)
+    try:
+        if request_profile is None:
+            execution = await parse_executor.run(analyze_complexity, req.content, req.from_lang)
+        else:
+            execution = await parse_executor.run(
+                request_profile.wrap(analyze_complexity), req.content, req.from_lang, True
+            )
+        return _with_profile({"analysis": execution.value, "timing": execution.timings()}, request_profile)
+    
+    except QueueFullError as e:
+        logger.warning(f"Parse queue full: {e}")
+        raise HTTPException(
+            status_code=429,
+            detail="server_busy: parse queue is full",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    except NotImplementedError as e:
+        raise HTTPException(status_code=400, detail=f"unsupported_syntax: {str(e)}")
+    
+    except SyntaxError as e:
+        raise HTTPException(status_code=400, detail=f"syntax_error: {str(e)}")
+    
+    except Exception as e:
+        logger.error(f"Internal error analyzing complexity: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="internal_error: An unexpected error occurred")
+
+
+# ============================================================================
+# ADMINISTRACIÓN: PERFIL DE MEMORIA
+# ============================================================================
+
+class MemoryProfileRequest(ASTRequest):
+    """Request para el perfil de memoria de build_ast"""
+    analysis: bool = False
+
+
+@router.post("/admin/memory-profile")
+async def memory_profile_endpoint(req: MemoryProfileRequest):
+    """
+    Memoria que asigna cada etapa de build_ast (parse, ir_transform, to_dict y,
+    con analysis, complexity) para un código, medida con tracemalloc.
+    
+    Devuelve por etapa los bytes asignados, el pico y los sitios de asignación
+    por archivo y línea, más el pico total y el número de nodos del árbol del
+    parser, del IR y de los diccionarios de to_dict.
+    
+    Errors:
+        400: Sintaxis no soportada o from_lang inválido
+        403: PROFILING_ENABLED desactivado
+        429: Cola de parsing llena (incluye cabecera Retry-After)
+    """
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=403, detail="profiling_disabled: set PROFILING_ENABLED=true")
+    if not req.content or not req.content.strip():
+        raise HTTPException(status_code=400, detail="'content' es requerido y no puede estar vacío")
+    
+    try:
+        execution = await parse_executor.run(
+            memory_profile, req.content, req.from_lang, req.analysis, settings.PROFILE_TOP_N
+        )
+        return {"memory": execution.value, "timing": execution.timings()}
+    
+    except QueueFullError as e:
+        logger.warning(f"Parse queue full: {e}")
+        raise HTTPException(
+            status_code=429,
+            detail="server_busy: parse queue is full",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    except NotImplementedError as e:
+        raise HTTPException(status_code=400, detail=f"unsupported_syntax: {str(e)}")
+    
+    except SyntaxError as e:
+        raise HTTPException(status_code=400, detail=f"syntax_error: {str(e)}")
+    
+    except Exception as e:
+        logger.error(f"Internal error profiling memory: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="internal_error: An unexpected error occurred")
+
+
+# ============================================================================
+# PROCESAMIENTO POR LOTES (NDJSON)
+# ============================================================================
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Por encima de este tamaño el cuerpo NDJSON se vuelca a disco
+NDJSON_SPOOL_BYTES = 1024 * 1024
+
+
+async def _batch_items(request: Request):
+    """
+    Obtiene los ítems del lote desde una lista JSON o un cuerpo NDJSON.
+
+    El cuerpo NDJSON se copia a un archivo temporal antes de responder: la
+    respuesta en streaming también consume el canal de entrada, así que no se
+    pueden leer ambos a la vez. Los ítems luego se leen línea por línea.
+    """
+    content_type = request.headers.get("content-type", "")
+    
+    if content_type.startswith(NDJSON_MEDIA_TYPE):
+        spool = tempfile.SpooledTemporaryFile(max_size=NDJSON_SPOOL_BYTES)
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        
+        async def items():
+            try:
+                async for item in iter_ndjson_lines(spool):
+                    yield item
+            finally:
+                spool.close()
+        
+        return items()
+    
+    try:
+        body = await request.json()
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="El cuerpo debe ser una lista JSON o NDJSON")
+    
+    if isinstance(body, dict):
+        body = body.get("items")
+    if not isinstance(body, list):
+        raise HTTPException(status_code=400, detail="El cuerpo debe ser una lista JSON de ítems {id, content, from_lang}")
+    
+    return iter_json_items(body)
+
+
+@router.post("/ast/batch")
+async def build_ast_batch(request: Request):
+    """
+    Construye el AST de muchos fragmentos en una sola petición.
+    
+    Acepta una lista JSON (o {"items": [...]}) o un cuerpo NDJSON
+    (Content-Type: application/x-ndjson) con ítems {id, content, from_lang}.
+    Los resultados se devuelven como NDJSON en orden de finalización, una línea
+    por ítem: {id, ok, ast, timing} o {id, ok: false, error}.
+    """
+    items = await _batch_items(request)
+    return StreamingResponse(stream_batch(items, build_ast, "ast"), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.post("/complexity/batch")
+async def complexity_batch(request: Request):
+    """
+    Equivalente por lotes de /complexity, con el mismo formato de entrada y
+    salida que /ast/batch (el resultado va bajo la clave "analysis").
+    """
+    items = await _batch_items(request)
+    return StreamingResponse(stream_batch(items, analyze_complexity, "analysis"), media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,72 @@
+"""
+Endpoint /metrics en formato de texto de Prometheus.
+
+Los histogramas se acumulan en app.core.metrics; los valores instantáneos
+(cachés, colas, llamadas en vuelo) se leen de los servicios en cada scrape.
+"""
+from typing import Dict, List, Tuple
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import HISTOGRAMS, render_gauges
+from app.services.ast_service import frontend_stats, parse_cache
+from app.services.gemini_service import gemini_service
+from app.services.llm_cache import llm_cache
+from app.services.parse_executor import parse_executor
+from app.services.template_service import template_library
+
+router = APIRouter(tags=["metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+BREAKER_STATES = ("closed", "open", "half_open")
+
+
+def _cache_samples() -> Tuple[List, List]:
+    caches: Dict[str, Dict] = {
+        "parse": parse_cache.stats(),
+        "llm": llm_cache.stats(),
+        "templates": template_library.stats()
+    }
+    requests = []
+    ratios = []
+    for name, stats in caches.items():
+        requests.append(({"cache": name, "result": "hit"}, stats["hits"]))
+        requests.append(({"cache": name, "result": "miss"}, stats["misses"]))
+        ratios.append(({"cache": name}, stats["hit_ratio"]))
+    return requests, ratios
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for histogram in HISTOGRAMS:
+        lines += histogram.render()
+
+    requests, ratios = _cache_samples()
+    lines += render_gauges("analyzer_cache_requests_total", "Consultas a cada caché por resultado", requests, "counter")
+    lines += render_gauges("analyzer_cache_hit_ratio", "Proporción de aciertos de cada caché", ratios)
+    lines += render_gauges("analyzer_parse_cache_entries", "Programas IR en la caché de parsing",
+                           [({}, parse_cache.stats()["size"])])
+
+    lines += render_gauges("analyzer_parse_queue_depth", "Trabajos de parsing admitidos por estado", [
+        ({"state": "queued"}, parse_executor.queued),
+        ({"state": "running"}, parse_executor.pending - parse_executor.queued)
+    ])
+    lines += render_gauges("analyzer_frontend_idle_builders", "Parsers libres en el pool de cada lenguaje",
+                           [({"lang": name}, stats["idle"]) for name, stats in frontend_stats().items()])
+
+    lines += render_gauges("analyzer_llm_inflight_calls", "Llamadas al LLM en curso",
+                           [({}, gemini_service.inflight_calls)])
+    state = gemini_service.breaker.state
+    lines += render_gauges("analyzer_llm_breaker_state", "Estado del circuit breaker del LLM (1 = actual)",
+                           [({"state": name}, 1 if name == state else 0) for name in BREAKER_STATES])
+    lines += render_gauges("analyzer_llm_coalesced_calls_total", "Llamadas al LLM resueltas por una petición compartida",
+                           [({}, gemini_service.coalesced_calls)], "counter")
+    return "\n".join(lines) + "\n"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Métricas del proceso en formato de texto de Prometheus"""
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
@@ -0,0 +1,193 @@
+"""
+Métricas en memoria con exposición en formato de texto de Prometheus.
+
+Sólo histogramas: los valores instantáneos (cachés, colas, llamadas en vuelo)
+se leen de cada servicio al servir /metrics, sin coste en el camino caliente.
+Observar una duración cuesta dos perf_counter, una búsqueda binaria y un lock
+sin contención (alrededor de un microsegundo).
+
+Las métricas son por proceso: con serve.py cada worker expone las suyas.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Cubren desde el parse de un fragmento (~0.1 ms) hasta una llamada lenta al LLM
+DEFAULT_BUCKETS = (
+    0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# Etapas observadas en el hilo actual mientras dura un trace_stages()
+_trace = threading.local()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + "}"
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Series:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * (buckets + 1)  # El último es +Inf
+        self.total = 0.0
+        self.count = 0
+
+
+class Histogram:
+    """Histograma con etiquetas; thread-safe"""
+
+    def __init__(self, name: str, documentation: str, buckets: Iterable[float] = DEFAULT_BUCKETS,
+                 traced: bool = False):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self.traced = traced  # Sus observaciones se anotan también en trace_stages()
+        self._series: Dict[LabelKey, _Series] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(len(self.buckets))
+            series.counts[index] += 1
+            series.total += value
+            series.count += 1
+        if self.traced:
+            stages = getattr(_trace, "stages", None)
+            if stages is not None:
+                stages.append((labels, value))
+
+    def time(self, **labels: str) -> "_Timer":
+        """with histogram.time(stage="x"): ... observa la duración del bloque"""
+        return _Timer(self, labels)
+
+    def snapshot(self, **labels: str) -> Optional[Dict]:
+        """count y sum de una serie (para tests y diagnóstico)"""
+        with self._lock:
+            series = self._series.get(tuple(sorted(labels.items())))
+            if series is None:
+                return None
+            return {"count": series.count, "sum": series.total}
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(key, list(series.counts), series.total, series.count) for key, series in self._series.items()]
+        for key, counts, total, count in sorted(items):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{format_labels(key, ('le', format_value(bound)))} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(key)} {format_value(total)}")
+            lines.append(f"{self.name}_count{format_labels(key)} {count}")
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+
+
+@contextmanager
+def trace_stages():
+    """
+    Anota en una lista las observaciones (etiquetas, segundos) de los
+    histogramas con traced=True hechas en este hilo mientras dura el bloque.
+    """
+    stages: List[Tuple[Dict[str, str], float]] = []
+    previous = getattr(_trace, "stages", None)
+    _trace.stages = stages
+    try:
+        yield stages
+    finally:
+        _trace.stages = previous
+
+
+def render_gauges(name: str, documentation: str, samples: Iterable[Tuple[Dict[str, str], float]],
+                  kind: str = "gauge") -> List[str]:
+    """Líneas de una métrica instantánea a partir de (etiquetas, valor)"""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{format_labels(tuple(sorted(labels.items())))} {format_value(value)}")
+    return lines
+
+
+# ============================================================================
+# HISTOGRAMAS GLOBALES
+# ============================================================================
+
+# Etapas: grammar_load, parse (Lark o ast.parse), ir_transform, to_dict, complexity, file_write
+stage_seconds = Histogram("analyzer_stage_seconds", "Duración de cada etapa del análisis por lenguaje", traced=True)
+llm_call_seconds = Histogram("analyzer_llm_call_seconds", "Duración de las llamadas al LLM por modelo y resultado")
+http_request_seconds = Histogram("analyzer_http_request_seconds", "Duración de las peticiones HTTP por ruta")
+
+HISTOGRAMS = (stage_seconds, llm_call_seconds, http_request_seconds)
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que mide cada petición hasta el último byte de la respuesta
+    (incluye streaming). La ruta es la plantilla del endpoint, no la URL, para
+    no crear una serie por cada valor distinto.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            http_request_seconds.observe(
+                time.perf_counter() - started, method=scope["method"], path=path, status=str(status["code"])
+            )
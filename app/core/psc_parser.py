@@ -1,12 +1,20 @@
 """
 Parser de pseudocódigo a IR usando Lark.
 Convierte árbol Lark → nuestro IR (ast_nodes).
+
+Concurrencia: las tablas LALR y los lexers se compilan una vez por proceso
+(shared_lark) y no cambian después; cada parse() crea su propio estado, así
+que todos los PseudocodeParser comparten el mismo Lark desde cualquier hilo.
+El transformer no guarda estado entre llamadas, pero cada PseudocodeParser
+tiene el suyo y ast_service entrega cada instancia a un solo hilo a la vez.
 """
-from lark import Lark, Transformer, Token
+import threading
+from lark import Lark, Transformer, Token, Tree
 from typing import List, Optional, Union
 from pathlib import Path
+from app.core.metrics import stage_seconds
 from app.models.ast_nodes import (
-    Program, Function, Param, Block, Stmt, Expr,
+    Program, Function, Param, Block, Stmt,
     Assign, Return, ExprStmt, If, While, For,
     Literal, Var, ArrayAccess, BinOp, UnOp, Compare, Call
 )
@@ -116,8 +124,9 @@ class PseudocodeToIR(Transformer):
     
     def call_statement(self, items):
         """CALL funcion(args)"""
-        call_expr = items[0]
-        return ExprStmt(expr=call_expr)
+        # items: [NAME, argument_list o None]
+        args = items[1] if len(items) > 1 and items[1] is not None else []
+        return ExprStmt(expr=Call(name=str(items[0]), args=args))
     
     def then_part(self, items):
         """Bloque then: puede ser begin...end o statement único"""
@@ -156,8 +165,8 @@ class PseudocodeToIR(Transformer):
         return For(var=var_name, start=start_expr, end=end_expr, body=body)
     
     def repeat_loop(self, items):
-        """Repeat-until: convertir a while con lógica invertida"""
-        # repeat ... until (condition) → while not (condition) do ...
+        """Repeat-until: while con la condición invertida y evaluada tras el cuerpo"""
+        # repeat ... until (condition) → while not (condition), con al menos una vuelta
         condition = items[-1]  # última es la condición
         body_stmts = [item for item in items[:-1] if isinstance(item, Stmt)]
         
@@ -165,7 +174,7 @@ class PseudocodeToIR(Transformer):
         negated_cond = UnOp(op="not", operand=condition)
         body = Block(statements=body_stmts)
         
-        return While(cond=negated_cond, body=body)
+        return While(cond=negated_cond, body=body, post_test=True)
     
     # ========================================================================
     # EXPRESIONES
@@ -195,12 +204,14 @@ class PseudocodeToIR(Transformer):
         """Array literal: [1, 2, 3]"""
         # Por ahora, representar como Call a una función especial "Array"
         # Alternativa: agregar ArrayLiteral al IR
-        return Call(name="Array", args=items)
+        args = items[0] if items and isinstance(items[0], list) else []
+        return Call(name="Array", args=args)
     
     def function_call(self, items):
         """Llamada a función"""
         func_name = str(items[0])
-        args = [item for item in items[1:] if isinstance(item, Expr)]
+        # items: [NAME, argument_list o None]; argument_list ya es una lista
+        args = items[1] if len(items) > 1 and isinstance(items[1], list) else []
         return Call(name=func_name, args=args)
     
     def true_value(self, items):
@@ -238,10 +249,10 @@ class PseudocodeToIR(Transformer):
     
     def and_expr(self, items):
         """Expresión AND"""
-        if len(items) == 1:
-            return items[0]
-        result = items[0]
-        for item in items[1:]:
+        # AND es un terminal con nombre: llega como Token entre los operandos
+        operands = [item for item in items if not isinstance(item, Token)]
+        result = operands[0]
+        for item in operands[1:]:
             result = BinOp(op="and", left=result, right=item)
         return result
     
@@ -249,8 +260,8 @@ class PseudocodeToIR(Transformer):
         """Expresión NOT"""
         if len(items) == 1:
             return items[0]
-        # not not expr
-        return UnOp(op="not", operand=items[0])
+        # items: [NOT, expr]
+        return UnOp(op="not", operand=items[-1])
     
     def comparison(self, items):
         """Comparación"""
@@ -352,14 +363,40 @@ class PseudocodeToIR(Transformer):
         return ExprStmt(expr=Literal(value=None))
 
 
+_shared_lark: Optional[Lark] = None
+_shared_lark_lock = threading.Lock()
+
+
+def shared_lark() -> Lark:
+    """
+    Parser LALR de la gramática, construido una sola vez por proceso.
+
+    Lark compila el scanner de cada estado del lexer contextual en su primer
+    uso; aquí se compilan todos antes de publicar la instancia para que
+    ningún hilo la vea a medio construir.
+    """
+    global _shared_lark
+    if _shared_lark is None:
+        with _shared_lark_lock:
+            if _shared_lark is None:
+                with stage_seconds.time(stage="grammar_load", lang="pseudocode"):
+                    with open(GRAMMAR_PATH, 'r', encoding='utf-8') as f:
+                        grammar = f.read()
+                    parser = Lark(grammar, start='start', parser='lalr')
+                    lexer = parser.parser.lexer
+                    for state_lexer in getattr(lexer, 'lexers', {}).values():
+                        state_lexer.scanner
+                    getattr(lexer, 'root_lexer', lexer).scanner
+                _shared_lark = parser
+    return _shared_lark
+
+
 class PseudocodeParser:
     """Parser de pseudocódigo a IR"""
     
     def __init__(self):
-        """Inicializa el parser con la gramática"""
-        with open(GRAMMAR_PATH, 'r', encoding='utf-8') as f:
-            grammar = f.read()
-        self.parser = Lark(grammar, start='start', parser='lalr')
+        """Inicializa el parser con la gramática (compilada una vez por proceso)"""
+        self.parser = shared_lark()
         self.transformer = PseudocodeToIR()
     
     def build(self, code: str) -> Program:
@@ -376,8 +413,16 @@ class PseudocodeParser:
             Exception: Si hay errores de parsing
         """
         try:
-            tree = self.parser.parse(code)
-            program = self.transformer.transform(tree)
-            return program
+            return self.transform(self.parse(code))
         except Exception as e:
             raise Exception(f"Error parsing pseudocode: {str(e)}")
+    
+    def parse(self, code: str) -> Tree:
+        """Primera etapa de build: el árbol de Lark"""
+        with stage_seconds.time(stage="parse", lang="pseudocode"):
+            return self.parser.parse(code)
+    
+    def transform(self, tree: Tree) -> Program:
+        """Segunda etapa de build: árbol de Lark → Program IR"""
+        with stage_seconds.time(stage="ir_transform", lang="pseudocode"):
+            return self.transformer.transform(tree)
@@ -3,7 +3,9 @@ Constructor de IR desde código Python usando el módulo ast estándar.
 Convierte Python AST → nuestro IR (ast_nodes).
 """
 import ast
+import time
 from typing import List, Union, Any
+from app.core.metrics import stage_seconds
 from app.models.ast_nodes import (
     Program, Function, Param, Block, Stmt, Expr,
     Assign, Return, ExprStmt, If, While, For,
@@ -12,7 +14,12 @@ from app.models.ast_nodes import (
 
 
 class PythonToIR:
-    """Convierte código Python a nuestro IR"""
+    """
+    Convierte código Python a nuestro IR.
+
+    No guarda estado entre llamadas (todo vive en variables locales de
+    build), así que una instancia se puede reutilizar y compartir entre hilos.
+    """
     
     def build(self, code: str) -> Program:
         """
@@ -28,11 +35,19 @@ class PythonToIR:
             SyntaxError: Si el código Python es inválido
             NotImplementedError: Si usa características no soportadas
         """
+        return self.transform(self.parse(code))
+    
+    def parse(self, code: str) -> ast.Module:
+        """Primera etapa de build: el árbol de ast.parse"""
         try:
-            tree = ast.parse(code)
+            with stage_seconds.time(stage="parse", lang="python"):
+                return ast.parse(code)
         except SyntaxError as e:
             raise SyntaxError(f"Invalid Python syntax: {e}")
-        
+    
+    def transform(self, tree: ast.Module) -> Program:
+        """Segunda etapa de build: árbol de ast → Program IR"""
+        started = time.perf_counter()
         functions = []
         for node in tree.body:
             if isinstance(node, ast.FunctionDef):
@@ -43,6 +58,7 @@ class PythonToIR:
                     f"Only function definitions allowed at module level."
                 )
         
+        stage_seconds.observe(time.perf_counter() - started, stage="ir_transform", lang="python")
         return Program(functions=functions)
     
     def _build_function(self, node: ast.FunctionDef) -> Function:
@@ -302,7 +318,7 @@ class PythonToIR:
         array = Var(name=node.value.id, line=node.value.lineno, col=node.value.col_offset)
         
         # node.slice puede ser ast.Index (Python <3.9) o directamente la expresión (>=3.9)
-        if hasattr(node.slice, 'value'):  # Python <3.9
+        if isinstance(node.slice, getattr(ast, 'Index', ())):  # Python <3.9
             index = self._build_expr(node.slice.value)
         else:
             index = self._build_expr(node.slice)
@@ -0,0 +1,170 @@
+"""
+Emisor determinista de pseudocódigo desde el IR de Python.
+
+La salida sigue app/grammar/pseudocode.lark y es la inversa de PythonCodegen:
+- for i in range(a, b) (fin exclusivo) → for i 🡨 a to b - 1
+- Listas 0-based: A[i] → A[i + 1] en el pseudocódigo 1-based
+- // → div, % → mod, == → =, != → ≠, <= → ≤, >= → ≥
+- Llamadas como sentencia con CALL; True/False/None → T/F/NULL
+"""
+from typing import Any, Optional, Tuple
+from app.models.ast_nodes import (
+    Program, Function, Block, Stmt, Expr,
+    Assign, Return, ExprStmt, If, While, For,
+    Literal, Var, ArrayAccess, BinOp, UnOp, Compare, Call
+)
+
+INDENT = "    "
+ARROW = "🡨"  # U+1F86A
+
+# Precedencia según la gramática (mayor = liga más fuerte)
+PRECEDENCE = {
+    "or": 1,
+    "and": 2,
+    "not": 3,
+    "compare": 4,
+    "+": 5, "-": 5,
+    "*": 6, "/": 6, "div": 6, "mod": 6,
+    "atom": 9
+}
+
+COMPARE_MAP = {"==": "=", "!=": "≠", "<=": "≤", ">=": "≥"}
+
+# Palabras que el lexer de la gramática no acepta como nombres
+RESERVED = frozenset({
+    "begin", "end", "for", "to", "do", "while", "if", "then", "else", "repeat",
+    "until", "return", "and", "or", "not", "div", "mod", "T", "F", "NULL",
+    "CALL", "procedimiento", "accion", "Clase"
+})
+
+
+class PseudocodeEmitter:
+    """Visitor que emite pseudocódigo a partir de un Program construido por PythonToIR"""
+
+    @staticmethod
+    def emit(program: Program) -> str:
+        """Pseudocódigo del programa completo"""
+        emitter = PseudocodeEmitter()
+        return "\n\n".join(emitter.visit_Function(func) for func in program.functions) + "\n"
+
+    # ========================================================================
+    # FUNCIONES Y SENTENCIAS
+    # ========================================================================
+
+    def visit_Function(self, node: Function) -> str:
+        params = ", ".join(self.name(param.name) for param in node.params)
+        return f"{self.name(node.name)}({params})\n" + self.block(node.body, 0)
+
+    def block(self, block: Optional[Block], depth: int) -> str:
+        pad = INDENT * depth
+        statements = block.statements if block is not None else []
+        body = [self.stmt(stmt, depth + 1) for stmt in statements]
+        return "\n".join([f"{pad}begin"] + body + [f"{pad}end"])
+
+    def stmt(self, node: Stmt, depth: int) -> str:
+        pad = INDENT * depth
+        if isinstance(node, Assign):
+            return f"{pad}{self.expr(node.target)} {ARROW} {self.expr(node.value)}"
+        if isinstance(node, Return):
+            # La gramática exige una expresión tras return
+            value = "NULL" if node.value is None else self.expr(node.value)
+            return f"{pad}return {value}"
+        if isinstance(node, ExprStmt):
+            if isinstance(node.expr, Call):
+                return f"{pad}CALL {self.expr(node.expr)}"
+            if isinstance(node.expr, Literal) and node.expr.value is None:
+                return f"{pad}accion"
+            raise NotImplementedError(f"Expression statement at line {node.line} not supported by the pseudocode emitter")
+        if isinstance(node, If):
+            code = f"{pad}if ({self.expr(node.cond)}) then\n" + self.block(node.then_block, depth)
+            if node.else_block is not None and node.else_block.statements:
+                code += f"\n{pad}else\n" + self.block(node.else_block, depth)
+            return code
+        if isinstance(node, While):
+            return f"{pad}while ({self.expr(node.cond)}) do\n" + self.block(node.body, depth)
+        if isinstance(node, For):
+            start = self.expr(node.start)
+            end = self.offset(node.end, -1)
+            return f"{pad}for {self.name(node.var)} {ARROW} {start} to {end} do\n" + self.block(node.body, depth)
+        raise NotImplementedError(f"Statement {node.__class__.__name__} not supported by the pseudocode emitter")
+
+    # ========================================================================
+    # EXPRESIONES
+    # ========================================================================
+
+    def expr(self, node: Expr) -> str:
+        return self.render(node)[0]
+
+    def render(self, node: Any) -> Tuple[str, int]:
+        """(código, precedencia) de una expresión"""
+        if isinstance(node, Literal):
+            return self.literal(node), PRECEDENCE["atom"]
+        if isinstance(node, Var):
+            return self.name(node.name), PRECEDENCE["atom"]
+        if isinstance(node, ArrayAccess):
+            array = self.expr(node.array)
+            return f"{array}[{self.offset(node.index, 1)}]", PRECEDENCE["atom"]
+        if isinstance(node, BinOp):
+            prec = PRECEDENCE[node.op]
+            left = self.wrap(node.left, prec)
+            right = self.wrap(node.right, prec + 1)
+            return f"{left} {node.op} {right}", prec
+        if isinstance(node, UnOp):
+            if node.op == "not":
+                return f"not {self.wrap(node.operand, PRECEDENCE['not'])}", PRECEDENCE["not"]
+            # Sin menos unario en la gramática: -x → (0 - x); los literales ya son con signo
+            if isinstance(node.operand, Literal) and isinstance(node.operand.value, (int, float)) \
+                    and not isinstance(node.operand.value, bool):
+                return repr(-node.operand.value), PRECEDENCE["atom"]
+            return f"(0 - {self.wrap(node.operand, PRECEDENCE['-'] + 1)})", PRECEDENCE["atom"]
+        if isinstance(node, Compare):
+            op = COMPARE_MAP.get(node.op, node.op)
+            prec = PRECEDENCE["compare"]
+            left = self.wrap(node.left, prec + 1)
+            right = self.wrap(node.right, prec + 1)
+            return f"{left} {op} {right}", prec
+        if isinstance(node, Call):
+            args = ", ".join(self.expr(arg) for arg in node.args)
+            return f"{self.name(node.name)}({args})", PRECEDENCE["atom"]
+        raise NotImplementedError(f"Expression {node.__class__.__name__} not supported by the pseudocode emitter")
+
+    def wrap(self, node: Expr, min_prec: int) -> str:
+        code, prec = self.render(node)
+        return f"({code})" if prec < min_prec else code
+
+    def literal(self, node: Literal) -> str:
+        value = node.value
+        if value is True:
+            return "T"
+        if value is False:
+            return "F"
+        if value is None:
+            return "NULL"
+        if isinstance(value, (int, float)):
+            return repr(value)
+        raise NotImplementedError(
+            f"Literal {type(value).__name__} at line {node.line} not supported by the pseudocode emitter"
+        )
+
+    def name(self, name: str) -> str:
+        if name in RESERVED:
+            raise NotImplementedError(f"Name '{name}' is a reserved word in the pseudocode grammar")
+        return name
+
+    def offset(self, node: Expr, delta: int) -> str:
+        """
+        Código de node + delta, simplificando literales y sumas/restas de
+        constantes: A[i - 1] → A[i], to n + 1 - 1 → to n
+        """
+        if isinstance(node, Literal) and isinstance(node.value, int) and not isinstance(node.value, bool):
+            return repr(node.value + delta)
+        if isinstance(node, BinOp) and node.op in ("+", "-") and isinstance(node.right, Literal) \
+                and isinstance(node.right.value, int) and not isinstance(node.right.value, bool):
+            constant = node.right.value if node.op == "+" else -node.right.value
+            constant += delta
+            if constant == 0:
+                return self.expr(node.left)
+            left = self.wrap(node.left, PRECEDENCE["+"])
+            return f"{left} + {constant}" if constant > 0 else f"{left} - {-constant}"
+        code = self.wrap(node, PRECEDENCE["+"])
+        return f"{code} + {delta}" if delta > 0 else f"{code} - {-delta}"
@@ -0,0 +1,195 @@
+"""
+Generador determinista de código Python desde el IR de pseudocódigo.
+
+Convenciones del pseudocódigo que se traducen:
+- for i 🡨 a to b (fin inclusivo) → for i in range(a, b + 1)
+- Arreglos 1-based: A[i] → A[i - 1]; los valores de índices que el algoritmo
+  calcula o devuelve se conservan tal cual
+- div → //, mod → %, = → ==, ≠ → !=
+- ┌x┐ / └x┘ sin importar math: a // b para └a / b┘, int(x // 1) en general
+- repeat ... until (c) → while True: ... if c: break
+- length(A) y A.length → len(A)
+"""
+from typing import Any, Optional, Tuple
+from app.models.ast_nodes import (
+    Program, Function, Block, Stmt, Expr,
+    Assign, Return, ExprStmt, If, While, For,
+    Literal, Var, ArrayAccess, BinOp, UnOp, Compare, Call
+)
+
+INDENT = "    "
+
+# Precedencia de operadores en Python (mayor = liga más fuerte)
+PRECEDENCE = {
+    "or": 1,
+    "and": 2,
+    "not": 3,
+    "compare": 4,
+    "+": 5, "-": 5,
+    "*": 6, "/": 6, "//": 6, "%": 6,
+    "unary": 7,
+    "atom": 9
+}
+
+BINOP_MAP = {"div": "//", "mod": "%"}
+COMPARE_MAP = {"=": "==", "≠": "!=", "≤": "<=", "≥": ">="}
+CALL_MAP = {"length": "len"}
+
+
+class PythonCodegen:
+    """Visitor que emite Python a partir de un Program construido por PseudocodeParser"""
+
+    @staticmethod
+    def emit(program: Program) -> str:
+        """Código Python del programa completo"""
+        codegen = PythonCodegen()
+        return "\n\n\n".join(codegen.visit_Function(func) for func in program.functions) + "\n"
+
+    # ========================================================================
+    # FUNCIONES Y SENTENCIAS
+    # ========================================================================
+
+    def visit_Function(self, node: Function) -> str:
+        params = ", ".join(param.name for param in node.params)
+        return f"def {node.name}({params}):\n" + self.block(node.body, 1)
+
+    def block(self, block: Optional[Block], depth: int) -> str:
+        statements = block.statements if block is not None else []
+        if not statements:
+            return INDENT * depth + "pass"
+        return "\n".join(self.stmt(stmt, depth) for stmt in statements)
+
+    def stmt(self, node: Stmt, depth: int) -> str:
+        pad = INDENT * depth
+        if isinstance(node, Assign):
+            return f"{pad}{self.expr(node.target)} = {self.expr(node.value)}"
+        if isinstance(node, Return):
+            return f"{pad}return" if node.value is None else f"{pad}return {self.expr(node.value)}"
+        if isinstance(node, ExprStmt):
+            # "accion" llega como ExprStmt(Literal(None))
+            if isinstance(node.expr, Literal) and node.expr.value is None:
+                return f"{pad}pass"
+            return f"{pad}{self.expr(node.expr)}"
+        if isinstance(node, If):
+            return self.if_stmt(node, depth, "if")
+        if isinstance(node, While):
+            if node.post_test:
+                return self.post_test_loop(node, depth)
+            return f"{pad}while {self.expr(node.cond)}:\n" + self.block(node.body, depth + 1)
+        if isinstance(node, For):
+            end = self.offset(node.end, 1)
+            return (
+                f"{pad}for {node.var} in range({self.expr(node.start)}, {end}):\n"
+                + self.block(node.body, depth + 1)
+            )
+        raise NotImplementedError(f"Statement {node.__class__.__name__} not supported by the code generator")
+
+    def post_test_loop(self, node: While, depth: int) -> str:
+        """El cuerpo corre al menos una vez; se sale cuando la condición de continuar deja de cumplirse"""
+        pad = INDENT * (depth + 1)
+        cond = node.cond
+        # repeat ... until (c) llega como While(not c): se sale con c
+        if isinstance(cond, UnOp) and cond.op == "not":
+            exit_cond = self.expr(cond.operand)
+        else:
+            exit_cond = f"not {self.wrap(cond, PRECEDENCE['not'])}"
+        body = node.body.statements if node.body is not None else []
+        lines = [self.stmt(stmt, depth + 1) for stmt in body]
+        lines.append(f"{pad}if {exit_cond}:\n{pad}{INDENT}break")
+        return f"{INDENT * depth}while True:\n" + "\n".join(lines)
+
+    def if_stmt(self, node: If, depth: int, keyword: str) -> str:
+        pad = INDENT * depth
+        code = f"{pad}{keyword} {self.expr(node.cond)}:\n" + self.block(node.then_block, depth + 1)
+        else_block = node.else_block
+        if else_block is None or not else_block.statements:
+            return code
+        # else begin if ... end → elif
+        if len(else_block.statements) == 1 and isinstance(else_block.statements[0], If):
+            return code + "\n" + self.if_stmt(else_block.statements[0], depth, "elif")
+        return code + f"\n{pad}else:\n" + self.block(else_block, depth + 1)
+
+    # ========================================================================
+    # EXPRESIONES
+    # ========================================================================
+
+    def expr(self, node: Expr) -> str:
+        return self.render(node)[0]
+
+    def render(self, node: Any) -> Tuple[str, int]:
+        """(código, precedencia) de una expresión"""
+        if isinstance(node, Literal):
+            return repr(node.value), PRECEDENCE["atom"]
+        if isinstance(node, Var):
+            if node.name.endswith(".length"):
+                return f"len({node.name[:-len('.length')]})", PRECEDENCE["atom"]
+            return node.name, PRECEDENCE["atom"]
+        if isinstance(node, ArrayAccess):
+            array = self.wrap(node.array, PRECEDENCE["atom"])
+            return f"{array}[{self.offset(node.index, -1)}]", PRECEDENCE["atom"]
+        if isinstance(node, BinOp):
+            op = BINOP_MAP.get(node.op, node.op)
+            prec = PRECEDENCE[op]
+            left = self.wrap(node.left, prec)
+            # Operando derecho con la misma precedencia: a - (b - c)
+            right = self.wrap(node.right, prec + 1)
+            return f"{left} {op} {right}", prec
+        if isinstance(node, UnOp):
+            if node.op == "not":
+                return f"not {self.wrap(node.operand, PRECEDENCE['not'])}", PRECEDENCE["not"]
+            return f"-{self.wrap(node.operand, PRECEDENCE['unary'])}", PRECEDENCE["unary"]
+        if isinstance(node, Compare):
+            op = COMPARE_MAP.get(node.op, node.op)
+            prec = PRECEDENCE["compare"]
+            # Sin encadenar comparaciones: (a < b) == c
+            left = self.wrap(node.left, prec + 1)
+            right = self.wrap(node.right, prec + 1)
+            return f"{left} {op} {right}", prec
+        if isinstance(node, Call):
+            return self.call(node)
+        raise NotImplementedError(f"Expression {node.__class__.__name__} not supported by the code generator")
+
+    def wrap(self, node: Expr, min_prec: int) -> str:
+        code, prec = self.render(node)
+        return f"({code})" if prec < min_prec else code
+
+    def call(self, node: Call) -> Tuple[str, int]:
+        if node.name == "Array":
+            return "[" + ", ".join(self.expr(arg) for arg in node.args) + "]", PRECEDENCE["atom"]
+        if node.name in ("floor", "ceiling") and len(node.args) == 1:
+            return self.rounding(node.name, node.args[0])
+        name = CALL_MAP.get(node.name, node.name)
+        args = ", ".join(self.expr(arg) for arg in node.args)
+        return f"{name}({args})", PRECEDENCE["atom"]
+
+    def rounding(self, name: str, arg: Expr) -> Tuple[str, int]:
+        """└x┘ y ┌x┐ con aritmética entera, sin math.floor/math.ceil"""
+        prec = PRECEDENCE["//"]
+        if isinstance(arg, BinOp) and arg.op == "/":
+            left = self.wrap(arg.left, prec)
+            right = self.wrap(arg.right, prec + 1)
+            if name == "floor":
+                return f"{left} // {right}", prec
+            # ┌a / b┐ = -(-a // b)
+            return f"-(-{self.wrap(arg.left, PRECEDENCE['unary'])} // {right})", PRECEDENCE["unary"]
+        if name == "floor":
+            return f"int({self.wrap(arg, prec)} // 1)", PRECEDENCE["atom"]
+        return f"-int(-{self.wrap(arg, PRECEDENCE['unary'])} // 1)", PRECEDENCE["unary"]
+
+    def offset(self, node: Expr, delta: int) -> str:
+        """
+        Código de node + delta, simplificando literales y sumas/restas de
+        constantes: A[i + 1] → A[i], range(1, n - 1 + 1) → range(1, n)
+        """
+        if isinstance(node, Literal) and isinstance(node.value, int) and not isinstance(node.value, bool):
+            return repr(node.value + delta)
+        if isinstance(node, BinOp) and node.op in ("+", "-") and isinstance(node.right, Literal) \
+                and isinstance(node.right.value, int) and not isinstance(node.right.value, bool):
+            constant = node.right.value if node.op == "+" else -node.right.value
+            constant += delta
+            left = self.wrap(node.left, PRECEDENCE["+"])
+            if constant == 0:
+                return self.expr(node.left)
+            return f"{left} + {constant}" if constant > 0 else f"{left} - {-constant}"
+        code = self.wrap(node, PRECEDENCE["+"])
+        return f"{code} + {delta}" if delta > 0 else f"{code} - {-delta}"
@@ -228,15 +228,17 @@ class If(Stmt):
 
 @dataclass
 class While(Stmt):
-    """Bucle while"""
+    """Bucle while. post_test: la condición se evalúa tras el cuerpo (repeat-until)"""
     cond: Expr = field(default_factory=lambda: Literal())
     body: Block = field(default_factory=Block)
+    post_test: bool = False
     
     def to_dict(self) -> Dict[str, Any]:
         return {
             "type": "While",
             "cond": self.cond.to_dict(),
             "body": self.body.to_dict(),
+            "post_test": self.post_test,
             "line": self.line,
             "col": self.col
         }
@@ -5,9 +5,10 @@ from enum import Enum
 class InputType(str, Enum):
     PSEUDOCODE = "pseudocode"
     NATURAL_LANGUAGE = "natural_language"
+    PYTHON = "python"
 
 class InputRequest(BaseModel):
-    content: str = Field(..., min_length=1, max_length=10000, description="Pseudocódigo o descripción en lenguaje natural")
+    content: str = Field(..., min_length=1, max_length=10000, description="Pseudocódigo, código Python o descripción en lenguaje natural")
     input_type: Optional[InputType] = Field(None, description="Tipo de entrada. Si no se especifica, se detectará automáticamente")
 
 class PseudocodeResponse(BaseModel):
@@ -16,6 +17,7 @@ class PseudocodeResponse(BaseModel):
     input_type_detected: InputType = Field(..., description="Tipo de entrada detectado")
     is_valid_pseudocode: bool = Field(..., description="Si el pseudocódigo es válido sintácticamente")
     correction_applied: bool = Field(False, description="Si se aplicó corrección con LLM")
+    degraded: bool = Field(False, description="Si se respondió en modo degradado (LLM no disponible)")
 
 class ErrorResponse(BaseModel):
     error: str = Field(..., description="Descripción del error")
@@ -35,4 +37,12 @@ class ASTResponse(BaseModel):
     error_message: Optional[str] = Field(None, description="Mensaje de error si el parseo falló")
 
 # Necesario para las referencias circulares en ASTNode
-ASTNode.model_rebuild()
\ No newline at end of file
+ASTNode.model_rebuild()
+
+
+class AlgorithmTemplate(BaseModel):
+    id: str = Field(..., min_length=1, max_length=100, pattern=r"^[A-Za-z0-9_\-]+$", description="Identificador único de la plantilla")
+    title: str = Field(..., min_length=1, description="Nombre del algoritmo")
+    descriptions: List[str] = Field(..., min_length=1, description="Formas habituales de pedir el algoritmo")
+    pseudocode: str = Field(..., min_length=1, description="Pseudocódigo verificado con el parser del proyecto")
+    python: str = Field(..., min_length=1, description="Implementación Python aceptada por PythonToIR")
@@ -1,41 +1,266 @@
 """
 Servicio para construcción de AST desde diferentes lenguajes.
 Soporta Python y pseudocódigo.
+
+Cada lenguaje es un frontend registrado con la ruta de su clase
+("módulo:Clase"). El módulo se importa con el primer uso y los builders
+construidos se reutilizan desde un pool, así que el arranque no paga por
+lenguajes que no se usan y las peticiones no pagan la construcción.
 """
-from typing import Dict, Literal
-from app.core.py_ast_builder import PythonToIR
-from app.core.psc_parser import PseudocodeParser
+import importlib
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Literal, Optional
+from app.config.settings import settings
+from app.core.metrics import stage_seconds
+from app.core.visitors.complexity import Complexity
+from app.core.visitors.python_codegen import PythonCodegen
+from app.core.visitors.pseudocode_emitter import PseudocodeEmitter
+from app.models.ast_nodes import Program
+from app.services.parse_cache import ParseCache
+
+
+logger = logging.getLogger(__name__)
 
+parse_cache = ParseCache(maxsize=settings.PARSE_CACHE_SIZE)
 
-def build_ast(content: str, from_lang: Literal["python", "pseudocode"] = "python") -> Dict:
+COLD = "cold"
+WARMING = "warming"
+WARM = "warm"
+
+
+class Frontend:
+    """
+    Frontend de un lenguaje: la clase se importa en el primer uso y sus
+    instancias (builders) se guardan en un pool de hasta pool_size. Cada
+    builder lo usa un solo hilo a la vez.
+    """
+
+    def __init__(self, name: str, factory: str, pool_size: int):
+        self.name = name
+        self.factory = factory
+        self.pool_size = max(pool_size, 1)
+        self.created = 0
+        self.load_ms: Optional[float] = None
+        self.warmup_ms: Optional[float] = None
+        self._cls = None
+        self._idle: List[Any] = []
+        self._warming = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self._warming:
+            return WARMING
+        return WARM if self.created else COLD
+
+    def _builder_class(self):
+        with self._lock:
+            if self._cls is None:
+                started = time.perf_counter()
+                module_name, attr = self.factory.split(":")
+                self._cls = getattr(importlib.import_module(module_name), attr)
+                self.load_ms = round((time.perf_counter() - started) * 1000, 3)
+            return self._cls
+
+    def _new_builder(self):
+        builder = self._builder_class()()
+        with self._lock:
+            self.created += 1
+        return builder
+
+    @contextmanager
+    def builder(self) -> Iterator[Any]:
+        """Builder del pool (o uno nuevo si no hay libres), devuelto al terminar"""
+        with self._lock:
+            builder = self._idle.pop() if self._idle else None
+        if builder is None:
+            builder = self._new_builder()
+        try:
+            yield builder
+        finally:
+            with self._lock:
+                if len(self._idle) < self.pool_size:
+                    self._idle.append(builder)
+
+    def build(self, content: str) -> Program:
+        with self.builder() as builder:
+            return builder.build(content)
+
+    def warm(self, count: Optional[int] = None) -> None:
+        """Construye builders hasta tener `count` libres (por defecto, el pool completo)"""
+        count = self.pool_size if count is None else min(count, self.pool_size)
+        self._warming = True
+        started = time.perf_counter()
+        try:
+            with self._lock:
+                missing = count - len(self._idle)
+            builders = [self._new_builder() for _ in range(max(missing, 0))]
+            with self._lock:
+                self._idle.extend(builders[:self.pool_size - len(self._idle)])
+        finally:
+            self._warming = False
+        self.warmup_ms = round((time.perf_counter() - started) * 1000, 3)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            idle = len(self._idle)
+        return {
+            "state": self.state,
+            "builders": self.created,
+            "idle": idle,
+            "pool_size": self.pool_size,
+            "load_ms": self.load_ms,
+            "warmup_ms": self.warmup_ms
+        }
+
+
+_frontends: Dict[str, Frontend] = {}
+
+
+def register_frontend(name: str, factory: str, pool_size: Optional[int] = None) -> Frontend:
+    """
+    Registra un lenguaje fuente. factory es "módulo:Clase"; la clase debe
+    construirse sin argumentos y exponer build(content) -> Program.
+    """
+    frontend = Frontend(name, factory, pool_size or settings.PARSE_WORKERS)
+    _frontends[name] = frontend
+    return frontend
+
+
+def get_frontend(from_lang: str) -> Frontend:
+    """
+    Raises:
+        ValueError: Si el lenguaje no está registrado
+    """
+    frontend = _frontends.get(from_lang)
+    if frontend is None:
+        supported = " and ".join(f"'{name}'" for name in _frontends)
+        raise ValueError(
+            f"Language '{from_lang}' not supported. "
+            f"Only {supported} are supported."
+        )
+    return frontend
+
+
+def warm_frontends(names: Iterable[str]) -> None:
+    """Precalienta los pools de los lenguajes indicados (ignora los desconocidos)"""
+    for name in names:
+        frontend = _frontends.get(name)
+        if frontend is None:
+            logger.warning(f"Frontend '{name}' no registrado; no se precalienta")
+            continue
+        frontend.warm()
+        logger.info(f"Frontend '{name}' caliente en {frontend.warmup_ms} ms")
+
+
+def frontend_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: frontend.stats() for name, frontend in _frontends.items()}
+
+
+register_frontend("python", "app.core.py_ast_builder:PythonToIR")
+register_frontend("pseudocode", "app.core.psc_parser:PseudocodeParser")
+
+
+def parse_program(content: str, from_lang: Literal["python", "pseudocode"] = "python",
+                  refresh: bool = False) -> Program:
+    """
+    Construye el Program IR desde código fuente, reutilizando la caché de parsing.
+    Con refresh=True se parsea de nuevo aunque esté en caché (para perfilar).
+
+    Raises:
+        ValueError: Si from_lang no es válido
+        SyntaxError: Si el código tiene errores de sintaxis
+        NotImplementedError: Si usa características no soportadas (Python)
+        Exception: Si hay errores de parsing (pseudocode)
+    """
+    frontend = get_frontend(from_lang)
+    key = ParseCache.key(content, from_lang)
+    program = None if refresh else parse_cache.get(key)
+    if program is not None:
+        return program
+
+    program = frontend.build(content)
+    parse_cache.put(key, program)
+    return program
+
+
+def build_ast(content: str, from_lang: Literal["python", "pseudocode"] = "python", refresh: bool = False) -> Dict:
     """
     Construye AST (IR) desde código fuente.
-    
+
     Args:
         content: Código fuente
         from_lang: Lenguaje fuente ("python" o "pseudocode")
-        
+        refresh: Ignorar la caché de parsing
+
     Returns:
         Dict con el AST serializado
-        
+
     Raises:
         ValueError: Si from_lang no es válido
         SyntaxError: Si el código tiene errores de sintaxis
         NotImplementedError: Si usa características no soportadas (Python)
         Exception: Si hay errores de parsing (pseudocode)
     """
-    if from_lang == "python":
-        builder = PythonToIR()
-        program = builder.build(content)
+    program = parse_program(content, from_lang, refresh)
+    with stage_seconds.time(stage="to_dict", lang=from_lang):
         return program.to_dict()
-    
-    elif from_lang == "pseudocode":
-        parser = PseudocodeParser()
-        program = parser.build(content)
-        return program.to_dict()
-    
-    else:
-        raise ValueError(
-            f"Language '{from_lang}' not supported. "
-            f"Only 'python' and 'pseudocode' are supported."
-        )
+
+
+def analyze_complexity(content: str, from_lang: Literal["python", "pseudocode"] = "python",
+                       refresh: bool = False) -> Dict:
+    """
+    Construye el IR y calcula la complejidad de cada función.
+
+    Returns:
+        Dict con la complejidad simbólica por función
+
+    Raises:
+        Las mismas excepciones que build_ast
+    """
+    program = parse_program(content, from_lang, refresh)
+    with stage_seconds.time(stage="complexity", lang=from_lang):
+        functions = [
+            {"name": func.name, "complexity": Complexity.of(func)}
+            for func in program.functions
+        ]
+    return {"functions": functions}
+
+
+def transpile_pseudocode(content: str) -> str:
+    """
+    Traduce pseudocódigo válido a Python sin pasar por el LLM.
+
+    Raises:
+        Las mismas excepciones que build_ast, más NotImplementedError si el
+        generador no soporta alguna construcción
+    """
+    return PythonCodegen.emit(parse_program(content, "pseudocode"))
+
+
+def python_to_pseudocode(content: str) -> str:
+    """
+    Traduce Python aceptado por PythonToIR a pseudocódigo del proyecto.
+
+    Raises:
+        Las mismas excepciones que build_ast, más NotImplementedError si el
+        emisor no soporta alguna construcción
+    """
+    return PseudocodeEmitter.emit(parse_program(content, "python"))
+
+
+def validate_source(content: str, from_lang: Literal["python", "pseudocode"]) -> Optional[str]:
+    """
+    Comprueba que el código sea aceptado por el frontend del lenguaje.
+
+    Returns:
+        None si es válido, o el mensaje de error del parser
+    """
+    try:
+        parse_program(content, from_lang)
+        return None
+    except Exception as e:
+        return str(e)
@@ -0,0 +1,165 @@
+"""
+Procesamiento por lotes de fragmentos de código con resultados en NDJSON.
+
+Los ítems se leen de forma perezosa, se procesan concurrentemente en el
+ejecutor de parsing y cada resultado se emite en cuanto termina (orden de
+finalización). En memoria solo viven los ítems en vuelo, nunca el lote entero.
+
+Los lotes tienen su propio límite de admisión (BATCH_MAX_PENDING), por debajo
+de la capacidad del ejecutor: un lote grande espera su turno sin llenar la
+cola y las peticiones interactivas de /ast no reciben 429 por su culpa.
+"""
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, IO, Iterable, Optional, Tuple
+
+from app.config.settings import settings
+from app.services.ast_service import get_frontend
+from app.services.parse_executor import parse_executor, QueueFullError
+
+logger = logging.getLogger(__name__)
+
+# Espera entre reintentos cuando el lote no tiene cupo en el ejecutor
+QUEUE_FULL_BACKOFF_SECONDS = 0.05
+
+
+class BatchItemError(Exception):
+    """Ítem del lote mal formado"""
+
+
+def error_detail(e: Exception) -> str:
+    """Traduce una excepción de parsing al mismo detalle que usa /ast"""
+    if isinstance(e, NotImplementedError):
+        return f"unsupported_syntax: {str(e)}"
+    if isinstance(e, SyntaxError):
+        return f"syntax_error: {str(e)}"
+    if isinstance(e, (ValueError, BatchItemError)):
+        return str(e)
+    return "internal_error: An unexpected error occurred"
+
+
+async def iter_json_items(items: Iterable[Any]) -> AsyncIterator[Tuple[int, Any]]:
+    """Adapta una lista JSON ya decodificada a iterador asíncrono de (posición, ítem)"""
+    for index, item in enumerate(items):
+        yield index, item
+
+
+async def iter_ndjson_lines(stream: IO[bytes]) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Lee un archivo NDJSON línea por línea y entrega (número de línea, ítem).
+
+    Las líneas que no son JSON válido se entregan como BatchItemError para que
+    se reporten como error de ese ítem sin abortar el lote.
+    """
+    line_number = 0
+    for raw in stream:
+        line_number += 1
+        line = raw.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as e:
+            item = BatchItemError(f"invalid_json: line {line_number}: {e.msg}")
+        yield line_number, item
+        # Ceder el event loop entre líneas en lotes grandes
+        if line_number % 256 == 0:
+            await asyncio.sleep(0)
+
+
+def _validate_item(raw: Any) -> Dict[str, Any]:
+    if isinstance(raw, BatchItemError):
+        raise raw
+    if not isinstance(raw, dict):
+        raise BatchItemError("invalid_item: each item must be an object")
+    content = raw.get("content")
+    if not isinstance(content, str) or not content.strip():
+        raise BatchItemError("'content' es requerido y no puede estar vacío")
+    from_lang = raw.get("from_lang", "python")
+    get_frontend(from_lang)
+    return {"id": raw.get("id"), "content": content, "from_lang": from_lang}
+
+
+def batch_admission_limit() -> int:
+    """
+    Trabajos pendientes en el ejecutor a partir de los cuales un lote deja de
+    enviar ítems. Siempre queda por debajo de la capacidad total para reservar
+    sitio a las peticiones interactivas.
+    """
+    return max(min(settings.BATCH_MAX_PENDING, parse_executor.capacity - 1), 1)
+
+
+async def _run_with_backpressure(fn: Callable[[str, str], Dict], content: str, from_lang: str):
+    """Los lotes esperan su turno en lugar de recibir 429 por cada ítem"""
+    limit = batch_admission_limit()
+    while True:
+        # Comprobar y enviar sin ceder el event loop entre medias
+        if parse_executor.pending < limit:
+            try:
+                return await parse_executor.run(fn, content, from_lang)
+            except QueueFullError:
+                pass
+        await asyncio.sleep(QUEUE_FULL_BACKOFF_SECONDS)
+
+
+async def _process_item(index: int, raw: Any, fn: Callable[[str, str], Dict], result_key: str) -> Dict:
+    item_id: Optional[Any] = raw.get("id") if isinstance(raw, dict) else None
+    try:
+        item = _validate_item(raw)
+        execution = await _run_with_backpressure(fn, item["content"], item["from_lang"])
+        return {
+            "id": item_id,
+            "index": index,
+            "ok": True,
+            result_key: execution.value,
+            "timing": execution.timings()
+        }
+    except Exception as e:
+        if not isinstance(e, (BatchItemError, ValueError, SyntaxError, NotImplementedError)):
+            logger.error(f"Internal error in batch item {item_id}: {e}", exc_info=True)
+        return {"id": item_id, "index": index, "ok": False, "error": error_detail(e)}
+
+
+async def stream_batch(
+    items: AsyncIterator[Tuple[int, Any]],
+    fn: Callable[[str, str], Dict],
+    result_key: str,
+    concurrency: int = settings.BATCH_CONCURRENCY
+) -> AsyncIterator[bytes]:
+    """
+    Procesa los ítems concurrentemente y emite una línea NDJSON por resultado.
+
+    Args:
+        items: Iterador asíncrono de (índice, ítem {id, content, from_lang}); el
+            índice es la posición en la lista JSON o la línea en NDJSON
+        fn: Función CPU-bound (content, from_lang) -> Dict
+        result_key: Clave bajo la que se emite el resultado de cada ítem
+        concurrency: Máximo de ítems en vuelo
+
+    Yields:
+        Líneas NDJSON en orden de finalización
+    """
+    pending = set()
+    exhausted = False
+
+    try:
+        while pending or not exhausted:
+            while not exhausted and len(pending) < concurrency:
+                try:
+                    index, raw = await items.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                pending.add(asyncio.ensure_future(_process_item(index, raw, fn, result_key)))
+
+            if not pending:
+                break
+
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield (json.dumps(task.result(), ensure_ascii=False) + "\n").encode("utf-8")
+    finally:
+        # Si el cliente se desconecta no seguimos esperando ítems huérfanos
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,164 @@
+"""
+Circuit breaker para las llamadas al LLM.
+
+- Cerrado: las llamadas pasan y su resultado (éxito, lenta, fallo) entra en una
+  ventana deslizante. Si la tasa de fallos o de llamadas lentas supera su
+  umbral (con un mínimo de llamadas), el circuito se abre.
+- Abierto: las llamadas se rechazan al instante con CircuitOpenError hasta que
+  pasa open_seconds.
+- Semiabierto: se deja pasar un número limitado de sondas. Si salen bien el
+  circuito se cierra con la ventana vacía; si alguna falla, vuelve a abrirse.
+"""
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict
+
+from app.config.settings import settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+SUCCESS = "success"
+SLOW = "slow"
+FAILURE = "failure"
+
+
+class CircuitOpenError(Exception):
+    """El circuito está abierto: no se llama al upstream"""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"LLM circuit open; retry in {retry_after:.0f}s")
+
+
+class CircuitBreaker:
+    """Thread-safe; el reloj es inyectable para los tests"""
+
+    def __init__(
+        self,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 20.0,
+        slow_call_rate: float = 0.8,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 1,
+        enabled: bool = True,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.enabled = enabled
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes: Deque[str] = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def _refresh(self) -> None:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self.opened += 1
+
+    def before_call(self) -> None:
+        """
+        Reserva el paso de una llamada.
+
+        Raises:
+            CircuitOpenError: Si el circuito está abierto o no quedan sondas
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._refresh()
+            if self._state == CLOSED:
+                return
+            if self._state == HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                return
+            self.rejected += 1
+            retry_after = max(self.open_seconds - (self._clock() - self._opened_at), 1.0)
+            raise CircuitOpenError(retry_after)
+
+    def record(self, ok: bool, seconds: float) -> None:
+        """Resultado de una llamada que pasó por before_call"""
+        if not self.enabled:
+            return
+        outcome = FAILURE if not ok else SLOW if seconds >= self.slow_call_seconds else SUCCESS
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+                if outcome == SUCCESS:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_probes:
+                        self._state = CLOSED
+                        self._outcomes.clear()
+                else:
+                    self._open()
+                return
+            if self._state == OPEN:
+                # Llamada que empezó antes de abrirse el circuito
+                return
+
+            self._outcomes.append(outcome)
+            calls = len(self._outcomes)
+            if calls < self.min_calls:
+                return
+            failures = self._outcomes.count(FAILURE)
+            slow = self._outcomes.count(SLOW)
+            if failures / calls >= self.failure_rate or slow / calls >= self.slow_call_rate:
+                self._open()
+
+    def release(self) -> None:
+        """Libera la reserva de una llamada cancelada sin resultado"""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._refresh()
+            calls = len(self._outcomes)
+            return {
+                "enabled": self.enabled,
+                "state": self._state,
+                "window_calls": calls,
+                "failure_rate": self._outcomes.count(FAILURE) / calls if calls else 0.0,
+                "slow_rate": self._outcomes.count(SLOW) / calls if calls else 0.0,
+                "opened": self.opened,
+                "rejected": self.rejected
+            }
+
+
+def breaker_from_settings() -> CircuitBreaker:
+    return CircuitBreaker(
+        window=settings.LLM_BREAKER_WINDOW,
+        min_calls=settings.LLM_BREAKER_MIN_CALLS,
+        failure_rate=settings.LLM_BREAKER_FAILURE_RATE,
+        slow_call_seconds=settings.LLM_BREAKER_SLOW_CALL_SECONDS,
+        slow_call_rate=settings.LLM_BREAKER_SLOW_CALL_RATE,
+        open_seconds=settings.LLM_BREAKER_OPEN_SECONDS,
+        enabled=settings.LLM_BREAKER_ENABLED
+    )
@@ -1,32 +1,37 @@
-import google.generativeai as genai
 from app.config.settings import settings
+from app.core.metrics import llm_call_seconds
+from app.services.ast_service import validate_source
+from app.services.circuit_breaker import breaker_from_settings, CircuitOpenError
+from app.services.llm_batch import batchable, build_batch_prompt, split_batch_response, MicroBatcher
+from app.services.llm_cache import llm_cache
+from app.services.llm_repair import apply_repair, build_repair
+from app.services.llm_rest import RestModel
+from app.services.model_router import router_from_settings
+from app.services.template_service import template_library
+from app.services.parse_executor import parse_executor, QueueFullError
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
 import asyncio
+import hashlib
 import logging
 import re
+import time
 
 logger = logging.getLogger(__name__)
 
 ARROW = "🡨"  # U+1F86A
-class GeminiService:
-    def __init__(self):
-        """Inicializa el servicio de Gemini con la API key desde .env"""
-        # La API key se lee automáticamente desde el archivo .env mediante python-decouple
-        if not settings.GEMINI_API_KEY:
-            raise EnvironmentError(
-                "GEMINI_API_KEY no definida. Por favor, configura la variable GEMINI_API_KEY en el archivo .env"
-            )
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        # Modelo vigente
-        self.model = genai.GenerativeModel("gemini-2.5-pro")
-        logger.info("Servicio Gemini inicializado correctamente")
 
-    async def normalize_to_pseudocode(self, natural_language: str) -> str:
-        """
-        Convierte descripción en lenguaje natural a pseudocódigo estructurado
-        siguiendo la gramática definida en el proyecto.
-        """
-        # ¡OJO!: llaves literales como {{atributos}} para que no fallen los f-strings
-        prompt = f"""
+# Versiones de las plantillas de prompt: cambiarlas invalida la caché de respuestas
+NORMALIZE_PROMPT_VERSION = "normalize-v1"
+PYTHON_PROMPT_VERSION = "python-v1"
+
+# Error de una salida que no se pudo validar (cola de parsing llena): no es
+# válida, pero tampoco hay un error del parser que reparar. Nunca se cachea.
+UNVALIDATED = "unvalidated: parse queue is full"
+
+
+# Instrucciones comunes al prompt individual y al prompt por lotes
+# ¡OJO!: llaves literales como {{atributos}} para que no fallen los f-strings
+NORMALIZE_INSTRUCTIONS = f"""
 Convierte la siguiente descripción en pseudocódigo siguiendo EXACTAMENTE esta gramática:
 
 REGLAS PRINCIPALES:
@@ -43,26 +48,9 @@ REGLAS PRINCIPALES:
 - Objetos: Clase nombre {{atributos}}
 - Valores booleanos: T, F
 - Operadores: and, or, not, <, >, ≤, ≥, =, ≠, +, -, *, /, mod, div
-
-DESCRIPCIÓN:
-{natural_language}
-
-RESPUESTA:
-(Solo el pseudocódigo, sin explicaciones, sin markdown, sin ```)
 """
-        try:
-            raw = await self._generate_content(prompt)
-            return raw
-        except Exception as e:
-            logger.error(f"Error al normalizar con Gemini: {e}")
-            raise Exception(f"Error en la normalización: {str(e)}")
 
-    async def generate_python_code(self, natural_language: str) -> str:
-        """
-        Genera una implementación en Python a partir de la descripción en lenguaje natural.
-        La respuesta debe ser SOLO el código Python (sin explicaciones ni markdown).
-        """
-        prompt = f"""
+PYTHON_INSTRUCTIONS = """
 Eres un asistente que convierte descripciones en implementaciones en Python.
 
 Requisitos:
@@ -80,35 +68,576 @@ RESTRICCIONES IMPORTANTES:
   b = temp
 - NO uses asignaciones múltiples (NO: x = y = z = 0)
 - Usa asignaciones simples una por una
+"""
+
+
+def build_normalize_prompt(natural_language: str) -> str:
+    """Prompt para convertir una descripción a pseudocódigo del proyecto"""
+    return NORMALIZE_INSTRUCTIONS + f"""
+DESCRIPCIÓN:
+{natural_language}
+
+RESPUESTA:
+(Solo el pseudocódigo, sin explicaciones, sin markdown, sin ```)
+"""
+
 
+def build_python_prompt(natural_language: str) -> str:
+    """Prompt para generar una implementación en Python"""
+    return PYTHON_INSTRUCTIONS + f"""
 DESCRIPCIÓN:
 {natural_language}
 
 RESPUESTA:
 (Solo el código Python, sin explicaciones, sin ```)
 """
+
+
+class LLMTimeoutError(TimeoutError):
+    """El LLM no respondió dentro del deadline configurado"""
+
+
+class GeminiService:
+    def __init__(self):
+        """
+        Inicializa el servicio sin tocar Gemini: el cliente (google.generativeai,
+        cuyo import es lento) se crea en la primera llamada al modelo. Así los
+        workers que sólo parsean arrancan rápido y sin GEMINI_API_KEY.
+        """
+        self._genai = None
+        # Con URL base se habla la API REST directamente (p. ej. el LLM falso de loadtest/)
+        self.base_url = settings.LLM_BASE_URL
+        # Modelos: el enrutador elige entre uno rápido y uno fuerte por petición
+        self.router = router_from_settings()
+        self.models: Dict[str, Any] = {}
+        self.cache = llm_cache
+        self.templates = template_library
+        # Peticiones en vuelo por modelo y hash de prompt (single-flight)
+        self._inflight: Dict[str, "_Flight"] = {}
+        self.coalesced_calls = 0
+        # Límites de las llamadas upstream
+        self.timeout_seconds = settings.TIMEOUT_SECONDS
+        self.max_concurrency = settings.LLM_MAX_CONCURRENCY
+        self.inflight_calls = 0
+        # Bucle de validación y reparación
+        self.max_repairs = settings.LLM_REPAIR_MAX_ATTEMPTS
+        self.repair_calls = 0
+        self.repair_failures = 0
+        self.unvalidated = 0
+        # Circuit breaker: con el LLM caído o lento se falla rápido y se degrada
+        self.breaker = breaker_from_settings()
+        self.degraded_responses = 0
+        # Micro-batching: descripciones cercanas en el tiempo comparten un prompt
+        self.batch_enabled = settings.LLM_BATCH_ENABLED
+        self.batch_window_seconds = settings.LLM_BATCH_WINDOW_MS / 1000
+        self.batch_max_items = settings.LLM_BATCH_MAX_ITEMS
+        self.batch_max_resends = settings.LLM_BATCH_MAX_RESENDS
+        self.batch_calls = 0
+        self.batched_items = 0
+        self.batch_resent_items = 0
+        self._batchers: Dict[Tuple[str, str], MicroBatcher] = {}
+        self._batchers_loop = None
+        self._semaphore = None
+        self._semaphore_loop = None
+
+    def _client(self):
+        """Módulo google.generativeai configurado, importado en el primer uso"""
+        if self._genai is None:
+            # La API key se lee automáticamente desde el archivo .env mediante python-decouple
+            if not settings.GEMINI_API_KEY:
+                raise EnvironmentError(
+                    "GEMINI_API_KEY no definida. Por favor, configura la variable GEMINI_API_KEY en el archivo .env"
+                )
+            import google.generativeai as genai
+            genai.configure(api_key=settings.GEMINI_API_KEY)
+            self._genai = genai
+            logger.info("Cliente de Gemini inicializado")
+        return self._genai
+
+    def _get_model(self, model_name: str):
+        """Cliente del modelo, creado una sola vez por nombre"""
+        model = self.models.get(model_name)
+        if model is None:
+            if self.base_url:
+                model = RestModel(self.base_url, model_name, settings.GEMINI_API_KEY)
+            else:
+                model = self._client().GenerativeModel(model_name)
+            self.models[model_name] = model
+        return model
+
+    def _cache_key(self, kind: str, template_version: str, natural_language: str) -> str:
+        return self.cache.key(kind, template_version, self.router.namespace, natural_language)
+
+    async def normalize_to_pseudocode(self, natural_language: str) -> str:
+        """
+        Convierte descripción en lenguaje natural a pseudocódigo estructurado
+        siguiendo la gramática definida en el proyecto.
+        """
+        return (await self.normalize_validated(natural_language)).text
+
+    async def normalize_validated(self, natural_language: str) -> "Generation":
+        """Igual que normalize_to_pseudocode, indicando si el resultado parsea"""
+        template = self._from_template(natural_language, "normalize")
+        if template is not None:
+            return template
+
+        cache_key = self._cache_key("normalize", NORMALIZE_PROMPT_VERSION, natural_language)
+        cached = await self.cache.aget(cache_key)
+        if cached is not None:
+            return Generation(text=cached, model=None, error=None, repairs=0)
+
+        prompt = build_normalize_prompt(natural_language)
         try:
-            raw = await self._generate_content(prompt)
-            # A veces Gemini devuelve texto con contenido adicional; limpiamos espacios extra
-            return raw.strip()
+            result = await self._generate_validated(prompt, natural_language, "pseudocode")
+            # Sólo se cachean salidas que pasan el parser
+            if result.text and result.error is None:
+                await self.cache.aput(cache_key, result.text, kind="normalize", model=result.model)
+            return result
+        except CircuitOpenError as e:
+            return await self._degraded(cache_key, e)
+        except LLMTimeoutError:
+            raise
+        except Exception as e:
+            logger.error(f"Error al normalizar con Gemini: {e}")
+            raise Exception(f"Error en la normalización: {str(e)}")
+
+    async def generate_python_code(self, natural_language: str) -> str:
+        """
+        Genera una implementación en Python a partir de la descripción en lenguaje natural.
+        La respuesta debe ser SOLO el código Python (sin explicaciones ni markdown).
+        """
+        return (await self.generate_python_validated(natural_language)).text
+
+    async def generate_python_validated(self, natural_language: str) -> "Generation":
+        """Igual que generate_python_code, indicando si el resultado parsea"""
+        template = self._from_template(natural_language, "python")
+        if template is not None:
+            return template
+
+        cache_key = self._cache_key("python", PYTHON_PROMPT_VERSION, natural_language)
+        cached = await self.cache.aget(cache_key)
+        if cached is not None:
+            return Generation(text=cached, model=None, error=None, repairs=0)
+
+        prompt = build_python_prompt(natural_language)
+        try:
+            result = await self._generate_validated(prompt, natural_language, "python")
+            if result.text and result.error is None:
+                await self.cache.aput(cache_key, result.text, kind="python", model=result.model)
+            return result
+        except CircuitOpenError as e:
+            return await self._degraded(cache_key, e)
+        except LLMTimeoutError:
+            raise
         except Exception as e:
             logger.error(f"Error al generar Python con Gemini: {e}")
             raise Exception(f"Error en la generación de código: {str(e)}")
 
-    
+    def _from_template(self, natural_language: str, kind: str) -> Optional["Generation"]:
+        """Respuesta local si la descripción corresponde a una plantilla conocida"""
+        found = self.templates.match(natural_language)
+        if found is None:
+            return None
+        template, score = found
+        logger.info(f"Plantilla '{template.id}' (similitud {score:.2f}); sin llamar a Gemini")
+        text = template.pseudocode if kind == "normalize" else template.python
+        return Generation(text=text, model=f"template:{template.id}", error=None, repairs=0)
 
-    async def _generate_content(self, prompt: str) -> str:
+    async def _degraded(self, cache_key: str, error: CircuitOpenError) -> "Generation":
+        """
+        Respuesta en modo degradado con el circuito abierto: una entrada
+        caducada de la caché. Las plantillas ya se consultaron con su umbral
+        normal antes de llamar al LLM; con el circuito abierto no se relaja,
+        porque un 503 es mejor que devolver otro algoritmo.
+
+        Raises:
+            CircuitOpenError: Si no hay nada local con qué responder
+        """
+        stale = await self.cache.aget(cache_key, allow_stale=True)
+        if stale is None:
+            raise error
+        self.degraded_responses += 1
+        logger.warning("Circuito del LLM abierto; respuesta degradada desde la caché")
+        return Generation(text=stale, model=None, error=None, repairs=0, degraded=True)
+
+    async def _generate_validated(self, prompt: str, input_text: str, from_lang: str) -> "Generation":
+        """
+        Genera con el modelo que elija el enrutador y valida la salida con el
+        parser del proyecto. Si falla, pide al modelo fuerte que corrija sólo la
+        construcción afectada, hasta max_repairs veces.
+        """
+        model_name = self.router.choose(input_text)
+        text = await self._first_draft(prompt, input_text, from_lang, model_name)
+        error = await self._validate(text, from_lang)
+
+        repairs = 0
+        while error is not None and error != UNVALIDATED and text and repairs < self.max_repairs:
+            model_name = self.router.escalate(model_name) or model_name
+            request = build_repair(text, error, from_lang)
+            logger.info(f"Salida inválida ({error}); reparando líneas {request.start}-{request.end} con {model_name}")
+            try:
+                fragment = await self._generate_content(request.prompt, model_name)
+            except CircuitOpenError:
+                # Mejor la salida sin reparar que ninguna
+                break
+            text = apply_repair(text, request, fragment).strip()
+            repairs += 1
+            self.repair_calls += 1
+            error = await self._validate(text, from_lang)
+
+        if error == UNVALIDATED:
+            self.unvalidated += 1
+        elif error is not None:
+            self.repair_failures += 1
+        return Generation(text=text, model=model_name, error=error, repairs=repairs)
+
+    async def _first_draft(self, prompt: str, input_text: str, from_lang: str, model_name: str) -> str:
+        """
+        Primera salida del modelo: dentro de un lote si está activado y la
+        descripción no trae delimitadores de lote; si no, con su propio prompt.
+        """
+        if self.batch_enabled and batchable(input_text):
+            text = await self._batcher(from_lang, model_name).submit(input_text)
+            if text is not None:
+                return text
+        # A veces Gemini devuelve texto con contenido adicional; limpiamos espacios extra
+        return (await self._generate_content(prompt, model_name)).strip()
+
+    def _batcher(self, from_lang: str, model_name: str) -> MicroBatcher:
+        """Lote abierto por tipo de salida y modelo, uno por event loop"""
+        loop = asyncio.get_running_loop()
+        if self._batchers_loop is not loop:
+            self._batchers = {}
+            self._batchers_loop = loop
+        key = (from_lang, model_name)
+        batcher = self._batchers.get(key)
+        if batcher is None:
+            batcher = MicroBatcher(
+                lambda descriptions: self._flush_batch(from_lang, model_name, descriptions),
+                self.batch_window_seconds,
+                self.batch_max_items
+            )
+            self._batchers[key] = batcher
+        return batcher
+
+    async def _flush_batch(self, from_lang: str, model_name: str, descriptions: List[str]) -> List[Optional[str]]:
+        """
+        Una llamada para todas las descripciones del lote. Las respuestas que
+        faltan o no pasan el parser se reenvían (sólo ellas) hasta
+        batch_max_resends veces. None indica al llamador que use su propio
+        prompt: lotes de un solo elemento o ids que el modelo nunca devolvió.
+        """
+        unique = list(dict.fromkeys(descriptions))
+        results: Dict[str, Optional[str]] = dict.fromkeys(unique)
+        if len(unique) < 2:
+            return [None] * len(descriptions)
+
+        instructions = NORMALIZE_INSTRUCTIONS if from_lang == "pseudocode" else PYTHON_INSTRUCTIONS
+        pending = unique
+        for attempt in range(self.batch_max_resends + 1):
+            if len(pending) < 2:
+                break
+            items = [(str(position + 1), description) for position, description in enumerate(pending)]
+            try:
+                response = await self._generate_content(build_batch_prompt(instructions, items), model_name)
+            except Exception as e:
+                if attempt == 0:
+                    raise
+                logger.warning(f"Reenvío del lote fallido; se sigue con cada descripción por separado: {e}")
+                break
+            self.batch_calls += 1
+            self.batched_items += len(items)
+            if attempt > 0:
+                self.batch_resent_items += len(items)
+
+            parts = split_batch_response(response)
+            answered = [(description, parts[item_id]) for item_id, description in items if item_id in parts]
+            errors = await asyncio.gather(*(self._validate(text, from_lang) for _, text in answered))
+            for (description, text), error in zip(answered, errors):
+                results[description] = text
+            # Sin validar no se reenvía: el llamador vuelve a validar la salida
+            valid = {description for (description, _), error in zip(answered, errors) if error in (None, UNVALIDATED)}
+            pending = [description for description in pending if description not in valid]
+            if pending:
+                logger.info(f"Lote de {len(items)}: {len(pending)} respuestas ausentes o inválidas")
+
+        return [results[description] for description in descriptions]
+
+    def batch_stats(self) -> Dict:
+        return {
+            "enabled": self.batch_enabled,
+            "window_ms": self.batch_window_seconds * 1000,
+            "max_items": self.batch_max_items,
+            "batch_calls": self.batch_calls,
+            "batched_items": self.batched_items,
+            "resent_items": self.batch_resent_items
+        }
+
+    async def _validate(self, text: str, from_lang: str) -> Optional[str]:
+        """
+        Valida la salida con PythonToIR o PseudocodeParser fuera del event loop.
+
+        Returns:
+            None si es válida, el error del parser, o UNVALIDATED si la cola de
+            parsing está llena (la salida no se repara ni se cachea)
+        """
+        try:
+            execution = await parse_executor.run(validate_source, text, from_lang)
+        except QueueFullError:
+            return UNVALIDATED
+        return execution.value
+
+    def repair_stats(self) -> Dict:
+        return {
+            "max_repairs": self.max_repairs,
+            "repair_calls": self.repair_calls,
+            "unrepaired": self.repair_failures,
+            "unvalidated": self.unvalidated
+        }
+
+    def breaker_stats(self) -> Dict:
+        return {**self.breaker.stats(), "degraded_responses": self.degraded_responses}
+
+    async def stream_normalize_to_pseudocode(self, natural_language: str) -> AsyncIterator[str]:
+        """Igual que normalize_to_pseudocode, pero entrega el texto por fragmentos"""
+        cache_key = self._cache_key("normalize", NORMALIZE_PROMPT_VERSION, natural_language)
+        prompt = build_normalize_prompt(natural_language)
+        async for chunk in self._stream_cached(cache_key, "normalize", prompt, natural_language):
+            yield chunk
+
+    async def stream_python_code(self, natural_language: str) -> AsyncIterator[str]:
+        """Igual que generate_python_code, pero entrega el código por fragmentos"""
+        cache_key = self._cache_key("python", PYTHON_PROMPT_VERSION, natural_language)
+        prompt = build_python_prompt(natural_language)
+        async for chunk in self._stream_cached(cache_key, "python", prompt, natural_language):
+            yield chunk
+
+    async def _stream_cached(self, cache_key: str, kind: str, prompt: str, input_text: str) -> AsyncIterator[str]:
+        """
+        Sirve desde la caché si existe; si no, retransmite los fragmentos del
+        modelo y, al terminar, guarda la respuesta completa sólo si pasa el
+        parser, igual que las variantes validadas. En streaming no hay
+        escalado: los fragmentos ya enviados no se pueden retirar.
+        """
+        template = self._from_template(input_text, kind)
+        if template is not None:
+            yield template.text
+            return
+
+        cached = await self.cache.aget(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+        model_name = self.router.choose(input_text)
+        parts = []
+        try:
+            async for chunk in self._stream_content(prompt, model_name):
+                parts.append(chunk)
+                yield chunk
+        except CircuitOpenError as e:
+            # El circuito se comprueba antes del primer fragmento
+            fallback = await self._degraded(cache_key, e)
+        else:
+            fallback = None
+        if fallback is not None:
+            yield fallback.text
+            return
+
+        text = "".join(parts)
+        if kind == "python":
+            text = text.strip()
+        if not text.strip():
+            return
+        error = await self._validate(text, "python" if kind == "python" else "pseudocode")
+        if error is None:
+            await self.cache.aput(cache_key, text, kind=kind, model=model_name)
+        else:
+            logger.info(f"Salida en streaming no cacheada ({error})")
+
+    async def _generate_content(self, prompt: str, model_name: str) -> str:
         """
         Método helper: usa Gemini de forma asíncrona sin bloquear FastAPI.
+
+        Las llamadas concurrentes con el mismo prompt comparten una sola
+        petición al modelo (single-flight). Si un llamador se cancela, la
+        petición compartida sigue para los demás; solo se cancela cuando ya no
+        queda nadie esperándola.
+        """
+        key = model_name + ":" + hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        flight = self._inflight.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(self._call_model(prompt, model_name)))
+            self._inflight[key] = flight
+            flight.task.add_done_callback(lambda task: self._finish_flight(key, flight))
+        else:
+            self.coalesced_calls += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _finish_flight(self, key: str, flight: "_Flight") -> None:
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+        # Marcar la excepción como consumida aunque todos los llamadores se hayan ido
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+    async def _call_model(self, prompt: str, model_name: str) -> str:
         """
+        Una única petición al modelo con el cliente asíncrono nativo.
+
+        El semáforo limita las peticiones upstream simultáneas y el deadline
+        cubre tanto la espera por el semáforo como la llamada. Al vencer, la
+        cancelación llega hasta la llamada gRPC en curso. La latencia observada
+        alimenta al enrutador y el resultado al circuit breaker, que rechaza la
+        llamada sin esperar si el circuito está abierto. Si el deadline vence
+        antes de obtener el semáforo la saturación es local y no cuenta como
+        fallo del upstream.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout_seconds
+
+        self.breaker.before_call()
+        semaphore = self._limiter()
         try:
-            def _call():
-                resp = self.model.generate_content(prompt)
-                return resp.text if hasattr(resp, "text") else ""
-            return await asyncio.to_thread(_call)
+            await asyncio.wait_for(semaphore.acquire(), timeout=self.timeout_seconds)
+        except asyncio.TimeoutError:
+            # Saturación local: no dice nada del upstream
+            self.breaker.release()
+            raise LLMTimeoutError(f"Gemini did not respond within {self.timeout_seconds}s")
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+
+        self.inflight_calls += 1
+        started = time.perf_counter()
+        try:
+            resp = await asyncio.wait_for(
+                self._get_model(model_name).generate_content_async(prompt),
+                timeout=max(deadline - loop.time(), 0)
+            )
+        except asyncio.TimeoutError:
+            self.router.record(model_name, self.timeout_seconds)
+            self.breaker.record(False, self.timeout_seconds)
+            llm_call_seconds.observe(self.timeout_seconds, model=model_name, outcome="timeout")
+            logger.error(f"Gemini ({model_name}) no respondió en {self.timeout_seconds}s")
+            raise LLMTimeoutError(f"Gemini did not respond within {self.timeout_seconds}s")
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
         except Exception as e:
+            elapsed = time.perf_counter() - started
+            self.breaker.record(False, elapsed)
+            llm_call_seconds.observe(elapsed, model=model_name, outcome="error")
             logger.error(f"Error en la generación de contenido: {e}")
             raise
+        finally:
+            self.inflight_calls -= 1
+            semaphore.release()
+        elapsed = time.perf_counter() - started
+        self.router.record(model_name, elapsed)
+        self.breaker.record(True, elapsed)
+        llm_call_seconds.observe(elapsed, model=model_name, outcome="ok")
+        return resp.text if hasattr(resp, "text") else ""
+
+    def _limiter(self) -> asyncio.Semaphore:
+        """Semáforo de concurrencia upstream, uno por event loop"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _stream_content(self, prompt: str, model_name: str) -> AsyncIterator[str]:
+        """
+        Petición en streaming al modelo. No se comparte entre llamadores: cada
+        cliente recibe sus propios fragmentos. El deadline cubre la espera por
+        el semáforo y la respuesta completa, y se comprueba en cada fragmento.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout_seconds
+
+        def remaining() -> float:
+            return max(deadline - loop.time(), 0)
+
+        self.breaker.before_call()
+        semaphore = self._limiter()
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=remaining())
+        except asyncio.TimeoutError:
+            # Saturación local: no dice nada del upstream
+            self.breaker.release()
+            raise LLMTimeoutError(f"Gemini did not respond within {self.timeout_seconds}s")
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+
+        self.inflight_calls += 1
+        started = time.perf_counter()
+        recorded = False
+        try:
+            response = await asyncio.wait_for(
+                self._get_model(model_name).generate_content_async(prompt, stream=True), timeout=remaining()
+            )
+            iterator = response.__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(iterator.__anext__(), timeout=remaining())
+                except StopAsyncIteration:
+                    break
+                text = chunk.text if hasattr(chunk, "text") else ""
+                if text:
+                    yield text
+            elapsed = time.perf_counter() - started
+            self.router.record(model_name, elapsed)
+            self.breaker.record(True, elapsed)
+            llm_call_seconds.observe(elapsed, model=model_name, outcome="ok")
+            recorded = True
+        except asyncio.TimeoutError:
+            self.router.record(model_name, self.timeout_seconds)
+            self.breaker.record(False, self.timeout_seconds)
+            llm_call_seconds.observe(self.timeout_seconds, model=model_name, outcome="timeout")
+            recorded = True
+            logger.error(f"Gemini no completó el streaming en {self.timeout_seconds}s")
+            raise LLMTimeoutError(f"Gemini did not respond within {self.timeout_seconds}s")
+        except Exception:
+            elapsed = time.perf_counter() - started
+            self.breaker.record(False, elapsed)
+            llm_call_seconds.observe(elapsed, model=model_name, outcome="error")
+            recorded = True
+            raise
+        finally:
+            if not recorded:
+                # El cliente cerró el stream antes de terminar
+                self.breaker.release()
+            self.inflight_calls -= 1
+            semaphore.release()
+
+
+class Generation(NamedTuple):
+    """Salida validada del modelo"""
+    text: str
+    model: Optional[str]  # None si vino de la caché
+    error: Optional[str]  # None si pasa el parser
+    repairs: int
+    degraded: bool = False  # Respuesta local con el circuito del LLM abierto
+
+
+class _Flight:
+    """Petición en vuelo compartida por todos los llamadores con el mismo prompt"""
+
+    def __init__(self, task: "asyncio.Future[str]"):
+        self.task = task
+        self.waiters = 0
+
 
 # Instancia global
 gemini_service = GeminiService()
@@ -0,0 +1,82 @@
+"""
+Detección del tipo de entrada (pseudocódigo, Python o lenguaje natural).
+
+Una sola pasada por las líneas acumula señales fuertes de cada tipo, sin
+intentar parsear ni llamar al LLM:
+- Pseudocódigo: 🡨, líneas begin/end, for ... to ... do, then, CALL, ►
+- Python: def/class con ':', bloques con ':' e indentación, ==, range(, import
+- Lenguaje natural: frases con palabras vacías y puntuación de texto
+"""
+from typing import Dict
+
+from app.models.schemas import InputType
+
+ARROW = "🡨"
+
+PSEUDOCODE_LINE_STARTS = ("for ", "while ", "if ", "repeat", "until", "procedimiento ", "CALL ", "►")
+PYTHON_LINE_STARTS = ("def ", "class ", "import ", "from ", "elif ", "else:", "return ", "print(", "@")
+PYTHON_BLOCK_STARTS = ("for ", "while ", "if ", "elif ", "else", "def ", "class ", "try", "except", "with ")
+STOPWORDS = frozenset("""
+a al algoritmo con cual cuando de del dado dada el en es esta este la las lo los
+para por que se si su sus un una uno y an and of the that this to with which
+""".split())
+
+# Puntuación mínima para aceptar un tipo de código
+MIN_CODE_SCORE = 2
+
+
+def score_input(content: str) -> Dict[str, int]:
+    """Puntuación de cada tipo en una sola pasada"""
+    pseudocode = python = natural = 0
+    if ARROW in content:
+        pseudocode += 3
+
+    previous_opens_block = False
+    for raw in content.split("\n"):
+        line = raw.strip()
+        if not line:
+            continue
+        indented = raw[:1] in (" ", "\t")
+
+        if line in ("begin", "end") or line.startswith("end ") or line.endswith(" begin"):
+            pseudocode += 2
+        if line.startswith(PSEUDOCODE_LINE_STARTS):
+            if line.endswith(" do") or line.endswith(" then") or "CALL " in line or line.startswith("►"):
+                pseudocode += 2
+
+        if line.startswith(PYTHON_LINE_STARTS):
+            strong = line.startswith(("def ", "class ", "elif ", "import ")) or " import " in line
+            python += 2 if strong else 1
+        opens_block = line.endswith(":") and line.startswith(PYTHON_BLOCK_STARTS)
+        if opens_block:
+            python += 1
+        if previous_opens_block and indented:
+            python += 1
+        previous_opens_block = opens_block
+        if "==" in line or "range(" in line or "self." in line or "+=" in line or " = " in line:
+            python += 1
+
+        words = line.split()
+        if len(words) >= 4:
+            stop = sum(1 for word in words if word.lower().strip(",.;:¿?¡!") in STOPWORDS)
+            if stop * 4 >= len(words):
+                natural += 1
+            if line[-1] in ".?!" or (line[0].isupper() and "(" not in line):
+                natural += 1
+
+    return {
+        InputType.PSEUDOCODE.value: pseudocode,
+        InputType.PYTHON.value: python,
+        InputType.NATURAL_LANGUAGE.value: natural
+    }
+
+
+def detect_input_type(content: str) -> InputType:
+    """Tipo más probable de la entrada; lenguaje natural si no hay señales de código"""
+    scores = score_input(content)
+    pseudocode = scores[InputType.PSEUDOCODE.value]
+    python = scores[InputType.PYTHON.value]
+    code = max(pseudocode, python)
+    if code < MIN_CODE_SCORE or scores[InputType.NATURAL_LANGUAGE.value] > code:
+        return InputType.NATURAL_LANGUAGE
+    return InputType.PSEUDOCODE if pseudocode >= python else InputType.PYTHON
@@ -0,0 +1,121 @@
+"""
+Micro-batching de peticiones al LLM.
+
+Las descripciones que llegan en una ventana corta se agrupan en un único prompt
+con bloques delimitados por id:
+
+    <<<ITEM 1>>>
+    descripción
+    <<<END 1>>>
+
+El modelo responde con los mismos delimitadores y cada respuesta vuelve a su
+llamador. Así una importación masiva hace una llamada por lote en vez de una
+por descripción.
+
+Una descripción que contiene los delimitadores podría cerrar su bloque y
+dirigir la respuesta de otro; esas descripciones nunca entran en un lote.
+"""
+import asyncio
+import logging
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+_ITEM_RE = re.compile(r"<<<ITEM (\w+)>>>[ \t]*\n?(.*?)\n?[ \t]*<<<END \1>>>", re.DOTALL)
+_FENCE_RE = re.compile(r"^```[a-zA-Z]*\s*$")
+_MARKER_RE = re.compile(r"<<<\s*(ITEM|END)\b", re.IGNORECASE)
+
+
+def batchable(description: str) -> bool:
+    """False si la descripción contiene delimitadores de lote"""
+    return _MARKER_RE.search(description) is None
+
+
+def build_batch_prompt(instructions: str, items: Sequence[Tuple[str, str]]) -> str:
+    """
+    Prompt con las instrucciones del tipo de salida y cada (id, descripción) delimitada.
+
+    Raises:
+        ValueError: Si alguna descripción contiene delimitadores de lote
+    """
+    for item_id, description in items:
+        if not batchable(description):
+            raise ValueError(f"Batch item {item_id} contains batch delimiters")
+    blocks = "\n".join(f"<<<ITEM {item_id}>>>\n{description.strip()}\n<<<END {item_id}>>>"
+                       for item_id, description in items)
+    return instructions + f"""
+Recibirás VARIAS descripciones, cada una entre <<<ITEM id>>> y <<<END id>>>.
+Aplica las reglas anteriores a CADA una por separado y responde con un bloque
+por descripción, con el mismo id, en este formato exacto:
+
+<<<ITEM id>>>
+(respuesta para esa descripción)
+<<<END id>>>
+
+No escribas nada fuera de los bloques. No omitas ningún id.
+
+DESCRIPCIONES:
+{blocks}
+"""
+
+
+def split_batch_response(text: str) -> Dict[str, str]:
+    """Respuesta de cada id; los bloques ausentes o vacíos no aparecen"""
+    parts = {}
+    for match in _ITEM_RE.finditer(text):
+        lines = [line for line in match.group(2).split("\n") if not _FENCE_RE.match(line.strip())]
+        body = "\n".join(lines).strip()
+        if body:
+            parts[match.group(1)] = body
+    return parts
+
+
+class MicroBatcher:
+    """
+    Agrupa los envíos de una ventana de window_seconds (o hasta max_items) y los
+    entrega juntos a flush, que devuelve un resultado por elemento y en orden.
+    Un error de flush llega a todos los llamadores del lote.
+    """
+
+    def __init__(self, flush: Callable[[List[Any]], Awaitable[List[Any]]], window_seconds: float, max_items: int):
+        self.flush = flush
+        self.window_seconds = window_seconds
+        self.max_items = max(max_items, 1)
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_items:
+            self._flush_pending()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._flush_pending)
+        return await future
+
+    def _flush_pending(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            # Referencia fuerte hasta que termine
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        try:
+            results = await self.flush([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            # Los llamadores cancelados ya tienen su future resuelto
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,214 @@
+"""
+Caché persistente de respuestas del LLM sobre SQLite.
+
+La clave combina el tipo de prompt, la versión de la plantilla, el modelo y la
+descripción normalizada (sin distinguir mayúsculas ni espacios), así que una
+misma petición redactada con otro formato reutiliza la respuesta guardada.
+
+La base usa WAL: varios workers (procesos) pueden leer a la vez mientras uno
+escribe. La expiración es por TTL y, al superar el máximo de entradas, se
+eliminan las de acceso más antiguo (LRU).
+
+Desde el event loop se usan aget/aput: la E/S de SQLite (que puede esperar
+hasta el timeout de bloqueo) corre en un pool de hilos propio y pequeño, así
+el número de conexiones abiertas queda acotado.
+"""
+import asyncio
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Dict, Optional
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+# No se reescribe last_access en cada lectura: basta con esta granularidad
+TOUCH_INTERVAL_SECONDS = 60
+
+# La poda LRU se hace cada cierto número de escrituras, no en todas
+EVICT_EVERY_PUTS = 32
+
+# Hilos dedicados a la E/S de la caché (una conexión SQLite por hilo)
+IO_THREADS = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access);
+"""
+
+
+def normalize_description(text: str) -> str:
+    """Pliega mayúsculas y colapsa espacios para comparar descripciones"""
+    return _WHITESPACE.sub(" ", text.casefold()).strip()
+
+
+class LLMCache:
+    """Caché SQLite con TTL y poda LRU; las conexiones son por hilo"""
+
+    def __init__(self, path: Path, ttl_seconds: int, max_entries: int, enabled: bool = True):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        self._stats_lock = threading.Lock()
+        self._puts = 0
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(kind: str, template_version: str, model: str, description: str) -> str:
+        raw = "\x1f".join([kind, template_version, model, normalize_description(description)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=1.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with self._init_lock:
+            if not self._initialized:
+                conn.executescript(_SCHEMA)
+                self._initialized = True
+        self._local.conn = conn
+        return conn
+
+    def _count(self, hit: bool) -> None:
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str, allow_stale: bool = False) -> Optional[str]:
+        """
+        Devuelve la respuesta guardada o None. Nunca lanza excepciones.
+        Las entradas expiradas no se borran aquí sino en evict(), para que
+        allow_stale pueda servirlas mientras el LLM no esté disponible.
+        """
+        if not self.enabled:
+            return None
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT response, created_at, last_access FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            now = time.time()
+            if row is None:
+                self._count(False)
+                return None
+            response, created_at, last_access = row
+            if self.ttl_seconds > 0 and now - created_at > self.ttl_seconds:
+                self._count(allow_stale)
+                return response if allow_stale else None
+            if now - last_access > TOUCH_INTERVAL_SECONDS:
+                conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._count(True)
+            return response
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            self._count(False)
+            return None
+
+    def put(self, key: str, response: str, kind: str = "", model: str = "") -> None:
+        """Guarda una respuesta. Los errores de la caché nunca llegan al cliente."""
+        if not self.enabled:
+            return
+        try:
+            conn = self._connect()
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, kind, model, response, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, kind, model, response, now, now)
+            )
+            with self._stats_lock:
+                self._puts += 1
+                evict = self._puts % EVICT_EVERY_PUTS == 0
+            if evict:
+                self.evict()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    def evict(self) -> None:
+        """Elimina entradas expiradas y, si sobran, las menos usadas recientemente"""
+        conn = self._connect()
+        if self.ttl_seconds > 0:
+            conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        (count,) = conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                (excess,)
+            )
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._init_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=IO_THREADS, thread_name_prefix="llm-cache")
+            return self._pool
+
+    async def aget(self, key: str, allow_stale: bool = False) -> Optional[str]:
+        """get() fuera del event loop"""
+        if not self.enabled:
+            return None
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor(), partial(self.get, key, allow_stale)
+        )
+
+    async def aput(self, key: str, response: str, kind: str = "", model: str = "") -> None:
+        """put() (y la poda periódica) fuera del event loop"""
+        if not self.enabled:
+            return
+        await asyncio.get_running_loop().run_in_executor(
+            self._executor(), partial(self.put, key, response, kind, model)
+        )
+
+    def clear(self) -> None:
+        if self.enabled:
+            self._connect().execute("DELETE FROM responses")
+        with self._stats_lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
+
+
+# Instancia global (la base se abre en el primer uso)
+llm_cache = LLMCache(
+    path=Path(settings.DATA_DIR) / "llm_cache.sqlite3",
+    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    enabled=settings.LLM_CACHE_ENABLED
+)
@@ -0,0 +1,105 @@
+"""
+Reparación dirigida de salidas del LLM que no pasan el parser del proyecto.
+
+En lugar de regenerar todo el programa, se envía al modelo sólo la construcción
+donde falló el parser junto con el error y su ubicación, y se sustituye el
+fragmento corregido en el texto original.
+"""
+import re
+from typing import List, NamedTuple, Optional, Tuple
+
+_LINE_RE = re.compile(r"\bline (\d+)")
+_FENCE_RE = re.compile(r"^```[a-zA-Z]*\s*$")
+
+LANGUAGE_NAMES = {"python": "Python", "pseudocode": "pseudocódigo"}
+
+
+class RepairRequest(NamedTuple):
+    """Prompt de reparación y rango de líneas (1-based, inclusivo) que sustituye"""
+    prompt: str
+    start: int
+    end: int
+
+
+def error_line(message: str) -> Optional[int]:
+    """Línea del error según el mensaje de PythonToIR / PseudocodeParser"""
+    match = _LINE_RE.search(message)
+    return int(match.group(1)) if match else None
+
+
+def _indent(line: str) -> int:
+    return len(line) - len(line.lstrip())
+
+
+def offending_span(lines: List[str], line_no: int, from_lang: str) -> Tuple[int, int]:
+    """
+    Rango de la construcción que contiene la línea del error: la línea, las
+    siguientes más indentadas (su cuerpo) y, en pseudocódigo, un bloque
+    begin ... end que empiece justo después.
+    """
+    start = min(max(line_no, 1), len(lines))
+    base = _indent(lines[start - 1])
+    end = start
+    while end < len(lines) and (not lines[end].strip() or _indent(lines[end]) > base):
+        end += 1
+
+    if from_lang == "pseudocode" and end < len(lines) and lines[end].strip() == "begin":
+        depth = 0
+        for i in range(end, len(lines)):
+            word = lines[i].strip()
+            if word == "begin":
+                depth += 1
+            elif word == "end":
+                depth -= 1
+                if depth == 0:
+                    end = i + 1
+                    break
+        else:
+            end = len(lines)
+
+    # No incluir líneas vacías al final del fragmento
+    while end > start and not lines[end - 1].strip():
+        end -= 1
+    return start, end
+
+
+def build_repair(text: str, error: str, from_lang: str) -> RepairRequest:
+    """
+    Prompt con sólo el fragmento problemático. Si el error no indica línea,
+    el fragmento es el programa completo.
+    """
+    lines = text.split("\n")
+    line_no = error_line(error)
+    if line_no is None:
+        start, end = 1, len(lines)
+    else:
+        start, end = offending_span(lines, line_no, from_lang)
+
+    language = LANGUAGE_NAMES.get(from_lang, from_lang)
+    fragment = "\n".join(lines[start - 1:end])
+    # Recordatorio mínimo de la gramática (🡨 es U+1F86A)
+    grammar = "\nUsa la gramática del proyecto: asignación con 🡨, bloques begin ... end." if from_lang == "pseudocode" else ""
+    prompt = f"""
+El siguiente fragmento (líneas {start}-{end}) de un programa en {language} no es válido.
+Error del parser: {error}{grammar}
+
+Devuelve SOLO el fragmento corregido, con la misma indentación, sin explicaciones ni markdown.
+
+{fragment}
+"""
+    return RepairRequest(prompt=prompt, start=start, end=end)
+
+
+def apply_repair(text: str, request: RepairRequest, fragment: str) -> str:
+    """Sustituye las líneas del RepairRequest por el fragmento corregido"""
+    new_lines = [line for line in fragment.strip("\n").split("\n") if not _FENCE_RE.match(line.strip())]
+    lines = text.split("\n")
+
+    # Si el modelo quitó la indentación del fragmento, se restaura
+    original_indent = _indent(lines[request.start - 1])
+    present = [_indent(line) for line in new_lines if line.strip()]
+    if original_indent and present and min(present) == 0:
+        pad = lines[request.start - 1][:original_indent]
+        new_lines = [pad + line if line.strip() else line for line in new_lines]
+
+    return "\n".join(lines[:request.start - 1] + new_lines + lines[request.end:])
@@ -0,0 +1,174 @@
+"""
+Cliente de la API REST de Gemini (generateContent) contra una URL base.
+
+Con LLM_BASE_URL definida, GeminiService usa RestModel en lugar del SDK de
+google-generativeai: así se puede apuntar el servicio a un sustituto local
+(loadtest/fake_llm.py) o a un proxy que hable el mismo protocolo. El SDK
+asíncrono sólo habla gRPC con TLS y no admite esos destinos.
+
+El cliente HTTP/1.1 es mínimo y sólo usa la biblioteca estándar: una conexión
+por petición, cuerpo con Content-Length, respuestas con Content-Length,
+chunked o cerradas por el servidor.
+"""
+import asyncio
+import json
+import ssl
+from typing import Any, AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+
+class LLMHTTPError(Exception):
+    """El upstream respondió con un estado HTTP de error"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+
+
+class HTTPResponse:
+    """Respuesta HTTP cuyo cuerpo se lee bajo demanda"""
+
+    def __init__(self, status: int, headers: Dict[str, str], reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter):
+        self.status = status
+        self.headers = headers
+        self._reader = reader
+        self._writer = writer
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        try:
+            if "chunked" in self.headers.get("transfer-encoding", "").lower():
+                while True:
+                    size = int((await self._reader.readline()).split(b";")[0].strip() or b"0", 16)
+                    if size == 0:
+                        break
+                    yield await self._reader.readexactly(size)
+                    await self._reader.readline()
+            elif "content-length" in self.headers:
+                remaining = int(self.headers["content-length"])
+                while remaining > 0:
+                    data = await self._reader.read(min(remaining, 65536))
+                    if not data:
+                        raise ConnectionError("Connection closed before the end of the body")
+                    remaining -= len(data)
+                    yield data
+            else:
+                while True:
+                    data = await self._reader.read(65536)
+                    if not data:
+                        break
+                    yield data
+        finally:
+            self.close()
+
+    async def read(self) -> bytes:
+        return b"".join([chunk async for chunk in self.chunks()])
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+async def post(url: str, body: bytes, headers: Optional[Dict[str, str]] = None) -> HTTPResponse:
+    """POST a url; devuelve la respuesta tras leer la cabecera"""
+    parts = urlsplit(url)
+    secure = parts.scheme == "https"
+    port = parts.port or (443 if secure else 80)
+    reader, writer = await asyncio.open_connection(
+        parts.hostname, port,
+        ssl=ssl.create_default_context() if secure else None,
+        server_hostname=parts.hostname if secure else None
+    )
+    target = parts.path or "/"
+    if parts.query:
+        target += f"?{parts.query}"
+    lines = [
+        f"POST {target} HTTP/1.1",
+        f"Host: {parts.netloc}",
+        "Connection: close",
+        f"Content-Length: {len(body)}"
+    ] + [f"{name}: {value}" for name, value in (headers or {}).items()]
+    try:
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("Empty response from upstream")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+    except BaseException:
+        writer.close()
+        raise
+    return HTTPResponse(status, response_headers, reader, writer)
+
+
+def candidate_text(payload: Dict[str, Any]) -> str:
+    """Texto de la primera candidata de una respuesta de generateContent"""
+    candidates = payload.get("candidates") or []
+    if not candidates:
+        return ""
+    parts = (candidates[0].get("content") or {}).get("parts") or []
+    return "".join(part.get("text", "") for part in parts)
+
+
+class RestResponse:
+    """Lo que usa GeminiService de una respuesta del SDK: .text"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class RestStream:
+    """Fragmentos de streamGenerateContent (SSE) como RestResponse"""
+
+    def __init__(self, response: HTTPResponse):
+        self._response = response
+
+    async def __aiter__(self) -> AsyncIterator[RestResponse]:
+        buffer = b""
+        async for data in self._response.chunks():
+            buffer += data
+            while b"\n" in buffer:
+                line, buffer = buffer.split(b"\n", 1)
+                line = line.strip()
+                if line.startswith(b"data:"):
+                    yield RestResponse(candidate_text(json.loads(line[5:])))
+
+
+class RestModel:
+    """Modelo con la misma interfaz que genai.GenerativeModel.generate_content_async"""
+
+    def __init__(self, base_url: str, model_name: str, api_key: str = ""):
+        self.base_url = base_url.rstrip("/")
+        self.model_name = model_name
+        self.api_key = api_key
+
+    def _url(self, method: str) -> str:
+        return f"{self.base_url}/v1beta/models/{self.model_name}:{method}"
+
+    async def _post(self, url: str, prompt: str) -> HTTPResponse:
+        body = json.dumps({"contents": [{"role": "user", "parts": [{"text": prompt}]}]}).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["x-goog-api-key"] = self.api_key
+        response = await post(url, body, headers)
+        if response.status >= 400:
+            detail = (await response.read()).decode("utf-8", "replace")
+            try:
+                detail = json.loads(detail)["error"]["message"]
+            except (ValueError, KeyError, TypeError):
+                pass
+            raise LLMHTTPError(response.status, detail)
+        return response
+
+    async def generate_content_async(self, prompt: str, stream: bool = False):
+        if stream:
+            return RestStream(await self._post(self._url("streamGenerateContent") + "?alt=sse", prompt))
+        response = await self._post(self._url("generateContent"), prompt)
+        return RestResponse(candidate_text(json.loads(await response.read())))
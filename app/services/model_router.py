@@ -0,0 +1,163 @@
+"""
+Enrutador adaptativo entre un modelo rápido y uno fuerte.
+
+Cada petición va por defecto al modelo rápido. Se usa el fuerte cuando la
+entrada es larga o cuando la latencia p95 observada del rápido incumple el SLO
+y el fuerte está respondiendo mejor. Si la salida del rápido no pasa la
+validación del proyecto, el servicio escala al modelo fuerte.
+
+Para que el rápido pueda recuperarse mientras no recibe tráfico, las muestras
+caducan con la edad y una de cada `probe_every` peticiones desviadas se envía
+igualmente al rápido como sonda.
+"""
+import math
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+from app.config.settings import settings
+
+
+class LatencyTracker:
+    """
+    Ventana deslizante de latencias (en segundos) de un modelo. Las muestras
+    más antiguas que max_age_seconds se descartan (0 = sin caducidad).
+    """
+
+    def __init__(self, window: int, max_age_seconds: float = 0.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self._samples: Deque[Tuple[float, float]] = deque(maxlen=window)
+        self.max_age_seconds = max_age_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def _expire(self) -> None:
+        if self.max_age_seconds <= 0:
+            return
+        oldest = self._clock() - self.max_age_seconds
+        while self._samples and self._samples[0][0] < oldest:
+            self._samples.popleft()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append((self._clock(), seconds))
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Percentil q (0-100) por rango más cercano; None sin muestras"""
+        with self._lock:
+            self._expire()
+            if not self._samples:
+                return None
+            ordered = sorted(seconds for _, seconds in self._samples)
+        rank = max(math.ceil(q / 100 * len(ordered)) - 1, 0)
+        return ordered[rank]
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire()
+            return len(self._samples)
+
+
+class ModelRouter:
+    """Decide qué modelo atiende cada petición"""
+
+    def __init__(
+        self,
+        fast_model: str,
+        strong_model: str,
+        latency_slo_seconds: float,
+        long_input_chars: int,
+        window: int = 100,
+        sample_max_age_seconds: float = 0.0,
+        probe_every: int = 0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.fast_model = fast_model
+        self.strong_model = strong_model
+        self.latency_slo_seconds = latency_slo_seconds
+        self.long_input_chars = long_input_chars
+        self.probe_every = probe_every
+        self._latencies: Dict[str, LatencyTracker] = {
+            fast_model: LatencyTracker(window, sample_max_age_seconds, clock),
+            strong_model: LatencyTracker(window, sample_max_age_seconds, clock)
+        }
+        self.routed = {fast_model: 0, strong_model: 0}
+        self.escalations = 0
+        self.probes = 0
+        self._diverted = 0
+        self._lock = threading.Lock()
+
+    @property
+    def namespace(self) -> str:
+        """Identifica la configuración de modelos (forma parte de la clave de caché)"""
+        return f"{self.fast_model}|{self.strong_model}"
+
+    def p95(self, model: str) -> Optional[float]:
+        return self._latencies[model].percentile(95)
+
+    def choose(self, input_text: str) -> str:
+        """Modelo para una entrada nueva"""
+        model = self.fast_model
+        if len(input_text) >= self.long_input_chars:
+            model = self.strong_model
+        else:
+            fast_p95 = self.p95(self.fast_model)
+            strong_p95 = self.p95(self.strong_model)
+            if (fast_p95 is not None and fast_p95 > self.latency_slo_seconds
+                    and (strong_p95 is None or strong_p95 < fast_p95)):
+                model = self._divert()
+        self.routed[model] += 1
+        return model
+
+    def _divert(self) -> str:
+        """Modelo fuerte por latencia, salvo la sonda periódica al rápido"""
+        with self._lock:
+            self._diverted += 1
+            probe = self.probe_every > 0 and self._diverted % self.probe_every == 0
+            if probe:
+                self.probes += 1
+        return self.fast_model if probe else self.strong_model
+
+    def escalate(self, model: str) -> Optional[str]:
+        """
+        Registra un escalado tras una salida inválida de `model` y devuelve el
+        modelo fuerte; None si `model` ya es el fuerte.
+        """
+        if model == self.strong_model:
+            return None
+        self.escalations += 1
+        self.routed[self.strong_model] += 1
+        return self.strong_model
+
+    def record(self, model: str, seconds: float) -> None:
+        tracker = self._latencies.get(model)
+        if tracker is not None:
+            tracker.record(seconds)
+
+    def stats(self) -> Dict:
+        return {
+            "models": {
+                model: {
+                    "requests": self.routed[model],
+                    "samples": len(tracker),
+                    "p95_seconds": tracker.percentile(95)
+                }
+                for model, tracker in self._latencies.items()
+            },
+            "escalations": self.escalations,
+            "probes": self.probes,
+            "latency_slo_seconds": self.latency_slo_seconds
+        }
+
+
+def router_from_settings() -> ModelRouter:
+    return ModelRouter(
+        fast_model=settings.LLM_FAST_MODEL,
+        strong_model=settings.LLM_STRONG_MODEL,
+        latency_slo_seconds=settings.LLM_LATENCY_SLO_SECONDS,
+        long_input_chars=settings.LLM_ROUTER_LONG_INPUT_CHARS,
+        window=settings.LLM_ROUTER_WINDOW,
+        sample_max_age_seconds=settings.LLM_ROUTER_SAMPLE_MAX_AGE_SECONDS,
+        probe_every=settings.LLM_ROUTER_PROBE_EVERY
+    )
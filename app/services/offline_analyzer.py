@@ -0,0 +1,317 @@
+"""
+Análisis offline de directorios con archivos Python y pseudocódigo.
+
+Recorre un árbol de directorios, envía cada archivo al frontend según su
+extensión (PythonToIR o PseudocodeParser) y procesa los archivos en un pool de
+procesos. Una caché de omisión (mtime/tamaño y hash SHA-256) evita volver a
+analizar archivos que no cambiaron entre ejecuciones: sus registros se copian
+de la salida de la ejecución anterior.
+"""
+import hashlib
+import json
+import logging
+import mmap
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from app.core.visitors.complexity import Complexity
+from app.services.ast_service import get_frontend
+
+logger = logging.getLogger(__name__)
+
+PYTHON_EXTENSIONS = (".py",)
+PSEUDOCODE_EXTENSIONS = (".psc", ".pseudo", ".pseudocode")
+
+OUTPUT_FORMATS = ("jsonl", "pickle")
+
+# Directorios que nunca se recorren
+IGNORED_DIRS = {"__pycache__", ".git", ".venv", "venv", "node_modules"}
+
+# Versión del formato de registro: invalida la caché si cambia
+RECORD_VERSION = 2
+
+
+def detect_language(path: Path) -> Optional[str]:
+    """Devuelve 'python', 'pseudocode' o None según la extensión"""
+    suffix = path.suffix.lower()
+    if suffix in PYTHON_EXTENSIONS:
+        return "python"
+    if suffix in PSEUDOCODE_EXTENSIONS:
+        return "pseudocode"
+    return None
+
+
+def discover_files(root: Path) -> Iterator[Tuple[Path, str]]:
+    """Recorre root y produce (ruta, lenguaje) para cada archivo soportado"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in IGNORED_DIRS and not d.startswith("."))
+        for filename in sorted(filenames):
+            path = Path(dirpath) / filename
+            lang = detect_language(path)
+            if lang is not None:
+                yield path, lang
+
+
+def read_source(path: Path) -> Tuple[str, str]:
+    """
+    Lee un archivo con mmap y devuelve (texto, sha256).
+
+    El hash se calcula sobre el mapeo sin copiar el archivo a un buffer
+    intermedio; solo se decodifica una vez.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return "", hashlib.sha256(b"").hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            digest = hashlib.sha256(mm).hexdigest()
+            text = mm[:].decode("utf-8")
+    return text, digest
+
+
+# ============================================================================
+# WORKERS (se ejecutan en el pool de procesos)
+# ============================================================================
+
+def analyze_source(content: str, lang: str) -> Dict[str, Any]:
+    """Construye el IR y la complejidad por función de un fuente"""
+    # Pool de frontends del proceso: la gramática Lark se compila una sola vez
+    program = get_frontend(lang).build(content)
+    return {
+        "ast": program.to_dict(),
+        "complexity": {func.name: Complexity.of(func) for func in program.functions}
+    }
+
+
+def _analyze_task(task: Tuple[str, str, Optional[str]]) -> Dict[str, Any]:
+    """
+    Analiza un archivo. Si su hash coincide con `known_hash` no se parsea y
+    se marca como `unchanged` para reutilizar el registro de la caché.
+    """
+    path, lang, known_hash = task
+    record: Dict[str, Any] = {"path": path, "lang": lang}
+    try:
+        content, digest = read_source(Path(path))
+    except (OSError, UnicodeDecodeError) as e:
+        record.update(ok=False, error=f"read_error: {e}")
+        return record
+
+    record["sha256"] = digest
+    if known_hash is not None and digest == known_hash:
+        record["unchanged"] = True
+        return record
+
+    try:
+        record.update(ok=True, **analyze_source(content, lang))
+    except NotImplementedError as e:
+        record.update(ok=False, error=f"unsupported_syntax: {e}")
+    except SyntaxError as e:
+        record.update(ok=False, error=f"syntax_error: {e}")
+    except Exception as e:
+        record.update(ok=False, error=f"parse_error: {e}")
+    return record
+
+
+# ============================================================================
+# CACHÉ DE OMISIÓN
+# ============================================================================
+
+class SkipCache:
+    """
+    Caché persistente path → {mtime_ns, size, sha256, offset}.
+
+    No guarda los registros: `offset` es la posición del registro del archivo
+    en la salida de la ejecución anterior, que se relee bajo demanda. Si mtime
+    y tamaño coinciden el archivo no se vuelve a leer. Si solo cambió el
+    mtime, el worker compara el hash y evita el parsing. Si la salida anterior
+    ya no existe o tiene otro formato, todo se vuelve a analizar.
+    """
+
+    def __init__(self, path: Optional[Path]):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.output: Optional[str] = None
+        self.fmt: Optional[str] = None
+        self._next: Dict[str, Dict[str, Any]] = {}
+        self._previous = None
+        if path is not None and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                if data.get("version") == RECORD_VERSION:
+                    self.entries = data.get("entries", {})
+                    self.output = data.get("output")
+                    self.fmt = data.get("format")
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable cache {path}: {e}")
+
+    def open_previous(self, fmt: str) -> None:
+        """Abre la salida anterior; sin ella las entradas no sirven"""
+        if self.entries and self.output is not None and self.fmt == fmt:
+            try:
+                self._previous = open(self.output, "rb")
+                return
+            except OSError:
+                pass
+        self.entries = {}
+
+    def record(self, path: str) -> Optional[Dict[str, Any]]:
+        """Registro de path en la salida anterior, o None si no se puede leer"""
+        entry = self.entries.get(path)
+        if entry is None or self._previous is None:
+            return None
+        try:
+            self._previous.seek(entry["offset"])
+            if self.fmt == "jsonl":
+                record = json.loads(self._previous.readline())
+            else:
+                record = pickle.load(self._previous)
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError) as e:
+            logger.warning(f"Cannot reuse cached record for {path}: {e}")
+            return None
+        return record if isinstance(record, dict) and record.get("path") == path else None
+
+    def lookup(self, path: str, stat: os.stat_result) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Devuelve (registro si está fresco, hash conocido si existe)"""
+        entry = self.entries.get(path)
+        if entry is None:
+            return None, None
+        if entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            record = self.record(path)
+            return (record, entry["sha256"]) if record is not None else (None, None)
+        return None, entry["sha256"]
+
+    def update(self, path: str, stat: os.stat_result, record: Dict[str, Any], offset: int) -> None:
+        if "sha256" not in record:
+            return
+        self._next[path] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": record["sha256"],
+            "offset": offset
+        }
+
+    def save(self, output: Path, fmt: str) -> None:
+        if self._previous is not None:
+            self._previous.close()
+            self._previous = None
+        if self.path is None:
+            return
+        data = {"version": RECORD_VERSION, "output": str(output.resolve()), "format": fmt, "entries": self._next}
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+# ============================================================================
+# SALIDA
+# ============================================================================
+
+class RecordWriter:
+    """
+    Escribe registros en JSONL (texto) o como secuencia de pickles (binario).
+
+    Se escribe en un archivo temporal que reemplaza a path al cerrar, así la
+    salida anterior sigue legible (la caché reutiliza sus registros) aunque
+    tenga la misma ruta.
+    """
+
+    def __init__(self, path: Path, fmt: str):
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"Output format '{fmt}' not supported. Use one of {OUTPUT_FORMATS}")
+        self.fmt = fmt
+        self.path = path
+        self._tmp = path.with_name(path.name + ".tmp")
+        self._file = open(self._tmp, "wb")
+
+    def write(self, record: Dict[str, Any]) -> int:
+        """Escribe el registro y devuelve su posición en el archivo"""
+        offset = self._file.tell()
+        if self.fmt == "jsonl":
+            self._file.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+        else:
+            pickle.dump(record, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+        return offset
+
+    def close(self) -> None:
+        self._file.close()
+        os.replace(self._tmp, self.path)
+
+
+def read_records(path: Path) -> Iterator[Dict[str, Any]]:
+    """Lee un archivo de salida binario producido con fmt='pickle'"""
+    with open(path, "rb") as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+# ============================================================================
+# ORQUESTACIÓN
+# ============================================================================
+
+def analyze_directory(
+    root: Path,
+    output: Path,
+    fmt: str = "jsonl",
+    jobs: Optional[int] = None,
+    cache_path: Optional[Path] = None,
+    chunksize: int = 16
+) -> Dict[str, Any]:
+    """
+    Analiza todos los archivos soportados bajo root y escribe un registro por
+    archivo en output.
+
+    Returns:
+        Resumen con totales y tiempo transcurrido
+    """
+    started = time.perf_counter()
+    cache = SkipCache(cache_path)
+    writer = RecordWriter(output, fmt)
+    cache.open_previous(fmt)
+    summary = {"files": 0, "analyzed": 0, "skipped": 0, "errors": 0}
+
+    tasks = []
+    stats: Dict[str, os.stat_result] = {}
+    try:
+        for path, lang in discover_files(root):
+            key = str(path)
+            stat = path.stat()
+            summary["files"] += 1
+            fresh, known_hash = cache.lookup(key, stat)
+            if fresh is not None:
+                summary["skipped"] += 1
+                summary["errors"] += 0 if fresh.get("ok") else 1
+                cache.update(key, stat, fresh, writer.write(fresh))
+                continue
+            stats[key] = stat
+            tasks.append((key, lang, known_hash))
+
+        if tasks:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                for record in pool.map(_analyze_task, tasks, chunksize=chunksize):
+                    key = record["path"]
+                    if record.pop("unchanged", False):
+                        previous = cache.record(key)
+                        if previous is None:
+                            # La salida anterior cambió: analizar aquí mismo
+                            previous = _analyze_task((key, record["lang"], None))
+                            summary["analyzed"] += 1
+                        else:
+                            summary["skipped"] += 1
+                        record = previous
+                    else:
+                        summary["analyzed"] += 1
+                    summary["errors"] += 0 if record.get("ok") else 1
+                    cache.update(key, stats[key], record, writer.write(record))
+    finally:
+        writer.close()
+        cache.save(output, fmt)
+
+    summary["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    return summary
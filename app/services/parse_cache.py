@@ -0,0 +1,63 @@
+"""
+Caché LRU en memoria para programas IR ya parseados.
+
+La clave es un hash del lenguaje y el contenido, así entradas repetidas (muy
+comunes en lotes) no vuelven a pasar por Lark ni por el módulo ast.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from app.models.ast_nodes import Program
+
+
+class ParseCache:
+    """LRU thread-safe: el IR se trata como inmutable una vez construido"""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Program]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(content: str, from_lang: str) -> str:
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        return f"{from_lang}:{digest}"
+
+    def get(self, key: str) -> Optional[Program]:
+        with self._lock:
+            program = self._entries.get(key)
+            if program is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return program
+
+    def put(self, key: str, program: Program) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = program
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,131 @@
+"""
+Ejecutor acotado para trabajo CPU-bound (parsing y análisis de AST).
+
+Saca el parsing del event loop de FastAPI: cada trabajo corre en un pool de
+hilos dedicado con una cola de profundidad máxima configurable. Cuando la cola
+está llena se falla rápido con QueueFullError en lugar de acumular trabajo.
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """El ejecutor no admite más trabajos pendientes"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Parse queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+@dataclass
+class ExecutionResult:
+    """Resultado de un trabajo junto con sus tiempos de espera y proceso"""
+    value: Any
+    queue_wait_ms: float
+    processing_ms: float
+
+    def timings(self) -> Dict[str, float]:
+        return {
+            "queue_wait_ms": round(self.queue_wait_ms, 3),
+            "processing_ms": round(self.processing_ms, 3)
+        }
+
+
+class BoundedExecutor:
+    """
+    Pool de hilos con admisión acotada.
+
+    Admite como máximo `max_workers + queue_depth` trabajos a la vez (en
+    ejecución más en espera). El cupo se libera cuando el trabajo termina en el
+    pool, no cuando el cliente deja de esperar, así una desconexión no permite
+    sobrepasar el límite.
+    """
+
+    def __init__(self, max_workers: int, queue_depth: int, retry_after: int = 1):
+        self.max_workers = max_workers
+        self.queue_depth = queue_depth
+        self.retry_after = retry_after
+        self._capacity = max_workers + queue_depth
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="parse")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+
+    @property
+    def capacity(self) -> int:
+        """Trabajos admitidos a la vez como máximo (en ejecución más en espera)"""
+        return self._capacity
+
+    @property
+    def pending(self) -> int:
+        """Trabajos admitidos que aún no terminan (en cola o en ejecución)"""
+        return self._pending
+
+    @property
+    def queued(self) -> int:
+        """Trabajos admitidos que esperan un hilo libre"""
+        return self._pending - self._running
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> ExecutionResult:
+        """
+        Ejecuta fn(*args, **kwargs) en el pool sin bloquear el event loop.
+
+        Raises:
+            QueueFullError: Si la cola está llena
+            Exception: Cualquier excepción lanzada por fn
+        """
+        with self._lock:
+            if self._pending >= self._capacity:
+                raise QueueFullError(self.retry_after)
+            self._pending += 1
+
+        submitted = time.perf_counter()
+
+        def _job():
+            started = time.perf_counter()
+            with self._lock:
+                self._running += 1
+            try:
+                value = fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+            return value, started, time.perf_counter()
+
+        try:
+            future = self._pool.submit(_job)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+
+        value, started, finished = await asyncio.wrap_future(future)
+        return ExecutionResult(
+            value=value,
+            queue_wait_ms=(started - submitted) * 1000,
+            processing_ms=(finished - started) * 1000
+        )
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+
+# Instancia global
+parse_executor = BoundedExecutor(
+    max_workers=settings.PARSE_WORKERS,
+    queue_depth=settings.PARSE_QUEUE_DEPTH,
+    retry_after=settings.PARSE_RETRY_AFTER_SECONDS
+)
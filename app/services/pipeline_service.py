@@ -0,0 +1,158 @@
+"""
+Pipeline completo de /analyze: pseudocódigo, Python, AST y complejidad en una
+sola petición.
+
+Las etapas forman dos cadenas independientes que corren concurrentemente:
+
+    entrada ─┬─ pseudocódigo ── análisis del pseudocódigo (AST + complejidad)
+             └─ Python ──────── análisis del Python (AST + complejidad)
+
+Así las dos llamadas al LLM (si la entrada es lenguaje natural) se solapan, y
+cada análisis empieza en cuanto llega su artefacto, sin esperar al otro.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.models.schemas import InputType
+from app.services.ast_service import (
+    analyze_complexity, build_ast, parse_program, python_to_pseudocode, transpile_pseudocode
+)
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.gemini_service import gemini_service, LLMTimeoutError
+from app.services.input_detector import detect_input_type
+from app.services.parse_executor import parse_executor, QueueFullError
+from app.services.profiler import RequestProfile
+
+logger = logging.getLogger(__name__)
+
+
+def analyze_artifact(content: str, from_lang: str, refresh: bool = False) -> Dict[str, Any]:
+    """AST y complejidad de un artefacto (un solo parse gracias a la caché)"""
+    return {
+        "ast": build_ast(content, from_lang, refresh),
+        "complexity": analyze_complexity(content, from_lang)["functions"]
+    }
+
+
+def stage_error(e: Exception) -> str:
+    """Mensaje de error de una etapa con el mismo prefijo que los endpoints"""
+    if isinstance(e, CircuitOpenError):
+        return f"llm_unavailable: {e}"
+    if isinstance(e, LLMTimeoutError):
+        return f"llm_timeout: {e}"
+    if isinstance(e, QueueFullError):
+        return "server_busy: parse queue is full"
+    return f"{e.__class__.__name__}: {e}"
+
+
+class Pipeline:
+    """Ejecución de una petición /analyze con los tiempos de cada etapa"""
+
+    def __init__(self, content: str, input_type: Optional[InputType] = None, llm=None,
+                 profile: Optional[RequestProfile] = None):
+        self.content = content
+        self.input_type = input_type or detect_input_type(content)
+        self.llm = llm or gemini_service
+        self.profile = profile
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._started = time.perf_counter()
+
+    def _ms(self, moment: float) -> float:
+        return round((moment - self._started) * 1000, 3)
+
+    async def _stage(self, name: str, fn: Callable[[], Awaitable[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """Ejecuta una etapa y registra su resultado, inicio y duración"""
+        started = time.perf_counter()
+        try:
+            result = await fn()
+            record = {"status": "ok", **result}
+        except Exception as e:
+            logger.warning(f"Etapa '{name}' fallida: {e}")
+            result = None
+            record = {"status": "error", "error": stage_error(e)}
+        finished = time.perf_counter()
+        record["started_ms"] = self._ms(started)
+        record["elapsed_ms"] = round((finished - started) * 1000, 3)
+        self.stages[name] = record
+        return result
+
+    async def _local(self, fn, *args):
+        if self.profile is not None:
+            fn = self.profile.wrap(fn)
+        return (await parse_executor.run(fn, *args)).value
+
+    async def _parses(self, content: str, from_lang: str) -> bool:
+        try:
+            await self._local(parse_program, content, from_lang)
+            return True
+        except QueueFullError:
+            raise
+        except Exception:
+            return False
+
+    # ========================================================================
+    # PRODUCTORES DE ARTEFACTOS
+    # ========================================================================
+
+    async def _pseudocode(self) -> Dict[str, Any]:
+        if self.input_type == InputType.PSEUDOCODE and await self._parses(self.content, "pseudocode"):
+            return {"content": self.content, "source": "input", "valid": True}
+        if self.input_type == InputType.PYTHON:
+            try:
+                return {"content": await self._local(python_to_pseudocode, self.content), "source": "transpiler", "valid": True}
+            except QueueFullError:
+                raise
+            except Exception as e:
+                logger.info(f"Python no traducible localmente, se usa el LLM: {e}")
+        result = await self.llm.normalize_validated(self.content)
+        source = result.model if result.model and result.model.startswith("template:") else "llm"
+        return {"content": result.text, "source": source, "valid": result.error is None, "degraded": result.degraded}
+
+    async def _python(self) -> Dict[str, Any]:
+        if self.input_type == InputType.PYTHON and await self._parses(self.content, "python"):
+            return {"content": self.content, "source": "input"}
+        if self.input_type == InputType.PSEUDOCODE:
+            try:
+                return {"content": await self._local(transpile_pseudocode, self.content), "source": "transpiler"}
+            except QueueFullError:
+                raise
+            except Exception as e:
+                logger.info(f"Pseudocódigo no traducible localmente, se usa el LLM: {e}")
+        result = await self.llm.generate_python_validated(self.content)
+        source = result.model if result.model and result.model.startswith("template:") else "llm"
+        return {"content": result.text, "source": source, "degraded": result.degraded}
+
+    # ========================================================================
+    # CADENAS
+    # ========================================================================
+
+    async def _chain(self, artifact: str, from_lang: str, produce) -> None:
+        produced = await self._stage(artifact, produce)
+        if produced is None or not produced["content"].strip():
+            return
+        content = produced["content"]
+        # Al perfilar se parsea de nuevo: un acierto de caché no dice nada
+        refresh = self.profile is not None
+        await self._stage(f"{artifact}_analysis", lambda: self._local(analyze_artifact, content, from_lang, refresh))
+
+    async def run(self) -> Dict[str, Any]:
+        await asyncio.gather(
+            self._chain("pseudocode", "pseudocode", self._pseudocode),
+            self._chain("python", "python", self._python)
+        )
+        order = ("pseudocode", "python", "pseudocode_analysis", "python_analysis")
+        result = {
+            "input_type_detected": self.input_type.value,
+            "stages": {name: self.stages[name] for name in order if name in self.stages},
+            "timing": {"total_ms": self._ms(time.perf_counter())}
+        }
+        if self.profile is not None:
+            result["profile"] = self.profile.report()
+        return result
+
+
+async def run_pipeline(content: str, input_type: Optional[InputType] = None,
+                       profile: Optional[RequestProfile] = None) -> Dict[str, Any]:
+    return await Pipeline(content, input_type, profile=profile).run()
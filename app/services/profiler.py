@@ -0,0 +1,224 @@
+"""
+Perfilado bajo demanda de una sola petición.
+
+CPU (?profile=1): cada trabajo local de la petición se envuelve con
+RequestProfile.wrap y corre bajo cProfile en el mismo hilo del pool de parsing
+que hace el trabajo; las etapas que observa stage_seconds en ese hilo se
+anotan aparte. Al terminar se combinan en un informe con el desglose por
+etapa y las N funciones con más tiempo acumulado.
+
+Sólo se perfila el trabajo CPU-bound: la espera en cola y las llamadas al LLM
+quedan fuera (ya aparecen en "timing" y en /metrics).
+
+Memoria (memory_profile): ejecuta por separado cada etapa de build_ast con
+tracemalloc activo y devuelve, por etapa, lo asignado, el pico y los sitios
+de asignación (archivo y línea), más el número de nodos del árbol del parser,
+del IR y de los diccionarios de to_dict.
+"""
+import ast
+import cProfile
+import dataclasses
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.metrics import trace_stages
+from app.core.visitors.complexity import Complexity
+from app.services.ast_service import get_frontend
+
+# Desde Python 3.12 sólo puede haber un cProfile activo en el proceso, y
+# tracemalloc es global: un perfil a la vez
+_profiler_lock = threading.Lock()
+
+_ROOT = str(Path(__file__).resolve().parents[2]) + os.sep
+_SITE_PACKAGES = "site-packages" + os.sep
+
+# Asignaciones del propio tracemalloc y del import system no son del análisis
+_TRACE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<unknown>")
+)
+
+
+class RequestProfile:
+    """Acumula cProfile y etapas de los trabajos de una petición"""
+
+    def __init__(self, top_n: int = 25):
+        self.top_n = top_n
+        self.stages: List[Dict[str, Any]] = []
+        self.profiled_ms = 0.0
+        self._stats: Optional[pstats.Stats] = None
+        self._lock = threading.Lock()
+
+    def wrap(self, fn: Callable[..., Any]) -> Callable[..., Any]:
+        """fn perfilada en el hilo que la ejecute"""
+
+        @wraps(fn)
+        def profiled(*args, **kwargs):
+            profiler = cProfile.Profile()
+            with _profiler_lock, trace_stages() as stages:
+                started = time.perf_counter()
+                profiler.enable()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    profiler.disable()
+                    self._add(fn.__name__, profiler, stages, time.perf_counter() - started)
+
+        return profiled
+
+    def _add(self, job: str, profiler: cProfile.Profile, stages, seconds: float) -> None:
+        with self._lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(profiler)
+            else:
+                self._stats.add(profiler)
+            self.profiled_ms += seconds * 1000
+            for labels, elapsed in stages:
+                self.stages.append({
+                    "job": job,
+                    "stage": labels.get("stage"),
+                    "lang": labels.get("lang"),
+                    "elapsed_ms": round(elapsed * 1000, 3)
+                })
+
+    def top_functions(self) -> List[Dict[str, Any]]:
+        """Las top_n funciones por tiempo acumulado"""
+        if self._stats is None:
+            return []
+        rows = sorted(self._stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        return [
+            {
+                "function": pstats.func_std_string(pstats.func_strip_path(func)),
+                "ncalls": calls,
+                "primitive_calls": primitive,
+                "tottime_ms": round(total * 1000, 3),
+                "cumtime_ms": round(cumulative * 1000, 3)
+            }
+            for func, (primitive, calls, total, cumulative, _callers) in rows[:self.top_n]
+        ]
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "profiled_ms": round(self.profiled_ms, 3),
+                "stages": list(self.stages),
+                "cprofile": self.top_functions()
+            }
+
+
+# ============================================================================
+# MEMORIA (tracemalloc)
+# ============================================================================
+
+def _short_path(filename: str) -> str:
+    if _SITE_PACKAGES in filename:
+        return filename.split(_SITE_PACKAGES, 1)[1]
+    if filename.startswith(_ROOT):
+        return filename[len(_ROOT):]
+    return filename
+
+
+def _count_tree(tree: Any) -> int:
+    """Nodos del árbol del parser (ast de Python o Tree de Lark)"""
+    if isinstance(tree, ast.AST):
+        return sum(1 for _ in ast.walk(tree))
+    return sum(1 for _ in tree.iter_subtrees())
+
+
+def _count_ir(node: Any) -> int:
+    if isinstance(node, list):
+        return sum(_count_ir(item) for item in node)
+    if not dataclasses.is_dataclass(node):
+        return 0
+    return 1 + sum(_count_ir(getattr(node, field.name)) for field in dataclasses.fields(node))
+
+
+def _count_dicts(value: Any) -> int:
+    if isinstance(value, dict):
+        return 1 + sum(_count_dicts(item) for item in value.values())
+    if isinstance(value, list):
+        return sum(_count_dicts(item) for item in value)
+    return 0
+
+
+def _memory_stage(stages: List[Dict[str, Any]], name: str, top_n: int, fn: Callable[..., Any], *args) -> Any:
+    """Ejecuta una etapa y anota lo que asigna; el resultado sigue vivo para la siguiente"""
+    before = tracemalloc.take_snapshot().filter_traces(_TRACE_FILTERS)
+    start_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    started = time.perf_counter()
+    value = fn(*args)
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot().filter_traces(_TRACE_FILTERS)
+
+    sites = [stat for stat in after.compare_to(before, "lineno") if stat.size_diff > 0][:top_n]
+    stages.append({
+        "stage": name,
+        "elapsed_ms": round(elapsed * 1000, 3),
+        "allocated_bytes": current - start_bytes,
+        "peak_bytes": peak - start_bytes,
+        "top": [
+            {
+                "file": _short_path(stat.traceback[0].filename),
+                "line": stat.traceback[0].lineno,
+                "size_bytes": stat.size_diff,
+                "count": stat.count_diff
+            }
+            for stat in sites
+        ]
+    })
+    return value
+
+
+def memory_profile(content: str, from_lang: str, analysis: bool = False, top_n: int = 25) -> Dict[str, Any]:
+    """
+    Memoria de parse, ir_transform y to_dict (y complexity si analysis) para
+    un código, sin pasar por la caché de parsing.
+
+    Los resultados de cada etapa se mantienen vivos hasta el final, así que
+    retained_bytes es lo que ocupan juntos árbol, IR y diccionarios.
+
+    Raises:
+        Las mismas excepciones que build_ast
+    """
+    frontend = get_frontend(from_lang)
+    stages: List[Dict[str, Any]] = []
+    with _profiler_lock, frontend.builder() as builder:
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        try:
+            tree = _memory_stage(stages, "parse", top_n, builder.parse, content)
+            program = _memory_stage(stages, "ir_transform", top_n, builder.transform, tree)
+            serialized = _memory_stage(stages, "to_dict", top_n, program.to_dict)
+            if analysis:
+                _memory_stage(stages, "complexity", top_n,
+                              lambda: [Complexity.of(func) for func in program.functions])
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+
+    retained = 0
+    peak = 0
+    for stage in stages:
+        peak = max(peak, retained + stage["peak_bytes"])
+        retained += stage["allocated_bytes"]
+    return {
+        "lang": from_lang,
+        "peak_bytes": peak,
+        "retained_bytes": retained,
+        "nodes": {
+            "parse_tree": _count_tree(tree),
+            "ir": _count_ir(program),
+            "dicts": _count_dicts(serialized)
+        },
+        "stages": stages
+    }
@@ -0,0 +1,223 @@
+"""
+Biblioteca local de plantillas de algoritmos comunes (burbuja, búsqueda
+binaria, factorial...).
+
+Las descripciones de cada plantilla se indexan con TF-IDF sobre palabras
+normalizadas (sin tildes ni mayúsculas, recortadas a una raíz corta). Una
+petición se responde localmente, sin llamar a Gemini, si su similitud coseno
+con alguna plantilla supera el umbral y además la frase de la plantilla cubre
+la mayor parte del peso IDF de la petición: "binary search tree insertion"
+comparte palabras con la búsqueda binaria, pero "tree" e "insertion" quedan
+sin cubrir y no se usa la plantilla. Además, ninguna palabra distintiva de la
+petición puede faltar en el vocabulario de la plantilla: "búsqueda binaria
+recursiva" no se responde con la búsqueda binaria iterativa ni "sort
+descending bubble" con la burbuja ascendente.
+"""
+import json
+import logging
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.config.settings import settings
+from app.models.schemas import AlgorithmTemplate
+from app.services.ast_service import validate_source
+
+logger = logging.getLogger(__name__)
+
+BUILTIN_TEMPLATES_PATH = Path(__file__).resolve().parent.parent / "templates" / "algorithms.json"
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+STEM_LENGTH = 5
+# Una palabra es distintiva si su IDF es al menos esta fracción del de una
+# palabra que no aparece en ninguna plantilla
+DISTINCTIVE_IDF_RATIO = 0.6
+STOPWORDS = frozenset("""
+a al algoritmo algoritmos an and con crea crear de del dado dos el en es esta este
+for funcion implementa implementar in la las lo los me mediante numero numeros o of
+on or para por que se sus the to un una uno unos usando utilizando y
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Palabras sin tildes, en minúsculas, sin palabras vacías y recortadas"""
+    plain = unicodedata.normalize("NFKD", text.lower()).encode("ascii", "ignore").decode("ascii")
+    return [word[:STEM_LENGTH] for word in _WORD_RE.findall(plain) if word not in STOPWORDS]
+
+
+class TemplateIndex:
+    """
+    Índice invertido TF-IDF. Cada descripción es un documento: una petición
+    corta se compara con la frase más parecida y no con la suma de todas.
+    Se reconstruye completo al añadir plantillas.
+    """
+
+    def __init__(self, templates: List[AlgorithmTemplate]):
+        documents = []
+        self.owners: List[int] = []
+        for position, template in enumerate(templates):
+            for phrase in [template.title] + template.descriptions:
+                documents.append(Counter(tokenize(phrase)))
+                self.owners.append(position)
+        self.terms = [frozenset(doc) for doc in documents]
+        # Vocabulario de cada plantilla: todas sus frases juntas
+        self.vocabulary: List[set] = [set() for _ in templates]
+        for doc_id, position in enumerate(self.owners):
+            self.vocabulary[position] |= self.terms[doc_id]
+
+        total = len(documents)
+        document_frequency = Counter(term for doc in documents for term in doc)
+        self.idf = {
+            term: math.log((1 + total) / (1 + df)) + 1
+            for term, df in document_frequency.items()
+        }
+        # Las palabras que no aparecen en ninguna plantilla pesan como las más raras
+        self.unseen_idf = math.log(1 + total) + 1
+        self.postings: Dict[str, List[Tuple[int, float]]] = {}
+        for doc_id, doc in enumerate(documents):
+            weights = {term: count * self.idf[term] for term, count in doc.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for term, weight in weights.items():
+                self.postings.setdefault(term, []).append((doc_id, weight / norm))
+
+    def search(self, text: str) -> Optional[Tuple[int, float, float]]:
+        """
+        (posición de la plantilla, similitud coseno, cobertura) del mejor
+        resultado. La cobertura es la fracción del peso IDF de la petición que
+        aparece en la frase encontrada.
+        """
+        query = Counter(tokenize(text))
+        weights = {term: count * self.idf.get(term, self.unseen_idf) for term, count in query.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+
+        scores: Dict[int, float] = {}
+        for term, weight in weights.items():
+            for doc_id, doc_weight in self.postings.get(term, ()):
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight / norm * doc_weight
+        if not scores:
+            return None
+        doc_id, score = max(scores.items(), key=lambda item: item[1])
+        covered = sum(weight for term, weight in weights.items() if term in self.terms[doc_id])
+        return self.owners[doc_id], score, covered / sum(weights.values())
+
+    def missing_terms(self, text: str, position: int) -> List[str]:
+        """Palabras distintivas de la petición que no aparecen en ninguna frase de la plantilla"""
+        threshold = DISTINCTIVE_IDF_RATIO * self.unseen_idf
+        return sorted(
+            term for term in set(tokenize(text))
+            if term not in self.vocabulary[position]
+            and self.idf.get(term, self.unseen_idf) >= threshold
+        )
+
+
+class TemplateLibrary:
+    """Plantillas incluidas más las añadidas en tiempo de ejecución (persistidas)"""
+
+    def __init__(
+        self,
+        builtin_path: Path = BUILTIN_TEMPLATES_PATH,
+        store_path: Optional[Path] = None,
+        min_score: float = 0.65,
+        min_coverage: float = 0.6,
+        enabled: bool = True
+    ):
+        self.store_path = Path(store_path) if store_path else None
+        self.min_score = min_score
+        self.min_coverage = min_coverage
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self._builtin_ids = set()
+        templates = self._load(Path(builtin_path))
+        self._builtin_ids = {t.id for t in templates}
+        if self.store_path is not None and self.store_path.exists():
+            templates += self._load(self.store_path)
+        self._templates: List[AlgorithmTemplate] = templates
+        self._index = TemplateIndex(templates)
+
+    @staticmethod
+    def _load(path: Path) -> List[AlgorithmTemplate]:
+        with path.open(encoding="utf-8") as f:
+            return [AlgorithmTemplate(**item) for item in json.load(f)]
+
+    def match(self, description: str, min_score: Optional[float] = None) -> Optional[Tuple[AlgorithmTemplate, float]]:
+        """
+        Plantilla que responde a la descripción, o None si no hay confianza
+        suficiente. min_score sustituye al umbral de similitud; la cobertura
+        mínima y las palabras distintivas se exigen siempre.
+        """
+        if not self.enabled:
+            return None
+        threshold = self.min_score if min_score is None else min_score
+        # Índice y lista se leen juntos; add() los sustituye de una vez
+        templates, index = self._templates, self._index
+        found = index.search(description)
+        with self._lock:
+            if (
+                found is None
+                or found[1] < threshold
+                or found[2] < self.min_coverage
+                or index.missing_terms(description, found[0])
+            ):
+                self.misses += 1
+                return None
+            self.hits += 1
+        return templates[found[0]], found[1]
+
+    def add(self, template: AlgorithmTemplate) -> None:
+        """
+        Añade una plantilla tras comprobar que ambos códigos parsean.
+
+        Raises:
+            ValueError: Si el id ya existe o algún código no es válido
+        """
+        for source, from_lang in ((template.pseudocode, "pseudocode"), (template.python, "python")):
+            error = validate_source(source, from_lang)
+            if error is not None:
+                raise ValueError(f"El {from_lang} de la plantilla no es válido: {error}")
+
+        with self._lock:
+            if any(t.id == template.id for t in self._templates):
+                raise ValueError(f"Ya existe una plantilla con id '{template.id}'")
+            templates = self._templates + [template]
+            self._index = TemplateIndex(templates)
+            self._templates = templates
+            self._persist()
+        logger.info(f"Plantilla '{template.id}' añadida")
+
+    def _persist(self) -> None:
+        if self.store_path is None:
+            return
+        runtime = [t.model_dump() for t in self._templates if t.id not in self._builtin_ids]
+        self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.store_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(runtime, ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp.replace(self.store_path)
+
+    def list(self) -> List[AlgorithmTemplate]:
+        return list(self._templates)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "templates": len(self._templates),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
+
+
+# Instancia global
+template_library = TemplateLibrary(
+    store_path=Path(settings.DATA_DIR) / "templates.json",
+    min_score=settings.TEMPLATE_MIN_SCORE,
+    min_coverage=settings.TEMPLATE_MIN_COVERAGE,
+    enabled=settings.TEMPLATES_ENABLED
+)
@@ -0,0 +1,78 @@
+"""
+CLI de los benchmarks. Funciona sin red ni GEMINI_API_KEY.
+
+Uso:
+    python -m benchmarks                         # small, medium y large
+    python -m benchmarks --save                  # guarda benchmarks/baselines/baseline.json
+    python -m benchmarks --compare               # compara contra esa línea base
+    python -m benchmarks --sizes large,xlarge --only pseudocode_build --threshold 0.1
+"""
+import argparse
+import sys
+from pathlib import Path
+
+from benchmarks.suite import (
+    BASELINE_DIR, BENCHMARKS, DEFAULT_SIZES, DEFAULT_THRESHOLD, SIZES,
+    compare, load_results, run_suite, save_results
+)
+
+DEFAULT_BASELINE = BASELINE_DIR / "baseline.json"
+
+
+def _names(value: str, choices) -> list:
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in choices]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"desconocidos: {', '.join(unknown)} (opciones: {', '.join(choices)})")
+    return names
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmarks de parsers y visitors sobre programas sintéticos")
+    parser.add_argument("--sizes", type=lambda value: _names(value, SIZES), default=list(DEFAULT_SIZES),
+                        help=f"Tamaños separados por comas ({', '.join(SIZES)})")
+    parser.add_argument("--only", type=lambda value: _names(value, BENCHMARKS), default=None,
+                        help=f"Benchmarks separados por comas ({', '.join(BENCHMARKS)})")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla del generador")
+    parser.add_argument("--repeat", type=int, default=5, help="Muestras por benchmark")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Duración mínima de cada muestra (s)")
+    parser.add_argument("--save", type=Path, nargs="?", const=DEFAULT_BASELINE, default=None,
+                        help=f"Guardar los resultados como línea base (por defecto {DEFAULT_BASELINE.name})")
+    parser.add_argument("--compare", type=Path, nargs="?", const=DEFAULT_BASELINE, default=None,
+                        help="Comparar contra una línea base")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Lentitud relativa que cuenta como regresión (0.25 = 25%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    results = run_suite(args.sizes, args.only, seed=args.seed, repeat=args.repeat, min_time=args.min_time)
+
+    if args.compare is None:
+        print(f"{'benchmark':<28} {'líneas':>7} {'min ms':>10} {'mediana ms':>11}")
+        for key, result in results["results"].items():
+            print(f"{key:<28} {result['lines']:>7} {result['min_ms']:>10.3f} {result['median_ms']:>11.3f}")
+    else:
+        if not args.compare.exists():
+            print(f"❌ No existe la línea base {args.compare}; créala con --save", file=sys.stderr)
+            return 2
+        rows = compare(results, load_results(args.compare), args.threshold)
+        print(f"{'benchmark':<28} {'base ms':>10} {'actual ms':>10} {'ratio':>7}  estado")
+        for row in rows:
+            base = "-" if row["baseline_ms"] is None else f"{row['baseline_ms']:.3f}"
+            ratio = "-" if row["ratio"] is None else f"{row['ratio']:.2f}"
+            print(f"{row['benchmark']:<28} {base:>10} {row['current_ms']:>10.3f} {ratio:>7}  {row['status']}")
+
+    if args.save is not None:
+        save_results(results, args.save)
+        print(f"💾 Resultados guardados en {args.save}")
+
+    if args.compare is not None and any(row["status"] == "regression" for row in rows):
+        print(f"❌ Regresiones por encima del {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
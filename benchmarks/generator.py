@@ -0,0 +1,144 @@
+"""
+Generador determinista de programas sintéticos para los benchmarks.
+
+Con la misma semilla produce siempre el mismo programa. El Python se genera
+respetando las restricciones de PythonToIR (sólo funciones, for con range) y
+el pseudocódigo se obtiene de él con PythonToIR + PseudocodeEmitter, así que
+los dos lenguajes describen exactamente el mismo programa.
+"""
+import random
+from dataclasses import dataclass
+from typing import List
+
+from app.core.py_ast_builder import PythonToIR
+from app.core.visitors.pseudocode_emitter import PseudocodeEmitter
+
+INDENT = "    "
+
+ARITHMETIC = ("+", "-", "*")
+COMPARISONS = ("<", "<=", ">", ">=", "==", "!=")
+
+
+@dataclass(frozen=True)
+class ProgramShape:
+    """Tamaño de un programa: funciones, sentencias por función y anidamiento máximo"""
+    functions: int
+    statements: int
+    depth: int
+
+
+@dataclass(frozen=True)
+class SyntheticProgram:
+    shape: ProgramShape
+    seed: int
+    python: str
+    pseudocode: str
+
+
+class ProgramGenerator:
+    """Programas de forma dada con bucles for/while, if/else, arrays y llamadas"""
+
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+    def python(self, shape: ProgramShape) -> str:
+        functions = [self._function(index, shape) for index in range(shape.functions)]
+        return "\n\n".join(functions) + "\n"
+
+    def program(self, shape: ProgramShape) -> SyntheticProgram:
+        python = self.python(shape)
+        pseudocode = PseudocodeEmitter.emit(PythonToIR().build(python))
+        return SyntheticProgram(shape=shape, seed=self.seed, python=python, pseudocode=pseudocode)
+
+    # ========================================================================
+    # FUNCIONES Y SENTENCIAS
+    # ========================================================================
+
+    def _function(self, index: int, shape: ProgramShape) -> str:
+        self._index = index
+        lines = [f"def f{index}(arr, n):", f"{INDENT}total = 0"]
+        lines += self._statements(max(shape.statements - 2, 1), 1, shape.depth, ["n", "total"], INDENT)
+        lines.append(f"{INDENT}return total")
+        return "\n".join(lines)
+
+    def _statements(self, budget: int, depth: int, max_depth: int, scope: List[str], pad: str) -> List[str]:
+        lines: List[str] = []
+        while budget > 0:
+            kind = self._kind(budget, depth, max_depth)
+            if kind == "for":
+                var = f"i{depth}"
+                inner = self.rng.randint(1, budget - 1)
+                lines.append(f"{pad}for {var} in range({self._bound(scope)}):")
+                lines += self._statements(inner, depth + 1, max_depth, scope + [var], pad + INDENT)
+                budget -= inner + 1
+            elif kind == "while":
+                var = f"k{depth}"
+                inner = self.rng.randint(1, budget - 2)
+                lines.append(f"{pad}{var} = 0")
+                lines.append(f"{pad}while {var} < {self._bound(scope)}:")
+                lines += self._statements(inner, depth + 1, max_depth, scope + [var], pad + INDENT)
+                lines.append(f"{pad}{INDENT}{var} = {var} + 1")
+                budget -= inner + 2
+            elif kind == "if":
+                inner = self.rng.randint(1, budget - 1)
+                then_size = self.rng.randint(1, inner)
+                lines.append(f"{pad}if {self._expr(scope)} {self.rng.choice(COMPARISONS)} {self._expr(scope)}:")
+                lines += self._statements(then_size, depth + 1, max_depth, scope, pad + INDENT)
+                if inner > then_size:
+                    lines.append(f"{pad}else:")
+                    lines += self._statements(inner - then_size, depth + 1, max_depth, scope, pad + INDENT)
+                budget -= inner + 1
+            elif kind == "call":
+                callee = self.rng.randrange(self._index)
+                lines.append(f"{pad}total = total + f{callee}(arr, {self._bound(scope)})")
+                budget -= 1
+            elif kind == "store":
+                lines.append(f"{pad}arr[{self._index_expr(scope)}] = {self._expr(scope)}")
+                budget -= 1
+            else:
+                lines.append(f"{pad}total = {self._expr(scope)}")
+                budget -= 1
+        return lines
+
+    def _kind(self, budget: int, depth: int, max_depth: int) -> str:
+        kinds = ["assign", "assign", "store"]
+        if self._index > 0:
+            kinds.append("call")
+        if depth <= max_depth and budget >= 2:
+            kinds += ["for", "if"]
+        if depth <= max_depth and budget >= 3:
+            kinds.append("while")
+        return self.rng.choice(kinds)
+
+    # ========================================================================
+    # EXPRESIONES
+    # ========================================================================
+
+    def _loop_vars(self, scope: List[str]) -> List[str]:
+        return [name for name in scope if name not in ("n", "total")]
+
+    def _bound(self, scope: List[str]) -> str:
+        loop_vars = self._loop_vars(scope)
+        if loop_vars and self.rng.random() < 0.3:
+            return self.rng.choice(loop_vars)
+        return "n"
+
+    def _index_expr(self, scope: List[str]) -> str:
+        loop_vars = self._loop_vars(scope)
+        return self.rng.choice(loop_vars) if loop_vars else "0"
+
+    def _term(self, scope: List[str]) -> str:
+        choice = self.rng.random()
+        if choice < 0.3:
+            return str(self.rng.randint(0, 9))
+        if choice < 0.6:
+            return f"arr[{self._index_expr(scope)}]"
+        return self.rng.choice(scope)
+
+    def _expr(self, scope: List[str]) -> str:
+        terms = [self._term(scope) for _ in range(self.rng.randint(1, 3))]
+        expr = terms[0]
+        for term in terms[1:]:
+            expr = f"{expr} {self.rng.choice(ARITHMETIC)} {term}"
+        return expr
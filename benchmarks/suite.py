@@ -0,0 +1,160 @@
+"""
+Benchmarks de los parsers y visitors sobre programas sintéticos.
+
+Cada benchmark se mide en cada tamaño de SIZES con un programa generado con
+la semilla dada. El número de iteraciones por muestra se calibra (como
+timeit.autorange) hasta que una muestra dura al menos min_time; de las
+muestras se guarda el mínimo (el valor que se compara) y la mediana.
+
+Los resultados se guardan como JSON y se comparan contra una línea base:
+un benchmark cuyo mínimo supera al de la base en más de `threshold` es una
+regresión. Las líneas base dependen de la máquina: compárese sólo contra una
+generada en el mismo equipo.
+"""
+import json
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from app.core.psc_parser import PseudocodeParser
+from app.core.py_ast_builder import PythonToIR
+from app.core.visitors.complexity import Complexity
+from benchmarks.generator import ProgramGenerator, ProgramShape, SyntheticProgram
+
+SIZES: Dict[str, ProgramShape] = {
+    "small": ProgramShape(functions=2, statements=10, depth=2),
+    "medium": ProgramShape(functions=10, statements=40, depth=3),
+    "large": ProgramShape(functions=40, statements=80, depth=4),
+    "xlarge": ProgramShape(functions=100, statements=200, depth=5)
+}
+DEFAULT_SIZES = ("small", "medium", "large")
+
+DEFAULT_THRESHOLD = 0.25
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+
+
+def _pseudocode_build(program: SyntheticProgram) -> Callable[[], Any]:
+    parser = PseudocodeParser()
+    return lambda: parser.build(program.pseudocode)
+
+
+def _python_build(program: SyntheticProgram) -> Callable[[], Any]:
+    builder = PythonToIR()
+    return lambda: builder.build(program.python)
+
+
+def _to_dict(program: SyntheticProgram) -> Callable[[], Any]:
+    ir = PythonToIR().build(program.python)
+    return ir.to_dict
+
+
+def _complexity(program: SyntheticProgram) -> Callable[[], Any]:
+    ir = PythonToIR().build(program.python)
+    return lambda: [Complexity.of(func) for func in ir.functions]
+
+
+# Nombre → preparación (fuera de la medición) que devuelve lo que se mide
+BENCHMARKS: Dict[str, Callable[[SyntheticProgram], Callable[[], Any]]] = {
+    "pseudocode_build": _pseudocode_build,
+    "python_build": _python_build,
+    "to_dict": _to_dict,
+    "complexity": _complexity
+}
+
+
+def measure(fn: Callable[[], Any], repeat: int = 5, min_time: float = 0.05) -> Dict[str, Any]:
+    """Tiempo por llamada de fn: mínimo y mediana de `repeat` muestras"""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - started >= min_time:
+            break
+        number *= 2
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - started) / number)
+    return {
+        "min_ms": round(min(samples) * 1000, 4),
+        "median_ms": round(statistics.median(samples) * 1000, 4),
+        "number": number,
+        "repeat": repeat
+    }
+
+
+def run_suite(sizes: Iterable[str] = DEFAULT_SIZES, benchmarks: Optional[Iterable[str]] = None,
+              seed: int = 0, repeat: int = 5, min_time: float = 0.05) -> Dict[str, Any]:
+    """
+    Ejecuta los benchmarks en cada tamaño.
+
+    Returns:
+        {"meta": {...}, "results": {"<benchmark>/<tamaño>": {...}}}
+
+    Raises:
+        KeyError: Si un tamaño o benchmark no existe
+    """
+    names = list(benchmarks or BENCHMARKS)
+    results: Dict[str, Dict[str, Any]] = {}
+    for size in sizes:
+        shape = SIZES[size]
+        program = ProgramGenerator(seed).program(shape)
+        for name in names:
+            result = measure(BENCHMARKS[name](program), repeat=repeat, min_time=min_time)
+            result["lines"] = len(program.python.splitlines())
+            results[f"{name}/{size}"] = result
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "sizes": {size: SIZES[size].__dict__ for size in sizes}
+        },
+        "results": results
+    }
+
+
+def save_results(results: Dict[str, Any], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+
+
+def load_results(path: Path) -> Dict[str, Any]:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any],
+            threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Compara el mínimo de cada benchmark con la línea base.
+
+    status: "regression" (más lento que base * (1 + threshold)), "improvement"
+    (más rápido que base / (1 + threshold)), "ok" o "new" (sin base).
+    """
+    rows = []
+    base_results = baseline.get("results", {})
+    for key, result in current["results"].items():
+        base = base_results.get(key)
+        row = {"benchmark": key, "current_ms": result["min_ms"], "baseline_ms": None, "ratio": None, "status": "new"}
+        if base is not None and base["min_ms"] > 0:
+            ratio = result["min_ms"] / base["min_ms"]
+            row.update(baseline_ms=base["min_ms"], ratio=round(ratio, 3))
+            if ratio > 1 + threshold:
+                row["status"] = "regression"
+            elif ratio < 1 / (1 + threshold):
+                row["status"] = "improvement"
+            else:
+                row["status"] = "ok"
+        rows.append(row)
+    return rows
@@ -0,0 +1,56 @@
+"""
+CLI para analizar directorios completos sin pasar por la API HTTP.
+
+Uso:
+    python cli.py docs/ejemplos/algoritmos_guardados -o resultados.jsonl
+    python cli.py corpus/ -o corpus.bin --format pickle --jobs 8
+"""
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+from app.services.offline_analyzer import analyze_directory, OUTPUT_FORMATS
+
+DEFAULT_CACHE_NAME = ".analysis_cache.json"
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Analiza en paralelo archivos .py y de pseudocódigo (.psc, .pseudo) de un directorio"
+    )
+    parser.add_argument("root", type=Path, help="Directorio a recorrer")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="Archivo de salida")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="jsonl",
+                        help="jsonl (texto) o pickle (IR binario); por defecto jsonl")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Procesos del pool (por defecto, uno por CPU)")
+    parser.add_argument("--cache", type=Path, default=None,
+                        help=f"Caché de omisión (por defecto <root>/{DEFAULT_CACHE_NAME})")
+    parser.add_argument("--no-cache", action="store_true", help="Analizar todos los archivos")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    args = parse_args(argv)
+
+    if not args.root.is_dir():
+        print(f"❌ {args.root} no es un directorio", file=sys.stderr)
+        return 2
+
+    cache_path = None if args.no_cache else (args.cache or args.root / DEFAULT_CACHE_NAME)
+    summary = analyze_directory(
+        args.root,
+        args.output,
+        fmt=args.format,
+        jobs=args.jobs,
+        cache_path=cache_path
+    )
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""
+Sustituto local de la API REST de Gemini para pruebas de carga.
+
+Implementa generateContent y streamGenerateContent (?alt=sse) con latencia
+aleatoria según una distribución, una tasa de errores y respuestas fijas:
+pseudocódigo para los prompts de normalización y Python para los de
+generación. Los prompts con varios <<<ITEM id>>> (micro-batching) reciben un
+bloque por id.
+
+Uso:
+    python -m loadtest.fake_llm --port 9100 --latency lognormal:0.8,0.5 --error-rate 0.02
+    LLM_BASE_URL=http://127.0.0.1:9100 python main.py
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+ARROW = "🡨"
+
+DEFAULT_RESPONSES = {
+    "pseudocode": (
+        "suma(A, n)\n"
+        "begin\n"
+        f"    s {ARROW} 0\n"
+        f"    for i {ARROW} 1 to n do\n"
+        "    begin\n"
+        f"        s {ARROW} s + A[i]\n"
+        "    end\n"
+        "    return s\n"
+        "end"
+    ),
+    "python": (
+        "def suma(A, n):\n"
+        "    s = 0\n"
+        "    for i in range(n):\n"
+        "        s = s + A[i]\n"
+        "    return s"
+    )
+}
+
+# Primera línea de PYTHON_INSTRUCTIONS en gemini_service
+PYTHON_MARKER = "implementaciones en Python"
+
+_BATCH_ITEM_RE = re.compile(r"<<<ITEM (\w+)>>>")
+
+Sampler = Callable[[random.Random], float]
+
+
+def parse_latency(spec: str) -> Sampler:
+    """
+    Distribución de latencia en segundos:
+    fixed:s, uniform:min,max, normal:media,desv, lognormal:mediana,sigma, exponential:media
+
+    Raises:
+        ValueError: Si la especificación no es válida
+    """
+    name, _, raw = spec.partition(":")
+    try:
+        params = [float(value) for value in raw.split(",") if value.strip()]
+    except ValueError:
+        raise ValueError(f"Invalid latency parameters: {spec}")
+    shapes = {
+        "fixed": (1, lambda rng, s: s),
+        "uniform": (2, lambda rng, a, b: rng.uniform(a, b)),
+        "normal": (2, lambda rng, mean, sd: rng.gauss(mean, sd)),
+        "lognormal": (2, lambda rng, median, sigma: rng.lognormvariate(math.log(median), sigma)),
+        "exponential": (1, lambda rng, mean: rng.expovariate(1 / mean))
+    }
+    if name not in shapes or len(params) != shapes[name][0]:
+        raise ValueError(f"Invalid latency spec '{spec}' (expected one of: {', '.join(shapes)})")
+    sample = shapes[name][1]
+    return lambda rng: max(sample(rng, *params), 0.0)
+
+
+@dataclass
+class FakeLLMConfig:
+    latency: Sampler = field(default_factory=lambda: parse_latency("fixed:0"))
+    error_rate: float = 0.0
+    error_status: int = 503
+    stream_chunks: int = 4
+    responses: Dict[str, str] = field(default_factory=lambda: dict(DEFAULT_RESPONSES))
+    seed: Optional[int] = None
+
+
+def answer(prompt: str, responses: Dict[str, str]) -> str:
+    """Respuesta fija según el tipo de prompt (y un bloque por id en los lotes)"""
+    text = responses["python" if PYTHON_MARKER in prompt else "pseudocode"]
+    _, marker, descriptions = prompt.partition("DESCRIPCIONES:")
+    ids = _BATCH_ITEM_RE.findall(descriptions) if marker else []
+    if not ids:
+        return text
+    return "\n".join(f"<<<ITEM {item_id}>>>\n{text}\n<<<END {item_id}>>>" for item_id in ids)
+
+
+def _payload(text: str) -> Dict:
+    return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP", "index": 0}]}
+
+
+def create_app(config: FakeLLMConfig) -> FastAPI:
+    app = FastAPI(title="Fake Gemini")
+    rng = random.Random(config.seed)
+    stats = {"requests": 0, "errors": 0, "streams": 0}
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    @app.post("/v1beta/models/{model_method}")
+    async def generate(model_method: str, request: Request):
+        method = model_method.partition(":")[2]
+        if method not in ("generateContent", "streamGenerateContent"):
+            return JSONResponse({"error": {"code": 404, "message": f"Unknown method '{method}'"}}, status_code=404)
+        body = await request.json()
+        prompt = "".join(part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", []))
+        stats["requests"] += 1
+        delay = config.latency(rng)
+
+        if rng.random() < config.error_rate:
+            stats["errors"] += 1
+            await asyncio.sleep(delay)
+            return JSONResponse(
+                {"error": {"code": config.error_status, "message": "Injected failure", "status": "UNAVAILABLE"}},
+                status_code=config.error_status
+            )
+
+        text = answer(prompt, config.responses)
+        if method == "generateContent":
+            await asyncio.sleep(delay)
+            return _payload(text)
+
+        stats["streams"] += 1
+        pieces = max(config.stream_chunks, 1)
+        size = math.ceil(len(text) / pieces)
+
+        async def events():
+            # La mitad de la latencia hasta el primer fragmento, el resto repartido
+            await asyncio.sleep(delay / 2)
+            for index in range(0, len(text), size):
+                yield f"data: {json.dumps(_payload(text[index:index + size]))}\r\n\r\n"
+                await asyncio.sleep(delay / 2 / pieces)
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="API de Gemini falsa para pruebas de carga")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", default="lognormal:0.8,0.5",
+                        help="fixed:s | uniform:min,max | normal:media,desv | lognormal:mediana,sigma | exponential:media")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fracción de respuestas con error")
+    parser.add_argument("--error-status", type=int, default=503, help="Estado HTTP de los errores")
+    parser.add_argument("--stream-chunks", type=int, default=4, help="Fragmentos por respuesta en streaming")
+    parser.add_argument("--responses", type=Path, default=None,
+                        help='JSON con {"pseudocode": "...", "python": "..."} para sustituir las respuestas')
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    try:
+        latency = parse_latency(args.latency)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    responses = dict(DEFAULT_RESPONSES)
+    if args.responses is not None:
+        responses.update(json.loads(args.responses.read_text(encoding="utf-8")))
+    config = FakeLLMConfig(
+        latency=latency,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        stream_chunks=args.stream_chunks,
+        responses=responses,
+        seed=args.seed
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
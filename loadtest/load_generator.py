@@ -0,0 +1,228 @@
+"""
+Generador de carga de bucle abierto contra la API.
+
+Lanza peticiones a un ritmo objetivo (constante o Poisson) sin esperar a que
+terminen las anteriores, con una mezcla ponderada de /ast, /normalize y
+/generate, y resume por endpoint: throughput, p50/p95/p99 y tasa de errores.
+
+Las descripciones de /normalize y /generate llevan un sufijo único para no
+salir de la caché del LLM, salvo la fracción --cache-hit-ratio, que repite una
+ya enviada. /ast usa programas del generador de benchmarks.
+
+Uso:
+    python -m loadtest.fake_llm --latency lognormal:0.8,0.5 &
+    LLM_BASE_URL=http://127.0.0.1:9100 python serve.py --workers 4 &
+    python -m loadtest.load_generator --rps 50 --duration 60 --mix ast=6,normalize=2,generate=2
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from app.services.llm_rest import post
+from benchmarks.generator import ProgramGenerator, ProgramShape
+
+DEFAULT_MIX = {"ast": 6.0, "normalize": 2.0, "generate": 2.0}
+
+DESCRIPTIONS = (
+    "Suma los elementos de un arreglo de n enteros",
+    "Busca el valor máximo de un arreglo",
+    "Cuenta cuántos elementos pares hay en una lista",
+    "Ordena un arreglo con el método de inserción",
+    "Calcula el producto de dos matrices cuadradas",
+    "Invierte el orden de los elementos de un arreglo",
+    "Calcula la potencia de un número por multiplicaciones sucesivas",
+    "Busca un elemento en un arreglo recorriéndolo de principio a fin"
+)
+
+# Programas para /ast: (contenido, lenguaje)
+AST_PROGRAMS = 20
+AST_SHAPE = ProgramShape(functions=3, statements=20, depth=3)
+
+
+class Result(NamedTuple):
+    endpoint: str
+    status: int  # 0 = sin respuesta HTTP (conexión o timeout)
+    latency: float
+    error: Optional[str]
+
+
+class Workload:
+    """Peticiones de la mezcla, reproducibles con la semilla"""
+
+    def __init__(self, mix: Dict[str, float], seed: int = 0, cache_hit_ratio: float = 0.0):
+        self.rng = random.Random(seed)
+        self.endpoints = list(mix)
+        self.weights = [mix[name] for name in self.endpoints]
+        self.cache_hit_ratio = cache_hit_ratio
+        self.sent: List[str] = []
+        self.counter = 0
+        self.programs: List[Tuple[str, str]] = []
+        for program_seed in range(AST_PROGRAMS):
+            program = ProgramGenerator(seed + program_seed).program(AST_SHAPE)
+            self.programs += [(program.python, "python"), (program.pseudocode, "pseudocode")]
+
+    def _description(self) -> str:
+        if self.sent and self.rng.random() < self.cache_hit_ratio:
+            return self.rng.choice(self.sent)
+        self.counter += 1
+        description = f"{self.rng.choice(DESCRIPTIONS)} (petición {self.counter})"
+        self.sent.append(description)
+        return description
+
+    def next(self) -> Tuple[str, str, Dict[str, Any]]:
+        """(endpoint, ruta, cuerpo JSON) de la siguiente petición"""
+        endpoint = self.rng.choices(self.endpoints, self.weights)[0]
+        if endpoint == "ast":
+            content, lang = self.rng.choice(self.programs)
+            return endpoint, "/api/v1/ast", {"content": content, "from_lang": lang}
+        if endpoint == "normalize":
+            return endpoint, "/api/v1/normalize", {"content": self._description(), "input_type": "natural_language"}
+        # Un solo archivo para no llenar el directorio de salida
+        return endpoint, "/api/v1/generate", {"description": self._description(), "filename": "loadtest_generate.py"}
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """'ast=6,normalize=2,generate=2' → pesos por endpoint"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"endpoint desconocido '{name}' (opciones: {', '.join(DEFAULT_MIX)})")
+        mix[name] = float(weight or 1)
+    if not any(weight > 0 for weight in mix.values()):
+        raise argparse.ArgumentTypeError("la mezcla necesita algún peso positivo")
+    return mix
+
+
+async def _send(base_url: str, endpoint: str, path: str, payload: Dict[str, Any], timeout: float) -> Result:
+    started = time.perf_counter()
+    try:
+        async def request():
+            response = await post(base_url + path, json.dumps(payload).encode("utf-8"),
+                                  {"Content-Type": "application/json"})
+            body = await response.read()
+            return response.status, body
+
+        status, body = await asyncio.wait_for(request(), timeout=timeout)
+        error = None if status < 400 else body.decode("utf-8", "replace")[:200]
+        return Result(endpoint, status, time.perf_counter() - started, error)
+    except asyncio.TimeoutError:
+        return Result(endpoint, 0, time.perf_counter() - started, "timeout")
+    except (OSError, ValueError) as e:
+        return Result(endpoint, 0, time.perf_counter() - started, f"{e.__class__.__name__}: {e}")
+
+
+async def run_load(base_url: str, workload: Workload, rps: float, duration: float,
+                   timeout: float = 60.0, poisson: bool = False) -> Dict[str, Any]:
+    """Envía peticiones a `rps` durante `duration` segundos y espera a todas"""
+    loop = asyncio.get_running_loop()
+    rng = random.Random(workload.rng.random())
+    tasks = []
+    started = loop.time()
+    offset = 0.0
+    while offset < duration:
+        delay = started + offset - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        endpoint, path, payload = workload.next()
+        tasks.append(asyncio.create_task(_send(base_url.rstrip("/"), endpoint, path, payload, timeout)))
+        offset += rng.expovariate(rps) if poisson else 1 / rps
+    results = await asyncio.gather(*tasks)
+    return summarize(results, loop.time() - started, rps)
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """Percentil por rango más cercano"""
+    if not sorted_values:
+        return None
+    return sorted_values[max(math.ceil(q * len(sorted_values)) - 1, 0)]
+
+
+def _summary(results: List[Result], elapsed: float) -> Dict[str, Any]:
+    latencies = sorted(result.latency for result in results)
+    ok = sum(1 for result in results if 200 <= result.status < 400)
+    statuses = Counter(str(result.status) for result in results if not 200 <= result.status < 400)
+
+    def ms(value: Optional[float]) -> Optional[float]:
+        return None if value is None else round(value * 1000, 1)
+
+    return {
+        "requests": len(results),
+        "ok": ok,
+        "errors": dict(statuses),
+        "error_rate": round(1 - ok / len(results), 4) if results else 0.0,
+        "throughput_rps": round(ok / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": ms(percentile(latencies, 0.50)),
+        "p95_ms": ms(percentile(latencies, 0.95)),
+        "p99_ms": ms(percentile(latencies, 0.99))
+    }
+
+
+def summarize(results: List[Result], elapsed: float, rps: float) -> Dict[str, Any]:
+    by_endpoint: Dict[str, List[Result]] = defaultdict(list)
+    for result in results:
+        by_endpoint[result.endpoint].append(result)
+    samples = {}
+    for result in results:
+        if result.error and result.status not in samples:
+            samples[result.status] = result.error
+    return {
+        "target_rps": rps,
+        "elapsed_s": round(elapsed, 2),
+        "total": _summary(results, elapsed),
+        "endpoints": {name: _summary(items, elapsed) for name, items in sorted(by_endpoint.items())},
+        "error_samples": {str(status): error for status, error in samples.items()}
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"Objetivo {report['target_rps']} rps durante {report['elapsed_s']} s")
+    print(f"{'endpoint':<10} {'peticiones':>10} {'ok':>7} {'errores':>8} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    rows = list(report["endpoints"].items()) + [("total", report["total"])]
+    for name, summary in rows:
+        cells = [f"{'-' if summary[key] is None else summary[key]:>9}" for key in ("p50_ms", "p95_ms", "p99_ms")]
+        print(f"{name:<10} {summary['requests']:>10} {summary['ok']:>7} {summary['error_rate']:>8.1%} "
+              f"{summary['throughput_rps']:>8} " + " ".join(cells))
+    for status, error in report["error_samples"].items():
+        print(f"  estado {status}: {error}")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Carga de bucle abierto con mezcla de /ast, /normalize y /generate")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="URL base de la API")
+    parser.add_argument("--rps", type=float, default=10.0, help="Peticiones por segundo objetivo")
+    parser.add_argument("--duration", type=float, default=30.0, help="Segundos enviando peticiones")
+    parser.add_argument("--mix", type=parse_mix, default=dict(DEFAULT_MIX),
+                        help="Pesos por endpoint, p. ej. ast=6,normalize=2,generate=2")
+    parser.add_argument("--poisson", action="store_true", help="Llegadas de Poisson en vez de intervalo fijo")
+    parser.add_argument("--cache-hit-ratio", type=float, default=0.0,
+                        help="Fracción de descripciones repetidas (aciertos en la caché del LLM)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Timeout por petición (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, default=None, help="Guardar el informe en JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.rps <= 0 or args.duration <= 0:
+        print("❌ --rps y --duration deben ser positivos", file=sys.stderr)
+        return 2
+    workload = Workload(args.mix, seed=args.seed, cache_hit_ratio=args.cache_hit_ratio)
+    report = asyncio.run(run_load(args.url, workload, args.rps, args.duration, args.timeout, args.poisson))
+    print_report(report)
+    if args.json is not None:
+        args.json.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
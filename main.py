@@ -1,8 +1,12 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from app.controllers.analyzer_controller import router as analyzer_router
+from app.controllers.metrics_controller import router as metrics_router
+from app.core.metrics import MetricsMiddleware
 from app.config.settings import settings
+from app.services.ast_service import warm_frontends
 import logging
+import threading
 import uvicorn
 
 # Configurar logging
@@ -31,8 +35,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Duración de cada petición para /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Incluir rutas
 app.include_router(analyzer_router)
+app.include_router(metrics_router)
 
 @app.get("/")
 async def root():
@@ -63,6 +71,11 @@ async def startup_event():
     else:
         logger.info("✅ API de Gemini configurada correctamente")
 
+    # Precalentar frontends en segundo plano: el servidor acepta peticiones ya
+    languages = [name.strip() for name in settings.FRONTEND_WARMUP.split(",") if name.strip()]
+    if languages:
+        threading.Thread(target=warm_frontends, args=(languages,), name="frontend-warmup", daemon=True).start()
+
 @app.on_event("shutdown")
 async def shutdown_event():
     """Eventos de cierre de la aplicación"""
@@ -0,0 +1,194 @@
+"""
+Servidor de producción con workers prefork.
+
+El proceso maestro importa la aplicación, compila la gramática, llena los
+pools de parsers y la caché de parsing con las plantillas, congela el heap
+(gc.freeze) y abre el socket. Después hace fork de N workers uvicorn que
+heredan todo ese estado copy-on-write en lugar de reconstruirlo.
+
+El maestro reinicia los workers que mueren. Con SIGTERM/SIGINT reenvía SIGTERM
+a los workers: uvicorn deja de aceptar conexiones y espera a las peticiones en
+curso hasta SERVER_GRACEFUL_TIMEOUT; los que no terminan reciben SIGKILL.
+
+El cliente de Gemini (gRPC) no se carga en el maestro: cada worker lo crea en
+su primera llamada, porque gRPC no sobrevive a un fork.
+
+Uso:
+    python serve.py --workers 4
+    python serve.py --port 8080 --loop uvloop --http httptools
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict
+
+import uvicorn
+
+from app.config.settings import settings
+
+logger = logging.getLogger("serve")
+
+LOOPS = ("auto", "asyncio", "uvloop")
+HTTP_PARSERS = ("auto", "h11", "httptools")
+
+# Un worker que muere antes de esto cuenta como fallo de arranque
+MIN_WORKER_UPTIME_SECONDS = 1.0
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Servidor de producción con workers prefork")
+    parser.add_argument("--host", default=settings.HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    parser.add_argument("-w", "--workers", type=int, default=settings.SERVER_WORKERS,
+                        help="Procesos worker (0 = uno por CPU)")
+    parser.add_argument("--loop", choices=LOOPS, default=settings.SERVER_LOOP, help="Event loop de los workers")
+    parser.add_argument("--http", choices=HTTP_PARSERS, default=settings.SERVER_HTTP, help="Parser HTTP")
+    parser.add_argument("--backlog", type=int, default=settings.SERVER_BACKLOG)
+    parser.add_argument("--graceful-timeout", type=int, default=settings.SERVER_GRACEFUL_TIMEOUT,
+                        help="Segundos para terminar las peticiones en curso al parar")
+    args = parser.parse_args(argv)
+    if args.workers <= 0:
+        args.workers = os.cpu_count() or 1
+    return args
+
+
+def preload():
+    """Estado caliente que los workers heredan copy-on-write"""
+    started = time.perf_counter()
+    from main import app
+    from app.services.ast_service import parse_program, warm_frontends
+    from app.services.template_service import template_library
+
+    warm_frontends(["pseudocode", "python"])
+    for template in template_library.list():
+        parse_program(template.pseudocode, "pseudocode")
+        parse_program(template.python, "python")
+
+    # Lo que existe ahora no lo vuelve a recorrer el GC: sus páginas no se copian
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Estado precargado en {(time.perf_counter() - started) * 1000:.0f} ms")
+    return app
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class Master:
+    """Crea, vigila y detiene los workers"""
+
+    def __init__(self, app, sock: socket.socket, args: argparse.Namespace):
+        self.app = app
+        self.sock = sock
+        self.args = args
+        self.workers: Dict[int, float] = {}  # pid → instante de arranque
+        self.stopping = False
+
+    def spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                self.serve()
+                code = 0
+            finally:
+                os._exit(code)
+        self.workers[pid] = time.monotonic()
+        logger.info(f"Worker {pid} iniciado")
+
+    def serve(self) -> None:
+        """Cuerpo del worker: uvicorn sobre el socket heredado"""
+        config = uvicorn.Config(
+            self.app,
+            loop=self.args.loop,
+            http=self.args.http,
+            timeout_graceful_shutdown=self.args.graceful_timeout,
+            log_level="info"
+        )
+        uvicorn.Server(config).run(sockets=[self.sock])
+
+    def _stop(self, signum, frame) -> None:
+        self.stopping = True
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        for _ in range(self.args.workers):
+            self.spawn()
+
+        failed_starts = 0
+        while not self.stopping:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                time.sleep(0.2)
+                continue
+            started = self.workers.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+            logger.warning(f"Worker {pid} terminó (estado {status}); se reinicia")
+            failed_starts = failed_starts + 1 if time.monotonic() - started < MIN_WORKER_UPTIME_SECONDS else 0
+            if failed_starts >= self.args.workers:
+                logger.error("Los workers fallan al arrancar; se detiene el servidor")
+                self.shutdown()
+                return 1
+            self.spawn()
+
+        self.shutdown()
+        return 0
+
+    def shutdown(self) -> None:
+        """SIGTERM a los workers y SIGKILL a los que no terminan a tiempo"""
+        logger.info(f"Deteniendo {len(self.workers)} workers")
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + self.args.graceful_timeout + 5
+        while self.workers and time.monotonic() < deadline:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                time.sleep(0.1)
+                continue
+            self.workers.pop(pid, None)
+        for pid in self.workers:
+            logger.warning(f"Worker {pid} no terminó a tiempo; SIGKILL")
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                # Ya terminó y se recogió por otro lado: seguir con el resto
+                pass
+        self.workers.clear()
+        self.sock.close()
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    if not hasattr(os, "fork"):
+        print("❌ serve.py necesita fork (Linux/macOS); usa main.py en este sistema", file=sys.stderr)
+        return 2
+    args = parse_args(argv)
+    app = preload()
+    sock = bind_socket(args.host, args.port, args.backlog)
+    logger.info(f"Escuchando en {args.host}:{args.port} con {args.workers} workers "
+                f"(loop={args.loop}, http={args.http})")
+    return Master(app, sock, args).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
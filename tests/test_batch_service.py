@@ -0,0 +1,107 @@
+"""
+Tests para el procesamiento por lotes y la caché de parsing.
+"""
+import asyncio
+import io
+import json
+import pytest
+from app.services.ast_service import build_ast, analyze_complexity, parse_cache
+from app.services import batch_service
+from app.services.batch_service import batch_admission_limit, stream_batch, iter_json_items, iter_ndjson_lines
+from app.services.parse_executor import parse_executor
+
+
+CODE = """
+def sum_array(arr, n):
+    suma = 0
+    for i in range(n):
+        suma += arr[i]
+    return suma
+"""
+
+
+async def _collect(items, fn, result_key, concurrency=4):
+    lines = []
+    async for line in stream_batch(items, fn, result_key, concurrency=concurrency):
+        lines.append(json.loads(line))
+    return lines
+
+
+def test_batch_reports_each_item():
+    """Test: cada ítem produce una línea, con éxito o con error"""
+    items = [
+        {"id": "ok", "content": CODE, "from_lang": "python"},
+        {"id": "syntax", "content": "def f(\n", "from_lang": "python"},
+        {"id": "lang", "content": CODE, "from_lang": "java"},
+        {"id": "empty", "content": "  "},
+    ]
+    results = asyncio.run(_collect(iter_json_items(items), build_ast, "ast"))
+    by_id = {r["id"]: r for r in results}
+
+    assert len(results) == 4
+    assert by_id["ok"]["ok"] is True
+    assert by_id["ok"]["ast"]["functions"][0]["name"] == "sum_array"
+    assert by_id["syntax"]["error"].startswith("syntax_error")
+    assert "not supported" in by_id["lang"]["error"]
+    assert by_id["empty"]["ok"] is False
+
+
+def test_batch_ndjson_with_invalid_line():
+    """Test: una línea NDJSON inválida no aborta el lote"""
+    body = "\n".join([
+        json.dumps({"id": 1, "content": CODE}),
+        "{not json",
+        json.dumps({"id": 3, "content": CODE}),
+    ])
+    stream = io.BytesIO(body.encode("utf-8"))
+    results = asyncio.run(_collect(iter_ndjson_lines(stream), analyze_complexity, "analysis"))
+
+    assert sorted(r["ok"] for r in results) == [False, True, True]
+    ok = [r for r in results if r["ok"]]
+    assert ok[0]["analysis"]["functions"][0]["name"] == "sum_array"
+    assert {r["index"]: r["id"] for r in results} == {1: 1, 2: None, 3: 3}
+
+
+def test_index_is_separate_from_explicit_ids():
+    """Test: sin id se emite null; el índice nunca se confunde con un id explícito"""
+    items = [{"content": CODE}, {"id": 0, "content": CODE}]
+    results = asyncio.run(_collect(iter_json_items(items), build_ast, "ast"))
+
+    assert sorted((r["index"], r["id"]) for r in results) == [(0, None), (1, 0)]
+
+
+def test_batch_leaves_room_for_interactive_requests(monkeypatch):
+    """Test: los lotes no envían ítems por encima de su límite de admisión"""
+    limit = batch_admission_limit()
+    assert limit < parse_executor.capacity
+    peak = 0
+    real_run = parse_executor.run
+
+    async def run(fn, *args):
+        nonlocal peak
+        peak = max(peak, parse_executor.pending + 1)
+        return await real_run(fn, *args)
+
+    monkeypatch.setattr(parse_executor, "run", run)
+    monkeypatch.setattr(batch_service.settings, "BATCH_MAX_PENDING", 2)
+    items = [{"id": i, "content": CODE} for i in range(20)]
+    results = asyncio.run(_collect(iter_json_items(items), build_ast, "ast", concurrency=10))
+
+    assert all(r["ok"] for r in results)
+    assert peak <= 2
+
+
+def test_repeated_items_hit_parse_cache():
+    """Test: contenidos repetidos se sirven desde la caché"""
+    parse_cache.clear()
+    items = [{"id": i, "content": CODE} for i in range(10)]
+    results = asyncio.run(_collect(iter_json_items(items), build_ast, "ast", concurrency=1))
+
+    assert all(r["ok"] for r in results)
+    stats = parse_cache.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 9
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
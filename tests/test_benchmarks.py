@@ -0,0 +1,54 @@
+"""
+Tests para el generador de programas y la comparación de los benchmarks.
+"""
+import pytest
+from app.core.psc_parser import PseudocodeParser
+from app.core.py_ast_builder import PythonToIR
+from benchmarks.generator import ProgramGenerator, ProgramShape
+from benchmarks.suite import compare, run_suite
+
+
+def test_generator_is_deterministic_and_both_languages_parse():
+    """Test: misma semilla, mismo programa; Python y pseudocódigo construyen el mismo IR"""
+    shape = ProgramShape(functions=5, statements=30, depth=3)
+
+    program = ProgramGenerator(seed=7).program(shape)
+
+    assert program == ProgramGenerator(seed=7).program(shape)
+    assert program.python != ProgramGenerator(seed=8).program(shape).python
+    python_ir = PythonToIR().build(program.python)
+    pseudocode_ir = PseudocodeParser().build(program.pseudocode)
+    assert [func.name for func in python_ir.functions] == [f"f{i}" for i in range(5)]
+    assert [func.name for func in pseudocode_ir.functions] == [f"f{i}" for i in range(5)]
+
+
+def test_generator_respects_depth():
+    """Test: ningún bloque supera el anidamiento pedido"""
+    program = ProgramGenerator(seed=3).python(ProgramShape(functions=10, statements=60, depth=2))
+
+    # Cuerpo de la función (1) + dos niveles de bloques + su contenido
+    deepest = max(len(line) - len(line.lstrip(" ")) for line in program.splitlines()) // 4
+    assert deepest <= 3
+
+
+def test_run_suite_and_compare_flag_regressions():
+    """Test: los resultados se comparan por benchmark contra la línea base"""
+    current = run_suite(["small"], ["python_build", "to_dict"], repeat=1, min_time=0.001)
+    assert set(current["results"]) == {"python_build/small", "to_dict/small"}
+    assert current["results"]["python_build/small"]["min_ms"] > 0
+
+    current["results"] = {
+        "a/small": {"min_ms": 1.3},
+        "b/small": {"min_ms": 1.1},
+        "c/small": {"min_ms": 0.5},
+        "d/small": {"min_ms": 1.0}
+    }
+    baseline = {"results": {name: {"min_ms": 1.0} for name in ("a/small", "b/small", "c/small")}}
+
+    statuses = {row["benchmark"]: row["status"] for row in compare(current, baseline, threshold=0.25)}
+
+    assert statuses == {"a/small": "regression", "b/small": "ok", "c/small": "improvement", "d/small": "new"}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,169 @@
+"""
+Tests para el circuit breaker del LLM y el modo degradado de GeminiService.
+"""
+import asyncio
+import pytest
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+from app.services.gemini_service import GeminiService, LLMTimeoutError
+from app.services.llm_cache import LLMCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class _FlakyModel:
+    """Falla mientras `failing` sea True"""
+
+    def __init__(self, text="def f(n):\n    return n"):
+        self.text = text
+        self.failing = True
+        self.calls = 0
+
+    async def generate_content_async(self, prompt):
+        self.calls += 1
+        if self.failing:
+            raise ConnectionError("upstream unavailable")
+        return _FakeResponse(self.text)
+
+
+def _breaker(clock, **kwargs):
+    options = dict(window=10, min_calls=4, failure_rate=0.5, slow_call_seconds=5.0, open_seconds=30.0, clock=clock)
+    options.update(kwargs)
+    return CircuitBreaker(**options)
+
+
+def test_opens_after_failure_rate_and_rejects():
+    """Test: con la tasa de fallos superada el circuito se abre y rechaza al instante"""
+    clock = _Clock()
+    breaker = _breaker(clock)
+    for ok in (True, False, True, False):
+        breaker.before_call()
+        breaker.record(ok, 0.1)
+
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError) as info:
+        breaker.before_call()
+    assert info.value.retry_after == 30.0
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_slow_calls_open_the_circuit():
+    """Test: llamadas que superan slow_call_seconds cuentan para abrirlo"""
+    clock = _Clock()
+    breaker = _breaker(clock, slow_call_rate=0.75)
+    for _ in range(4):
+        breaker.before_call()
+        breaker.record(True, 6.0)
+
+    assert breaker.state == OPEN
+
+
+def test_half_open_probe_closes_or_reopens():
+    """Test: tras open_seconds pasa una sonda; si sale bien se cierra, si no se reabre"""
+    clock = _Clock()
+    breaker = _breaker(clock, min_calls=1)
+    breaker.before_call()
+    breaker.record(False, 0.1)
+    assert breaker.state == OPEN
+
+    clock.now = 30.0
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+    # Solo una sonda a la vez
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record(False, 0.1)
+    assert breaker.state == OPEN
+
+    clock.now = 60.0
+    breaker.before_call()
+    breaker.record(True, 0.1)
+    assert breaker.state == CLOSED
+    assert breaker.stats()["window_calls"] == 0
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = GeminiService()
+    service.cache = LLMCache(path=tmp_path / "llm.sqlite3", ttl_seconds=3600, max_entries=100)
+    service.breaker = _breaker(_Clock(), min_calls=2)
+    return service
+
+
+def test_open_circuit_fails_fast_without_calling_model(service):
+    """Test: con el circuito abierto no se llama al modelo y sin respaldo local da CircuitOpenError"""
+    model = _FlakyModel()
+    service._get_model = lambda name: model
+
+    for _ in range(2):
+        with pytest.raises(Exception):
+            asyncio.run(service.generate_python_code("invierte una cadena con un bucle"))
+    assert service.breaker.state == OPEN
+    calls = model.calls
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(service.generate_python_code("invierte una cadena con un bucle"))
+    assert model.calls == calls
+
+
+def test_local_saturation_is_not_an_upstream_failure(service):
+    """Test: agotar el deadline esperando el semáforo no cuenta como fallo del LLM"""
+    service._get_model = lambda name: pytest.fail("no debe llamarse al modelo")
+    service.timeout_seconds = 0.05
+    service.max_concurrency = 1
+
+    async def scenario():
+        semaphore = service._limiter()
+        await semaphore.acquire()
+        try:
+            for _ in range(3):
+                with pytest.raises(LLMTimeoutError):
+                    await service._generate_content("prompt", "m")
+        finally:
+            semaphore.release()
+
+    asyncio.run(scenario())
+
+    assert service.breaker.state == CLOSED
+    assert service.breaker_stats()["window_calls"] == 0
+
+
+def test_open_circuit_does_not_relax_template_threshold(service):
+    """Test: con el circuito abierto no se acepta una plantilla parecida pero equivocada"""
+    service.breaker._open()
+    service._get_model = lambda name: pytest.fail("no debe llamarse al modelo")
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(service.normalize_validated("merge sort"))
+
+    result = asyncio.run(service.normalize_validated("calcular el factorial de n"))
+    assert result.model == "template:factorial"
+    assert service.breaker_stats()["degraded_responses"] == 0
+
+
+def test_open_circuit_serves_stale_cache(service, monkeypatch):
+    """Test: una entrada caducada de la caché sirve como respuesta degradada"""
+    model = _FlakyModel()
+    model.failing = False
+    service._get_model = lambda name: model
+    monkeypatch.setattr(service.templates, "enabled", False)
+    description = "devuelve el mismo número"
+    asyncio.run(service.generate_python_code(description))
+
+    service.cache.ttl_seconds = 1e-9  # Todo caduca
+    service.breaker._open()
+    result = asyncio.run(service.generate_python_validated(description))
+
+    assert result.degraded
+    assert result.text == model.text
+    assert model.calls == 1
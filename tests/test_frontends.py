@@ -0,0 +1,92 @@
+"""
+Tests para el registro de frontends de lenguaje y sus pools de builders.
+"""
+import threading
+import pytest
+from app.models.ast_nodes import Program
+from app.services.ast_service import Frontend, frontend_stats, get_frontend, parse_program
+
+
+class CountingBuilder:
+    """Builder falso: cuenta cuántas instancias se construyen"""
+    instances = 0
+
+    def __init__(self):
+        CountingBuilder.instances += 1
+
+    def build(self, content):
+        return Program(functions=[])
+
+
+FACTORY = f"{__name__}:CountingBuilder"
+
+
+@pytest.fixture(autouse=True)
+def _reset_counter():
+    CountingBuilder.instances = 0
+
+
+def test_factory_is_imported_and_built_on_first_use():
+    """Test: registrar un frontend no construye nada hasta usarlo"""
+    frontend = Frontend("fake", FACTORY, pool_size=2)
+    assert frontend.state == "cold"
+    assert CountingBuilder.instances == 0
+
+    frontend.build("x")
+
+    assert frontend.state == "warm"
+    assert frontend.load_ms is not None
+
+
+def test_builders_are_reused_from_the_pool():
+    """Test: las peticiones secuenciales reutilizan un único builder"""
+    frontend = Frontend("fake", FACTORY, pool_size=2)
+    for _ in range(10):
+        frontend.build("x")
+
+    assert CountingBuilder.instances == 1
+    assert frontend.stats()["idle"] == 1
+
+
+def test_concurrent_checkouts_get_distinct_builders():
+    """Test: dos hilos a la vez nunca comparten builder y el pool no crece de pool_size"""
+    frontend = Frontend("fake", FACTORY, pool_size=2)
+    barrier = threading.Barrier(3)
+    seen = []
+
+    def worker():
+        with frontend.builder() as builder:
+            seen.append(builder)
+            barrier.wait()
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(builder) for builder in seen}) == 3
+    assert frontend.stats()["idle"] == 2
+
+
+def test_warm_fills_the_pool():
+    frontend = Frontend("fake", FACTORY, pool_size=3)
+    frontend.warm()
+
+    stats = frontend.stats()
+    assert stats["idle"] == 3
+    assert stats["warmup_ms"] is not None
+    frontend.build("x")
+    assert CountingBuilder.instances == 3
+
+
+def test_registered_languages_and_unknown_language():
+    """Test: python y pseudocode están registrados; otro lenguaje da ValueError"""
+    assert {"python", "pseudocode"} <= set(frontend_stats())
+    assert get_frontend("python").factory == "app.core.py_ast_builder:PythonToIR"
+    with pytest.raises(ValueError, match="not supported"):
+        parse_program("x", "cobol")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,265 @@
+"""
+Tests para GeminiService con un modelo falso (sin llamadas reales a Gemini).
+"""
+import asyncio
+import pytest
+from app.services import gemini_service as gemini_module
+from app.services.gemini_service import GeminiService, LLMTimeoutError, UNVALIDATED
+from app.services.llm_cache import LLMCache
+from app.services.parse_executor import QueueFullError
+
+
+class _FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class _SlowModel:
+    """Modelo que bloquea hasta que el test lo libera"""
+
+    def __init__(self, text="respuesta"):
+        self.text = text
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self.cancelled = 0
+        self.release = asyncio.Event()
+
+    async def generate_content_async(self, prompt):
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.active -= 1
+        return _FakeResponse(self.text)
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = GeminiService()
+    service.cache = LLMCache(path=tmp_path / "llm.sqlite3", ttl_seconds=3600, max_entries=100, enabled=False)
+    return service
+
+
+def _use(service, model):
+    """Todas las peticiones del servicio van al modelo falso"""
+    service._get_model = lambda name: model
+    return model
+
+
+def test_identical_prompts_share_one_call(service):
+    """Test: N llamadas concurrentes con el mismo prompt hacen una sola petición"""
+    model = _use(service, _SlowModel())
+
+    async def scenario():
+        callers = [asyncio.ensure_future(service._generate_content("mismo prompt", "m")) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        model.release.set()
+        return await asyncio.gather(*callers)
+
+    results = asyncio.run(scenario())
+
+    assert results == ["respuesta"] * 5
+    assert model.calls == 1
+    assert service.coalesced_calls == 4
+    assert service._inflight == {}
+
+
+def test_different_prompts_are_not_coalesced(service):
+    """Test: prompts distintos generan peticiones distintas"""
+    model = _use(service, _SlowModel())
+    model.release.set()
+
+    async def scenario():
+        return await asyncio.gather(
+            service._generate_content("prompt a", "m"),
+            service._generate_content("prompt b", "m")
+        )
+
+    asyncio.run(scenario())
+    assert model.calls == 2
+
+
+def test_cancelling_one_caller_keeps_shared_call(service):
+    """Test: cancelar un llamador no cancela la petición de los demás"""
+    model = _use(service, _SlowModel())
+
+    async def scenario():
+        first = asyncio.ensure_future(service._generate_content("prompt", "m"))
+        second = asyncio.ensure_future(service._generate_content("prompt", "m"))
+        await asyncio.sleep(0.05)
+
+        first.cancel()
+        await asyncio.sleep(0)
+        model.release.set()
+
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "respuesta"
+    assert model.calls == 1
+
+
+def test_errors_reach_every_waiter(service):
+    """Test: un error upstream llega a todos los llamadores en espera"""
+    class _FailingModel:
+        async def generate_content_async(self, prompt):
+            raise RuntimeError("upstream caído")
+
+    model = _use(service, _FailingModel())
+
+    async def scenario():
+        return await asyncio.gather(
+            service._generate_content("prompt", "m"),
+            service._generate_content("prompt", "m"),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert service._inflight == {}
+
+
+def test_deadline_cancels_upstream_call(service):
+    """Test: al vencer el deadline se cancela la llamada upstream"""
+    model = _use(service, _SlowModel())
+    service.timeout_seconds = 0.05
+
+    with pytest.raises(LLMTimeoutError):
+        asyncio.run(service._generate_content("prompt lento", "m"))
+
+    assert model.cancelled == 1
+    assert service.inflight_calls == 0
+
+
+def test_semaphore_caps_inflight_calls(service):
+    """Test: nunca hay más llamadas upstream simultáneas que el límite"""
+    model = _use(service, _SlowModel())
+    service.max_concurrency = 2
+
+    async def scenario():
+        callers = [asyncio.ensure_future(service._generate_content(f"prompt {i}", "m")) for i in range(6)]
+        await asyncio.sleep(0.05)
+        assert service.inflight_calls == 2
+        model.release.set()
+        await asyncio.gather(*callers)
+
+    asyncio.run(scenario())
+    assert model.calls == 6
+    assert model.max_active == 2
+
+
+class _StreamingModel:
+    """Modelo que entrega la respuesta en varios fragmentos"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.calls = 0
+
+    async def generate_content_async(self, prompt, stream=False):
+        self.calls += 1
+
+        async def _iterate():
+            for chunk in self.chunks:
+                await asyncio.sleep(0)
+                yield _FakeResponse(chunk)
+
+        return _iterate()
+
+
+def test_stream_relays_chunks_and_fills_cache(service, tmp_path):
+    """Test: los fragmentos llegan en orden y la respuesta completa queda en caché"""
+    service.cache = LLMCache(path=tmp_path / "stream.sqlite3", ttl_seconds=3600, max_entries=100)
+    model = _use(service, _StreamingModel(["\ndef f(n):\n", "    return n", "\n"]))
+
+    async def collect():
+        return [chunk async for chunk in service.stream_python_code("identidad")]
+
+    assert asyncio.run(collect()) == ["\ndef f(n):\n", "    return n", "\n"]
+    # La segunda vez se sirve completo desde la caché, ya limpio
+    assert asyncio.run(collect()) == ["def f(n):\n    return n"]
+    assert model.calls == 1
+    assert service.inflight_calls == 0
+
+
+def test_stream_does_not_cache_invalid_output(service, tmp_path):
+    """Test: una salida en streaming que no parsea no se sirve luego como válida"""
+    service.cache = LLMCache(path=tmp_path / "stream.sqlite3", ttl_seconds=3600, max_entries=100)
+    service.batch_enabled = False
+    model = _use(service, _StreamingModel(["def f(n)\n", "    return n"]))
+
+    async def collect():
+        return [chunk async for chunk in service.stream_python_code("identidad rota")]
+
+    asyncio.run(collect())
+    asyncio.run(collect())
+
+    assert model.calls == 2
+
+
+def test_full_parse_queue_is_reported_as_unvalidated(service, tmp_path, monkeypatch):
+    """Test: sin hueco en la cola de parsing la salida no se marca válida ni se cachea"""
+    service.cache = LLMCache(path=tmp_path / "queue.sqlite3", ttl_seconds=3600, max_entries=100)
+    service.batch_enabled = False
+    model = _use(service, _FixedModel("def f(n):\n    return n\n"))
+
+    async def queue_full(*args):
+        raise QueueFullError(1)
+
+    monkeypatch.setattr(gemini_module.parse_executor, "run", queue_full)
+
+    first = asyncio.run(service.generate_python_validated("identidad"))
+    asyncio.run(service.generate_python_validated("identidad"))
+
+    assert first.error == UNVALIDATED
+    assert first.repairs == 0
+    assert model.calls == 2
+    assert service.repair_stats()["unvalidated"] == 2
+
+
+class _FixedModel:
+    def __init__(self, text):
+        self.text = text
+        self.calls = 0
+
+    async def generate_content_async(self, prompt):
+        self.calls += 1
+        return _FakeResponse(self.text)
+
+
+def test_invalid_fast_output_escalates_to_strong_model(service):
+    """Test: si la salida del modelo rápido no parsea, la repara el fuerte"""
+    models = {
+        service.router.fast_model: _FixedModel("def roto(:\n    pass"),
+        service.router.strong_model: _FixedModel("def f(n):\n    return n")
+    }
+    service._get_model = lambda name: models[name]
+
+    code = asyncio.run(service.generate_python_code("identidad"))
+
+    assert code == "def f(n):\n    return n"
+    assert models[service.router.fast_model].calls == 1
+    assert models[service.router.strong_model].calls == 1
+    assert service.router.escalations == 1
+
+
+def test_valid_fast_output_is_not_escalated(service):
+    """Test: una salida válida del modelo rápido se devuelve sin escalar"""
+    fast = _FixedModel("def f(n):\n    return n")
+    service._get_model = lambda name: fast
+
+    asyncio.run(service.generate_python_code("identidad"))
+
+    assert fast.calls == 1
+    assert service.router.escalations == 0
+    assert service.router.p95(service.router.fast_model) is not None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
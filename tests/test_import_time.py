@@ -0,0 +1,66 @@
+"""
+Tests de presupuesto de arranque con `python -X importtime`.
+
+Un worker que sólo sirve /ast no debe cargar el cliente de Gemini (su import
+arrastra google.ai.generativelanguage e IPython) ni necesitar GEMINI_API_KEY.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Import acumulado máximo del núcleo de parsing (hoy ~0.1 s; Gemini sumaba ~0.7 s)
+PARSE_IMPORT_BUDGET_US = 500_000
+
+# Módulos que sólo deben cargarse al llamar al LLM
+LAZY_MODULES = ("google.generativeai", "google.ai.generativelanguage", "IPython")
+
+
+def _importtime(module: str) -> Dict[str, int]:
+    """Tiempo acumulado (µs) de cada módulo importado al importar `module` en limpio"""
+    env = dict(os.environ, GEMINI_API_KEY="")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_controller_imports_without_gemini_client():
+    """Test: el controlador importa sin API key y sin cargar google.generativeai"""
+    times = _importtime("app.controllers.analyzer_controller")
+
+    loaded = [module for module in LAZY_MODULES if module in times]
+    assert loaded == []
+
+
+def test_frontends_load_on_first_use():
+    """Test: importar el servicio de AST no importa Lark ni los frontends"""
+    times = _importtime("app.services.ast_service")
+
+    assert "lark" not in times
+    assert "app.core.psc_parser" not in times
+    assert "app.core.py_ast_builder" not in times
+
+
+def test_parse_core_import_budget():
+    """Test: el núcleo de parsing importa dentro del presupuesto"""
+    times = _importtime("app.services.ast_service")
+
+    assert times["app.services.ast_service"] < PARSE_IMPORT_BUDGET_US
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
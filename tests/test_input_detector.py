@@ -0,0 +1,62 @@
+"""
+Tests para la detección del tipo de entrada, medida sobre un corpus etiquetado.
+"""
+import ast
+import json
+from pathlib import Path
+import lark
+import pytest
+from app.models.schemas import InputType
+from app.services.input_detector import detect_input_type
+
+CORPUS_PATH = Path(__file__).parent / "data" / "input_type_corpus.json"
+MIN_PRECISION = 0.9
+MIN_RECALL = 0.9
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    with CORPUS_PATH.open(encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_precision_and_recall_per_type(corpus):
+    """Test: cada tipo supera los umbrales de precisión y recall en el corpus"""
+    predictions = [(item["label"], detect_input_type(item["content"]).value) for item in corpus]
+
+    for input_type in InputType:
+        label = input_type.value
+        true_positives = sum(1 for expected, got in predictions if expected == label and got == label)
+        predicted = sum(1 for _, got in predictions if got == label)
+        actual = sum(1 for expected, _ in predictions if expected == label)
+        assert actual > 0, label
+
+        precision = true_positives / predicted if predicted else 0.0
+        recall = true_positives / actual
+        assert precision >= MIN_PRECISION, f"{label}: precision {precision:.2f}"
+        assert recall >= MIN_RECALL, f"{label}: recall {recall:.2f}"
+
+
+@pytest.mark.parametrize("content, expected", [
+    ("x 🡨 x + 1", InputType.PSEUDOCODE),
+    ("def f(n):\n    return n", InputType.PYTHON),
+    ("Ordena una lista con el algoritmo de burbuja", InputType.NATURAL_LANGUAGE),
+    ("Quiero un for que recorra la lista y, si el elemento es par, lo imprima.", InputType.NATURAL_LANGUAGE),
+])
+def test_strong_signals(content, expected):
+    assert detect_input_type(content) == expected
+
+
+def test_detection_does_not_parse(corpus, monkeypatch):
+    """Test: la detección usa solo señales de texto, sin ningún parser"""
+    def forbidden(*args, **kwargs):
+        raise AssertionError("detect_input_type no debe parsear la entrada")
+
+    monkeypatch.setattr(lark.Lark, "parse", forbidden)
+    monkeypatch.setattr(ast, "parse", forbidden)
+    for item in corpus:
+        detect_input_type(item["content"])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
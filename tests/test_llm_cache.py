@@ -0,0 +1,130 @@
+"""
+Tests para la caché persistente de respuestas del LLM.
+"""
+import asyncio
+import threading
+import time
+import pytest
+from app.services import llm_cache as llm_cache_module
+from app.services.llm_cache import LLMCache, normalize_description
+from app.services.gemini_service import GeminiService
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMCache(path=tmp_path / "llm.sqlite3", ttl_seconds=3600, max_entries=100)
+
+
+def test_key_ignores_case_and_whitespace():
+    """Test: la misma descripción con otro formato produce la misma clave"""
+    a = LLMCache.key("normalize", "v1", "gemini", "Ordenar  una lista\ncon BURBUJA ")
+    b = LLMCache.key("normalize", "v1", "gemini", "ordenar una lista con burbuja")
+    assert a == b
+    assert normalize_description("  A\tB  ") == "a b"
+
+
+def test_key_depends_on_template_and_model():
+    """Test: versión de plantilla y modelo forman parte de la clave"""
+    base = LLMCache.key("normalize", "v1", "gemini-pro", "factorial")
+    assert base != LLMCache.key("normalize", "v2", "gemini-pro", "factorial")
+    assert base != LLMCache.key("normalize", "v1", "gemini-flash", "factorial")
+    assert base != LLMCache.key("python", "v1", "gemini-pro", "factorial")
+
+
+def test_get_put_and_hit_ratio(cache):
+    """Test: las respuestas persisten y se cuentan aciertos y fallos"""
+    key = LLMCache.key("python", "v1", "m", "factorial")
+    assert cache.get(key) is None
+    cache.put(key, "def factorial(n): ...")
+    assert cache.get(key) == "def factorial(n): ..."
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+
+
+def test_persists_across_instances(cache, tmp_path):
+    """Test: otra instancia (otro worker) lee la misma base"""
+    key = LLMCache.key("python", "v1", "m", "busqueda binaria")
+    cache.put(key, "codigo")
+    other = LLMCache(path=tmp_path / "llm.sqlite3", ttl_seconds=3600, max_entries=100)
+    assert other.get(key) == "codigo"
+
+
+def test_ttl_expiration(cache, monkeypatch):
+    """Test: las entradas expiradas no se devuelven"""
+    key = LLMCache.key("python", "v1", "m", "fibonacci")
+    cache.put(key, "codigo")
+    later = time.time() + 7200
+    monkeypatch.setattr(llm_cache_module.time, "time", lambda: later)
+    assert cache.get(key) is None
+
+
+def test_lru_eviction(tmp_path, monkeypatch):
+    """Test: al superar el máximo se eliminan las de acceso más antiguo"""
+    cache = LLMCache(path=tmp_path / "llm.sqlite3", ttl_seconds=0, max_entries=2)
+    clock = [1000.0]
+    monkeypatch.setattr(llm_cache_module.time, "time", lambda: clock[0])
+
+    for name in ("a", "b", "c"):
+        clock[0] += 100
+        cache.put(name, name.upper())
+    clock[0] += 100
+    cache.get("a")
+    cache.evict()
+
+    assert cache.get("a") == "A"
+    assert cache.get("b") is None
+    assert cache.get("c") == "C"
+
+
+def test_async_access_runs_off_the_event_loop(cache, monkeypatch):
+    """Test: aget/aput hacen la E/S de SQLite en los hilos de la caché"""
+    threads = []
+    real_get = cache.get
+
+    def get(key, allow_stale=False):
+        threads.append(threading.current_thread().name)
+        return real_get(key, allow_stale)
+
+    monkeypatch.setattr(cache, "get", get)
+
+    async def roundtrip():
+        await cache.aput("clave", "codigo")
+        return await cache.aget("clave")
+
+    assert asyncio.run(roundtrip()) == "codigo"
+    assert threads and all(name.startswith("llm-cache") for name in threads)
+
+
+class _FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class _FakeModel:
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_content_async(self, prompt):
+        self.calls += 1
+        return _FakeResponse("def f(n):\n    return n\n")
+
+
+def test_service_serves_repeat_requests_from_cache(cache):
+    """Test: una descripción ya vista no vuelve a llamar al modelo"""
+    service = GeminiService()
+    model = _FakeModel()
+    service._get_model = lambda name: model
+    service.cache = cache
+
+    first = asyncio.run(service.generate_python_code("Funcion identidad"))
+    second = asyncio.run(service.generate_python_code("  funcion   IDENTIDAD "))
+
+    assert first == second
+    assert model.calls == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
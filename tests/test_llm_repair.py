@@ -0,0 +1,127 @@
+"""
+Tests para la reparación dirigida de salidas del LLM.
+"""
+import asyncio
+import pytest
+from app.services.gemini_service import GeminiService
+from app.services.llm_cache import LLMCache
+from app.services.llm_repair import apply_repair, build_repair, error_line, offending_span
+
+PYTHON_WITHOUT_RANGE = """def suma(lista):
+    total = 0
+    for x in lista:
+        total = total + x
+    return total"""
+
+PSEUDOCODE_WITH_EQUAL = """suma(n)
+begin
+   s 🡨 0
+   for i 🡨 1 to n do
+   begin
+      s = s + i
+   end
+   return s
+end"""
+
+
+def test_error_line_from_parser_messages():
+    """Test: se extrae la línea de los mensajes de ambos frontends"""
+    assert error_line("For loop at line 3 must use range()") == 3
+    assert error_line("Unexpected token Token('EQUAL', '=') at line 6, column 9.") == 6
+    assert error_line("Unexpected end-of-input") is None
+
+
+def test_python_span_covers_statement_body():
+    """Test: el fragmento es la sentencia con su cuerpo, no el programa"""
+    lines = PYTHON_WITHOUT_RANGE.split("\n")
+    assert offending_span(lines, 3, "python") == (3, 4)
+
+
+def test_pseudocode_span_includes_begin_end_block():
+    """Test: en pseudocódigo se incluye el bloque begin ... end siguiente"""
+    lines = PSEUDOCODE_WITH_EQUAL.split("\n")
+    assert offending_span(lines, 4, "pseudocode") == (4, 7)
+    assert offending_span(lines, 6, "pseudocode") == (6, 6)
+
+
+def test_repair_prompt_contains_only_the_fragment():
+    """Test: el prompt lleva el error y el fragmento, no el resto del programa"""
+    request = build_repair(PYTHON_WITHOUT_RANGE, "For loop at line 3 must use range()", "python")
+    assert "líneas 3-4" in request.prompt
+    assert "for x in lista:" in request.prompt
+    assert "def suma" not in request.prompt
+    assert "return total" not in request.prompt
+
+
+def test_apply_repair_splices_and_restores_indent():
+    """Test: el fragmento corregido sustituye sólo las líneas afectadas"""
+    request = build_repair(PYTHON_WITHOUT_RANGE, "For loop at line 3 must use range()", "python")
+    fixed = "```python\nfor i in range(len(lista)):\n    total = total + lista[i]\n```"
+    repaired = apply_repair(PYTHON_WITHOUT_RANGE, request, fixed)
+    assert repaired == (
+        "def suma(lista):\n"
+        "    total = 0\n"
+        "    for i in range(len(lista)):\n"
+        "        total = total + lista[i]\n"
+        "    return total"
+    )
+
+
+class _FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class _ScriptedModel:
+    """Devuelve las respuestas en orden y guarda los prompts recibidos"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.prompts = []
+
+    async def generate_content_async(self, prompt):
+        self.prompts.append(prompt)
+        return _FakeResponse(self.responses[min(len(self.prompts), len(self.responses)) - 1])
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = GeminiService()
+    service.cache = LLMCache(path=tmp_path / "llm.sqlite3", ttl_seconds=3600, max_entries=100)
+    return service
+
+
+def test_invalid_output_is_repaired_with_one_extra_call(service):
+    """Test: una salida inválida se corrige con un único prompt de reparación"""
+    model = _ScriptedModel([
+        PYTHON_WITHOUT_RANGE,
+        "    for i in range(len(lista)):\n        total = total + lista[i]"
+    ])
+    service._get_model = lambda name: model
+
+    code = asyncio.run(service.generate_python_code("sumar una lista"))
+
+    assert "range(len(lista))" in code
+    assert len(model.prompts) == 2
+    assert "def suma" not in model.prompts[1]
+    assert service.repair_stats()["repair_calls"] == 1
+
+
+def test_repairs_are_capped_and_invalid_output_not_cached(service):
+    """Test: tras max_repairs intentos se devuelve la salida con su error"""
+    model = _ScriptedModel([PSEUDOCODE_WITH_EQUAL, "      s = s + i"])
+    service._get_model = lambda name: model
+    service.max_repairs = 2
+
+    result = asyncio.run(service.normalize_validated("sumar de 1 a n"))
+
+    assert result.error is not None
+    assert result.repairs == 2
+    assert len(model.prompts) == 3
+    # No quedó en caché: la siguiente petición vuelve a llamar al modelo
+    asyncio.run(service.normalize_validated("sumar de 1 a n"))
+    assert len(model.prompts) == 6
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
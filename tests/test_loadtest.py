@@ -0,0 +1,125 @@
+"""
+Tests para el LLM falso, el cliente REST de GeminiService y el generador de carga.
+"""
+import asyncio
+import random
+import socket
+import threading
+import time
+import pytest
+import uvicorn
+from app.services.gemini_service import GeminiService, PYTHON_INSTRUCTIONS, build_normalize_prompt
+from app.services.llm_batch import build_batch_prompt, split_batch_response
+from app.services.llm_cache import LLMCache
+from app.services.llm_rest import LLMHTTPError
+from loadtest.fake_llm import DEFAULT_RESPONSES, FakeLLMConfig, answer, create_app, parse_latency
+from loadtest.load_generator import Result, Workload, percentile, summarize
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def fake_llm():
+    """Arranca el LLM falso en un hilo y devuelve (url, config)"""
+    config = FakeLLMConfig(seed=1)
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(create_app(config), host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        assert time.monotonic() < deadline, "el LLM falso no arrancó"
+        time.sleep(0.05)
+    yield f"http://127.0.0.1:{port}", config
+    server.should_exit = True
+    thread.join(timeout=5)
+
+
+def _service(url: str, tmp_path) -> GeminiService:
+    service = GeminiService()
+    service.base_url = url
+    service.batch_enabled = False
+    service.cache = LLMCache(path=tmp_path / "llm.sqlite3", ttl_seconds=3600, max_entries=100)
+    return service
+
+
+def test_latency_specs():
+    """Test: cada distribución produce valores no negativos; las inválidas fallan"""
+    rng = random.Random(0)
+    assert parse_latency("fixed:0.25")(rng) == 0.25
+    assert 0.1 <= parse_latency("uniform:0.1,0.2")(rng) <= 0.2
+    assert parse_latency("normal:0,1")(rng) >= 0
+    assert parse_latency("lognormal:0.5,0.3")(rng) > 0
+    with pytest.raises(ValueError):
+        parse_latency("pareto:1")
+    with pytest.raises(ValueError):
+        parse_latency("uniform:1")
+
+
+def test_fake_answers_by_prompt_kind_and_batch_ids():
+    """Test: pseudocódigo o Python según el prompt, y un bloque por id en los lotes"""
+    assert answer(build_normalize_prompt("suma"), DEFAULT_RESPONSES) == DEFAULT_RESPONSES["pseudocode"]
+
+    batch = build_batch_prompt(PYTHON_INSTRUCTIONS, [("1", "suma"), ("2", "máximo")])
+    parts = split_batch_response(answer(batch, DEFAULT_RESPONSES))
+
+    assert parts == {"1": DEFAULT_RESPONSES["python"], "2": DEFAULT_RESPONSES["python"]}
+
+
+def test_service_calls_fake_llm_over_rest(fake_llm, tmp_path):
+    """Test: con base_url el servicio habla con el LLM falso, también en streaming"""
+    url, _ = fake_llm
+    service = _service(url, tmp_path)
+
+    result = asyncio.run(service.generate_python_validated("Calcula algo único"))
+
+    assert result.text == DEFAULT_RESPONSES["python"]
+    assert result.error is None
+
+    async def stream():
+        return [chunk async for chunk in service._stream_content(build_normalize_prompt("suma"), "fake-model")]
+
+    chunks = asyncio.run(stream())
+    assert "".join(chunks) == DEFAULT_RESPONSES["pseudocode"]
+    assert len(chunks) > 1
+
+
+def test_upstream_errors_reach_the_breaker(fake_llm, tmp_path):
+    """Test: los errores inyectados llegan como LLMHTTPError y cuentan como fallos"""
+    url, config = fake_llm
+    config.error_rate = 1.0
+    service = _service(url, tmp_path)
+
+    with pytest.raises(LLMHTTPError) as exc:
+        asyncio.run(service._generate_content("prompt", "fake-model"))
+
+    assert exc.value.status == 503
+    breaker = service.breaker_stats()
+    assert breaker["window_calls"] == 1
+    assert breaker["failure_rate"] == 1.0
+
+
+def test_workload_and_report():
+    """Test: la mezcla es reproducible y el informe calcula percentiles y errores"""
+    first = Workload({"ast": 1, "normalize": 1}, seed=3)
+    second = Workload({"ast": 1, "normalize": 1}, seed=3)
+    assert [first.next() for _ in range(10)] == [second.next() for _ in range(10)]
+
+    assert percentile([1, 2, 3, 4], 0.5) == 2
+    assert percentile([1, 2, 3, 4], 0.99) == 4
+
+    results = [Result("ast", 200, 0.01 * i, None) for i in range(1, 10)] + [Result("ast", 503, 1.0, "down")]
+    report = summarize(results, elapsed=2.0, rps=5)
+
+    assert report["total"]["requests"] == 10
+    assert report["total"]["error_rate"] == 0.1
+    assert report["total"]["throughput_rps"] == 4.5
+    assert report["endpoints"]["ast"]["errors"] == {"503": 1}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,87 @@
+"""
+Tests para las métricas de latencia por etapa y su formato Prometheus.
+"""
+import asyncio
+import pytest
+from app.controllers.metrics_controller import render_metrics
+from app.core import metrics
+from app.core.metrics import Histogram, MetricsMiddleware, http_request_seconds, stage_seconds
+from app.services.ast_service import analyze_complexity, build_ast
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test: los buckets son acumulados y terminan en +Inf con el total"""
+    histogram = Histogram("demo_seconds", "Demo", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, stage="x")
+
+    lines = histogram.render()
+
+    assert 'demo_seconds_bucket{stage="x",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{stage="x",le="1"} 3' in lines
+    assert 'demo_seconds_bucket{stage="x",le="+Inf"} 4' in lines
+    assert 'demo_seconds_count{stage="x"} 4' in lines
+    assert 'demo_seconds_sum{stage="x"} 4.05' in lines
+
+
+def test_parse_stages_are_recorded():
+    """Test: build_ast y analyze_complexity observan parse, transformación, to_dict y complejidad"""
+    source = "def metricas_demo(n):\n    return n"
+    before = (stage_seconds.snapshot(stage="parse", lang="python") or {"count": 0})["count"]
+
+    build_ast(source, "python")
+    analyze_complexity(source, "python")
+
+    assert stage_seconds.snapshot(stage="parse", lang="python")["count"] == before + 1
+    for stage in ("ir_transform", "to_dict", "complexity"):
+        assert stage_seconds.snapshot(stage=stage, lang="python")["count"] >= 1
+
+    text = render_metrics()
+    assert '# TYPE analyzer_stage_seconds histogram' in text
+    assert 'analyzer_stage_seconds_count{lang="python",stage="to_dict"}' in text
+    assert 'analyzer_cache_hit_ratio{cache="parse"}' in text
+    assert 'analyzer_llm_inflight_calls 0' in text
+
+
+def test_middleware_labels_by_route_template():
+    """Test: la petición se registra con la plantilla de la ruta y el estado"""
+
+    class _Route:
+        path = "/items/{item_id}"
+
+    async def app(scope, receive, send):
+        scope["route"] = _Route()
+        await send({"type": "http.response.start", "status": 404})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": "/items/42"}
+    asyncio.run(MetricsMiddleware(app)(scope, None, send))
+
+    assert http_request_seconds.snapshot(method="GET", path="/items/{item_id}", status="404")["count"] == 1
+
+
+def test_timer_records_one_observation_per_use(monkeypatch):
+    """Test: cada uso del temporizador suma una observación en su bucket, también si hay excepción"""
+    clock = iter([0.0, 0.05, 1.0, 3.0] * 1000)
+    monkeypatch.setattr(metrics.time, "perf_counter", lambda: next(clock))
+    histogram = Histogram("timer_seconds", "Timer", buckets=(0.1, 1.0))
+
+    for _ in range(1000):
+        with histogram.time(stage="noop"):
+            pass
+        with pytest.raises(ValueError):
+            with histogram.time(stage="noop"):
+                raise ValueError("falla")
+
+    assert histogram.snapshot(stage="noop") == {"count": 2000, "sum": pytest.approx(2050.0)}
+    lines = histogram.render()
+    assert 'timer_seconds_bucket{stage="noop",le="0.1"} 1000' in lines
+    assert 'timer_seconds_bucket{stage="noop",le="1"} 1000' in lines
+    assert 'timer_seconds_bucket{stage="noop",le="+Inf"} 2000' in lines
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
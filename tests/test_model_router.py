@@ -0,0 +1,95 @@
+"""
+Tests para el enrutador adaptativo de modelos.
+"""
+import pytest
+from app.services.model_router import LatencyTracker, ModelRouter
+
+
+@pytest.fixture
+def router():
+    return ModelRouter(
+        fast_model="fast",
+        strong_model="strong",
+        latency_slo_seconds=2.0,
+        long_input_chars=100,
+        window=20
+    )
+
+
+def test_percentile_uses_sliding_window():
+    """Test: el p95 se calcula sólo sobre las últimas muestras"""
+    tracker = LatencyTracker(window=20)
+    assert tracker.percentile(95) is None
+    for i in range(1, 21):
+        tracker.record(float(i))
+    assert tracker.percentile(95) == 19.0
+
+    for _ in range(20):
+        tracker.record(1.0)
+    assert tracker.percentile(95) == 1.0
+    assert len(tracker) == 20
+
+
+def test_short_input_goes_to_fast_model(router):
+    """Test: por defecto se usa el modelo rápido"""
+    assert router.choose("factorial") == "fast"
+
+
+def test_long_input_goes_to_strong_model(router):
+    """Test: las entradas largas van directamente al modelo fuerte"""
+    assert router.choose("x" * 100) == "strong"
+
+
+def test_slow_fast_model_switches_to_strong(router):
+    """Test: si el rápido incumple el SLO y el fuerte va mejor, se cambia"""
+    for _ in range(20):
+        router.record("fast", 5.0)
+    assert router.choose("factorial") == "strong"
+
+    for _ in range(20):
+        router.record("strong", 8.0)
+    assert router.choose("factorial") == "fast"
+
+
+def test_fast_model_gets_probes_while_diverted():
+    """Test: con el rápido fuera del SLO, una de cada N peticiones lo sondea y puede recuperarse"""
+    router = ModelRouter("fast", "strong", latency_slo_seconds=2.0, long_input_chars=100, window=20, probe_every=10)
+    for _ in range(20):
+        router.record("fast", 5.0)
+
+    picks = [router.choose("factorial") for _ in range(1000)]
+    assert picks.count("fast") == 100
+    assert router.stats()["probes"] == 100
+
+    # Las sondas traen latencias buenas y el rápido vuelve a recibir tráfico
+    for _ in range(20):
+        router.record("fast", 0.5)
+    assert router.choose("factorial") == "fast"
+
+
+def test_latency_samples_expire_by_age():
+    """Test: las muestras viejas dejan de contar aunque no lleguen nuevas"""
+    clock = [0.0]
+    router = ModelRouter("fast", "strong", latency_slo_seconds=2.0, long_input_chars=100, window=20,
+                         sample_max_age_seconds=60, clock=lambda: clock[0])
+    for _ in range(20):
+        router.record("fast", 5.0)
+    assert router.choose("factorial") == "strong"
+
+    clock[0] = 61.0
+    assert router.p95("fast") is None
+    assert router.choose("factorial") == "fast"
+
+
+def test_escalate_counts_and_stops_at_strong(router):
+    """Test: el escalado devuelve el fuerte una vez y no pasa de él"""
+    assert router.escalate("fast") == "strong"
+    assert router.escalate("strong") is None
+
+    stats = router.stats()
+    assert stats["escalations"] == 1
+    assert stats["models"]["strong"]["requests"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,109 @@
+"""
+Tests para el análisis offline de directorios.
+"""
+import json
+import os
+import pytest
+from app.services.offline_analyzer import analyze_directory, read_records
+
+
+PYTHON_CODE = """
+def factorial(n):
+    if n <= 1:
+        return 1
+    return n * factorial(n - 1)
+"""
+
+PSEUDO_CODE = """
+procedimiento suma(a, b)
+begin
+    return a + b
+end
+"""
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    root = tmp_path / "corpus"
+    (root / "sub").mkdir(parents=True)
+    (root / "factorial.py").write_text(PYTHON_CODE, encoding="utf-8")
+    (root / "sub" / "suma.psc").write_text(PSEUDO_CODE, encoding="utf-8")
+    (root / "sub" / "swap.py").write_text("def f(a, b):\n    a, b = b, a\n", encoding="utf-8")
+    (root / "notes.md").write_text("ignorado", encoding="utf-8")
+    return root
+
+
+def _read_jsonl(path):
+    return {os.path.basename(r["path"]): r for r in map(json.loads, path.read_text(encoding="utf-8").splitlines())}
+
+
+def test_routes_files_by_extension(corpus, tmp_path):
+    """Test: .py va a PythonToIR y .psc a PseudocodeParser"""
+    output = tmp_path / "out.jsonl"
+    summary = analyze_directory(corpus, output, jobs=1, cache_path=tmp_path / "cache.json")
+
+    assert summary["files"] == 3
+    assert summary["analyzed"] == 3
+    assert summary["errors"] == 1
+
+    records = _read_jsonl(output)
+    assert records["factorial.py"]["lang"] == "python"
+    assert list(records["factorial.py"]["complexity"]) == ["factorial"]
+    assert records["suma.psc"]["lang"] == "pseudocode"
+    assert records["suma.psc"]["ast"]["functions"][0]["name"] == "suma"
+    assert records["swap.py"]["error"].startswith("unsupported_syntax")
+
+
+def test_skip_cache_avoids_reanalysis(corpus, tmp_path):
+    """Test: archivos sin cambios se reutilizan; los modificados se reanalizan"""
+    cache = tmp_path / "cache.json"
+    analyze_directory(corpus, tmp_path / "first.jsonl", jobs=1, cache_path=cache)
+
+    summary = analyze_directory(corpus, tmp_path / "second.jsonl", jobs=1, cache_path=cache)
+    assert summary["analyzed"] == 0
+    assert summary["skipped"] == 3
+    assert _read_jsonl(tmp_path / "second.jsonl") == _read_jsonl(tmp_path / "first.jsonl")
+
+    # Mismo contenido con otro mtime: se compara el hash y no se parsea
+    stat = (corpus / "factorial.py").stat()
+    os.utime(corpus / "factorial.py", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    (corpus / "sub" / "suma.psc").write_text(PSEUDO_CODE.replace("suma", "total"), encoding="utf-8")
+
+    summary = analyze_directory(corpus, tmp_path / "third.jsonl", jobs=1, cache_path=cache)
+    assert summary["analyzed"] == 1
+    assert summary["skipped"] == 2
+    assert _read_jsonl(tmp_path / "third.jsonl")["suma.psc"]["ast"]["functions"][0]["name"] == "total"
+
+
+def test_skip_cache_keeps_only_metadata(corpus, tmp_path):
+    """Test: la caché no guarda registros; se reutiliza la salida anterior aunque sea la misma ruta"""
+    cache = tmp_path / "cache.json"
+    output = tmp_path / "out.jsonl"
+    analyze_directory(corpus, output, jobs=1, cache_path=cache)
+    first = _read_jsonl(output)
+
+    entries = json.loads(cache.read_text(encoding="utf-8"))["entries"]
+    assert all(set(entry) == {"mtime_ns", "size", "sha256", "offset"} for entry in entries.values())
+
+    summary = analyze_directory(corpus, output, jobs=1, cache_path=cache)
+    assert summary["skipped"] == 3
+    assert _read_jsonl(output) == first
+
+    # Sin la salida anterior no hay de dónde copiar: se analiza todo
+    output.unlink()
+    summary = analyze_directory(corpus, output, jobs=1, cache_path=cache)
+    assert summary["analyzed"] == 3
+    assert _read_jsonl(output) == first
+
+
+def test_binary_output(corpus, tmp_path):
+    """Test: el formato pickle conserva los mismos registros"""
+    output = tmp_path / "out.bin"
+    analyze_directory(corpus, output, fmt="pickle", jobs=1)
+
+    records = list(read_records(output))
+    assert sorted(os.path.basename(r["path"]) for r in records) == ["factorial.py", "suma.psc", "swap.py"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,63 @@
+"""
+Tests para el ejecutor acotado de parsing.
+"""
+import asyncio
+import threading
+import pytest
+from app.services.parse_executor import BoundedExecutor, QueueFullError
+from app.services.ast_service import build_ast
+
+
+def test_run_returns_value_and_timings():
+    """Test: el resultado llega con tiempos de cola y de proceso"""
+    executor = BoundedExecutor(max_workers=1, queue_depth=1)
+    code = """
+def f(n):
+    return n
+"""
+    result = asyncio.run(executor.run(build_ast, code, "python"))
+
+    assert result.value["functions"][0]["name"] == "f"
+    timings = result.timings()
+    assert timings["queue_wait_ms"] >= 0
+    assert timings["processing_ms"] >= 0
+    assert executor.pending == 0
+    executor.shutdown()
+
+
+def test_queue_full_fails_fast():
+    """Test: con la cola llena se lanza QueueFullError sin esperar"""
+    executor = BoundedExecutor(max_workers=1, queue_depth=1, retry_after=3)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(QueueFullError) as exc_info:
+            await executor.run(release.wait)
+        assert exc_info.value.retry_after == 3
+        assert executor.queued == 1
+
+        release.set()
+        await asyncio.gather(running, queued)
+
+    asyncio.run(scenario())
+    assert executor.pending == 0
+    executor.shutdown()
+
+
+def test_exceptions_propagate_and_release_slot():
+    """Test: los errores del trabajo se propagan y liberan el cupo"""
+    executor = BoundedExecutor(max_workers=1, queue_depth=0)
+
+    with pytest.raises(SyntaxError):
+        asyncio.run(executor.run(build_ast, "def f(\n", "python"))
+
+    assert executor.pending == 0
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
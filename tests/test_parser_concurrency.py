@@ -0,0 +1,102 @@
+"""
+Test de estrés: parsers compartidos entre hilos.
+
+Con el GIL los hilos no parsean en paralelo; lo que se comprueba es que el
+Lark compartido y los builders del pool no mezclan estado entre peticiones ni
+serializan los hilos más allá del propio GIL. Las comprobaciones son
+estructurales (instancias, contadores, resultados), no de tiempo.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.core import psc_parser
+from app.core.psc_parser import PseudocodeParser, shared_lark
+from app.services.ast_service import Frontend
+
+THREADS = 4
+PROGRAMS = 40
+
+
+def _pseudocode(i):
+    return (
+        f"p{i}(A, n)\nbegin\n    x 🡨 {i}\n    for j 🡨 1 to n do\n    begin\n"
+        f"        if (A[j] > {i}) then\n        begin\n            x 🡨 x + A[j] * {i}\n        end\n"
+        f"    end\n    return x\nend"
+    )
+
+
+def _python(i):
+    return f"def f{i}(A, n):\n    x = {i}\n    for j in range(n):\n        while x > {i}:\n            x = x - 1\n    return x"
+
+
+SOURCES = [("pseudocode", _pseudocode(i)) for i in range(PROGRAMS)] + [("python", _python(i)) for i in range(PROGRAMS)]
+
+
+@pytest.fixture
+def frontends():
+    return {
+        "pseudocode": Frontend("pseudocode", "app.core.psc_parser:PseudocodeParser", pool_size=THREADS),
+        "python": Frontend("python", "app.core.py_ast_builder:PythonToIR", pool_size=THREADS)
+    }
+
+
+def test_parsers_share_one_grammar(monkeypatch):
+    """Test: la gramática se compila una sola vez aunque muchos hilos creen parsers"""
+    compiled = []
+    real_lark = psc_parser.Lark
+
+    def counting_lark(*args, **kwargs):
+        compiled.append(1)
+        return real_lark(*args, **kwargs)
+
+    monkeypatch.setattr(psc_parser, "Lark", counting_lark)
+    monkeypatch.setattr(psc_parser, "_shared_lark", None)
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        parsers = list(pool.map(lambda _: PseudocodeParser(), range(20)))
+
+    assert len(compiled) == 1
+    assert all(parser.parser is shared_lark() for parser in parsers)
+
+
+def test_concurrent_parses_match_sequential_results(frontends):
+    """Test: los resultados concurrentes coinciden uno a uno con los secuenciales"""
+    expected = [frontends[lang].build(source).to_dict() for lang, source in SOURCES]
+
+    def parse(index):
+        lang, source = SOURCES[index]
+        return index, frontends[lang].build(source).to_dict()
+
+    # Cada hilo recorre todos los programas desde un desfase distinto
+    jobs = [(offset + k) % len(SOURCES) for offset in range(THREADS) for k in range(len(SOURCES))]
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        results = list(pool.map(parse, jobs))
+
+    for index, program in results:
+        assert program == expected[index]
+    for frontend in frontends.values():
+        assert frontend.created <= THREADS
+
+
+def test_threads_do_not_serialize_beyond_the_gil(frontends):
+    """Test: N hilos tienen a la vez N builders distintos y parsean sin un bloqueo global"""
+    frontend = frontends["pseudocode"]
+    frontend.warm()
+    # Si un bloqueo global serializara los builds, la barrera no se completaría
+    barrier = threading.Barrier(THREADS, timeout=10)
+
+    def parse(i):
+        with frontend.builder() as builder:
+            barrier.wait()
+            return id(builder), builder.build(_pseudocode(i)).to_dict()
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        results = list(pool.map(parse, range(THREADS)))
+
+    assert len({builder for builder, _ in results}) == THREADS
+    assert frontend.created == THREADS
+    assert [program for _, program in results] == [frontend.build(_pseudocode(i)).to_dict() for i in range(THREADS)]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,81 @@
+"""
+Tests para el pipeline de /analyze con un LLM falso.
+"""
+import asyncio
+import pytest
+from app.models.schemas import InputType
+from app.services.gemini_service import Generation, LLMTimeoutError
+from app.services.pipeline_service import Pipeline
+
+PSEUDOCODE = "suma(A, n)\nbegin\n    s 🡨 0\n    for i 🡨 1 to n do\n    begin\n        s 🡨 s + A[i]\n    end\n    return s\nend"
+PYTHON = "def suma(A, n):\n    s = 0\n    for i in range(n):\n        s = s + A[i]\n    return s"
+
+
+class _FakeLLM:
+    """Ambas generaciones tardan `delay` y registran cuántas corren a la vez"""
+
+    def __init__(self, delay=0.1, fail_python=False):
+        self.delay = delay
+        self.fail_python = fail_python
+        self.active = 0
+        self.max_active = 0
+        self.calls = 0
+
+    async def _work(self):
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+
+    async def normalize_validated(self, text):
+        await self._work()
+        return Generation(text=PSEUDOCODE, model="fast", error=None, repairs=0)
+
+    async def generate_python_validated(self, text):
+        await self._work()
+        if self.fail_python:
+            raise LLMTimeoutError("Gemini did not respond within 0.1s")
+        return Generation(text=PYTHON, model="fast", error=None, repairs=0)
+
+
+def test_llm_stages_run_concurrently():
+    """Test: las dos llamadas al LLM se solapan y cada artefacto se analiza"""
+    llm = _FakeLLM(delay=0.2)
+    result = asyncio.run(Pipeline("Suma los elementos de un arreglo", llm=llm).run())
+
+    assert llm.max_active == 2
+    stages = result["stages"]
+    assert [name for name in stages] == ["pseudocode", "python", "pseudocode_analysis", "python_analysis"]
+    assert all(stage["status"] == "ok" for stage in stages.values())
+    assert stages["python_analysis"]["complexity"][0]["name"] == "suma"
+
+
+def test_pseudocode_input_uses_no_llm():
+    """Test: pseudocódigo válido se analiza y se traduce sin el LLM"""
+    llm = _FakeLLM()
+    result = asyncio.run(Pipeline(PSEUDOCODE, llm=llm).run())
+
+    assert llm.calls == 0
+    assert result["input_type_detected"] == InputType.PSEUDOCODE.value
+    assert result["stages"]["pseudocode"]["source"] == "input"
+    assert result["stages"]["python"]["source"] == "transpiler"
+    assert result["stages"]["python_analysis"]["status"] == "ok"
+
+
+def test_failed_stage_does_not_hide_the_others():
+    """Test: si falla la generación de Python, el resto del resultado llega igual"""
+    llm = _FakeLLM(delay=0.01, fail_python=True)
+    result = asyncio.run(Pipeline("Suma los elementos de un arreglo", llm=llm).run())
+
+    stages = result["stages"]
+    assert stages["python"]["status"] == "error"
+    assert stages["python"]["error"].startswith("llm_timeout")
+    assert "python_analysis" not in stages
+    assert stages["pseudocode_analysis"]["status"] == "ok"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
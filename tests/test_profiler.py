@@ -0,0 +1,115 @@
+"""
+Tests para el perfilado por petición (?profile=1).
+"""
+import asyncio
+import threading
+import pytest
+from fastapi import HTTPException
+from app.config.settings import settings
+from app.controllers.analyzer_controller import (
+    ASTRequest, MemoryProfileRequest, build_ast_endpoint, complexity_endpoint, memory_profile_endpoint
+)
+from app.services.ast_service import build_ast
+from app.services.profiler import RequestProfile, memory_profile
+
+SOURCE = "def perfil_demo(arr, n):\n    total = 0\n    for i in range(n):\n        total = total + arr[i]\n    return total"
+
+
+def test_profile_records_stages_and_top_functions_of_the_job():
+    """Test: el informe trae las etapas del trabajo y las funciones más costosas"""
+    profile = RequestProfile(top_n=5)
+
+    profile.wrap(build_ast)(SOURCE, "python", True)
+    report = profile.report()
+
+    assert [stage["stage"] for stage in report["stages"]] == ["parse", "ir_transform", "to_dict"]
+    assert all(stage["job"] == "build_ast" for stage in report["stages"])
+    assert len(report["cprofile"]) == 5
+    assert report["cprofile"][0]["cumtime_ms"] >= report["cprofile"][-1]["cumtime_ms"]
+    assert any("build_ast" in row["function"] for row in report["cprofile"])
+
+
+def test_stages_of_other_threads_are_not_recorded():
+    """Test: sólo se anotan las etapas del hilo perfilado"""
+    profile = RequestProfile()
+    started = threading.Event()
+    release = threading.Event()
+
+    def other():
+        started.set()
+        release.wait()
+        build_ast(SOURCE + "\n", "python", True)
+
+    def job():
+        release.set()
+        thread.join()
+        return build_ast(SOURCE, "python", True)
+
+    thread = threading.Thread(target=other)
+    thread.start()
+    started.wait()
+    profile.wrap(job)()
+
+    assert [stage["stage"] for stage in profile.report()["stages"]] == ["parse", "ir_transform", "to_dict"]
+
+
+def test_endpoint_requires_setting(monkeypatch):
+    """Test: ?profile=1 sin PROFILING_ENABLED responde 403"""
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", False)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(build_ast_endpoint(ASTRequest(content=SOURCE), profile=True))
+
+    assert exc.value.status_code == 403
+
+
+def test_endpoint_profiles_even_cached_sources(monkeypatch):
+    """Test: con el perfil se vuelve a parsear aunque el código esté en caché"""
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    request = ASTRequest(content=SOURCE)
+    asyncio.run(complexity_endpoint(request, profile=False))
+
+    plain = asyncio.run(complexity_endpoint(request, profile=False))
+    profiled = asyncio.run(complexity_endpoint(request, profile=True))
+
+    assert "profile" not in plain
+    assert profiled["analysis"] == plain["analysis"]
+    assert [stage["stage"] for stage in profiled["profile"]["stages"]] == ["parse", "ir_transform", "complexity"]
+    assert profiled["profile"]["cprofile"]
+
+
+def test_memory_profile_attributes_allocations_per_stage():
+    """Test: cada etapa trae sus bytes y sitios de asignación, y se cuentan los nodos"""
+    pseudocode = "\n".join(
+        f"f{i}(n)\nbegin\n    x 🡨 0\n    for j 🡨 1 to n do\n    begin\n        x 🡨 x + j\n    end\n    return x\nend"
+        for i in range(20)
+    )
+
+    report = memory_profile(pseudocode, "pseudocode", analysis=True, top_n=3)
+
+    assert [stage["stage"] for stage in report["stages"]] == ["parse", "ir_transform", "to_dict", "complexity"]
+    assert report["nodes"]["parse_tree"] > report["nodes"]["ir"] > 20
+    assert report["nodes"]["dicts"] > 20
+    to_dict = report["stages"][2]
+    assert to_dict["allocated_bytes"] > 0
+    assert to_dict["top"][0]["file"] == "app/models/ast_nodes.py"
+    assert report["peak_bytes"] >= max(stage["peak_bytes"] for stage in report["stages"])
+
+
+def test_memory_profile_endpoint(monkeypatch):
+    """Test: el endpoint exige PROFILING_ENABLED y devuelve el perfil"""
+    request = MemoryProfileRequest(content=SOURCE)
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", False)
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(memory_profile_endpoint(request))
+    assert exc.value.status_code == 403
+
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    result = asyncio.run(memory_profile_endpoint(request))
+
+    assert result["memory"]["lang"] == "python"
+    assert result["memory"]["nodes"]["ir"] > 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
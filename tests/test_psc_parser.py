@@ -293,5 +293,30 @@ def test_invalid_pseudocode():
     assert "Error parsing pseudocode" in str(exc_info.value)
 
 
+def test_calls_and_boolean_operators_keep_operands():
+    """Test: CALL, llamadas en expresiones, and y not conservan sus operandos"""
+    code = """
+    f(n)
+    begin
+        if (n > 0 and not (n = 5)) then
+        begin
+            CALL g(n, 1)
+        end
+        return h(n - 1) + len([1, 2])
+    end
+    """
+    
+    parser = PseudocodeParser()
+    func = parser.build(code).functions[0]
+    if_stmt, ret = func.body.statements
+    
+    assert isinstance(if_stmt.cond, BinOp) and if_stmt.cond.op == "and"
+    assert isinstance(if_stmt.cond.right.operand, Compare)
+    call = if_stmt.then_block.statements[0].expr
+    assert isinstance(call, Call) and call.name == "g" and len(call.args) == 2
+    assert ret.value.left.name == "h" and len(ret.value.left.args) == 1
+    assert len(ret.value.right.args[0].args) == 2
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,137 @@
+"""
+Tests para el generador de Python desde el IR de pseudocódigo.
+"""
+import pytest
+from app.core.psc_parser import PseudocodeParser
+from app.core.visitors.python_codegen import PythonCodegen
+from app.services.ast_service import transpile_pseudocode, validate_source
+from app.services.template_service import TemplateLibrary
+
+
+@pytest.fixture(scope="module")
+def parser():
+    return PseudocodeParser()
+
+
+def _compile(parser, source):
+    namespace = {}
+    code = PythonCodegen.emit(parser.build(source))
+    exec(code, namespace)
+    return code, namespace
+
+
+def test_for_is_inclusive_and_arrays_are_one_based(parser):
+    """Test: for 1 to n recorre n elementos y A[i] se traduce a A[i - 1]"""
+    code, ns = _compile(parser, """
+suma(A, n)
+begin
+    s 🡨 0
+    for i 🡨 1 to n do
+    begin
+        s 🡨 s + A[i]
+    end
+    return s
+end
+""")
+    assert "for i in range(1, n + 1):" in code
+    assert "A[i - 1]" in code
+    assert ns["suma"]([1, 2, 3], 3) == 6
+
+
+def test_index_constants_are_folded(parser):
+    """Test: A[j + 1] → A[j] y el fin n - 1 → range(1, n)"""
+    code, ns = _compile(parser, """
+burbuja(A, n)
+begin
+    for i 🡨 1 to n - 1 do
+    begin
+        for j 🡨 1 to n - i do
+        begin
+            if (A[j] > A[j + 1]) then
+            begin
+                t 🡨 A[j]
+                A[j] 🡨 A[j + 1]
+                A[j + 1] 🡨 t
+            end
+        end
+    end
+    return A
+end
+""")
+    assert "range(1, n)" in code
+    assert "A[j] = A[j]" not in code
+    assert ns["burbuja"]([3, 1, 2], 3) == [1, 2, 3]
+
+
+def test_div_mod_floor_and_ceiling_without_imports(parser):
+    """Test: div/mod y techo/piso se traducen a aritmética entera"""
+    code, ns = _compile(parser, """
+f(a, b)
+begin
+    return [a div b, a mod b, └a / b┘, ┌a / b┐, └a┘, ┌a┐]
+end
+""")
+    assert "import" not in code
+    assert ns["f"](7, 2) == [3, 1, 3, 4, 7, 7]
+    assert ns["f"](-7, 2) == [-4, 1, -4, -3, -7, -7]
+    assert ns["f"](7.5, 2) == [3.0, 1.5, 3.0, 4.0, 7, 8]
+
+
+def test_precedence_and_boolean_operators(parser):
+    """Test: los paréntesis necesarios se conservan y los operadores se mapean"""
+    code, ns = _compile(parser, """
+g(x, y)
+begin
+    if (not (x = y) and x ≠ 3 or y ≤ 2) then
+    begin
+        return x - (y - 1)
+    end
+    return 0
+end
+""")
+    assert "x - (y - 1)" in code
+    assert ns["g"](5, 4) == 2
+    assert ns["g"](3, 3) == 0
+
+
+def test_repeat_until_runs_the_body_at_least_once(parser):
+    """Test: repeat-until evalúa la condición tras el cuerpo, aunque sea cierta al entrar"""
+    code, ns = _compile(parser, """
+contar(n)
+begin
+    k 🡨 0
+    repeat
+    begin
+        k 🡨 k + 1
+    end
+    until (k ≥ n)
+    return k
+end
+""")
+    assert "while True:" in code
+    assert ns["contar"](3) == 3
+    assert ns["contar"](0) == 1
+
+
+def test_length_builtin_maps_to_len(parser):
+    """Test: length(A) y A.length se traducen a len(A)"""
+    code, ns = _compile(parser, """
+ultimo(A)
+begin
+    return A[length(A)] + A[A.length]
+end
+""")
+    assert "length" not in code
+    assert ns["ultimo"]([1, 2, 5]) == 10
+
+
+def test_templates_transpile_to_code_accepted_by_python_frontend(parser):
+    """Test: el Python generado de cada plantilla pasa PythonToIR y es estable"""
+    for template in TemplateLibrary().list():
+        code = transpile_pseudocode(template.pseudocode)
+        assert validate_source(code, "python") is None, template.id
+        assert transpile_pseudocode(template.pseudocode) == code
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
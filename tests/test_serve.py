@@ -0,0 +1,79 @@
+"""
+Tests del servidor prefork (serve.py) en un subproceso real.
+"""
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="serve.py necesita fork")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _health(port: int):
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/v1/health", timeout=2) as response:
+        return json.load(response)
+
+
+@pytest.fixture
+def server(tmp_path):
+    port = _free_port()
+    env = dict(os.environ, GEMINI_API_KEY="", DATA_DIR=str(tmp_path))
+    process = subprocess.Popen(
+        [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", "2", "--graceful-timeout", "2"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            _health(port)
+            break
+        except OSError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                pytest.fail("serve.py no arrancó")
+            time.sleep(0.2)
+    yield process, port
+    if process.poll() is None:
+        process.kill()
+        process.wait()
+
+
+def test_workers_share_preloaded_state_and_stop_gracefully(server):
+    """Test: varios workers responden con los parsers ya calientes y SIGTERM los detiene"""
+    process, port = server
+    pids = set()
+    for _ in range(200):
+        health = _health(port)
+        pids.add(health["worker_pid"])
+        if len(pids) == 2:
+            break
+
+    assert len(pids) == 2
+    # Heredado del maestro: ningún worker construye parsers propios
+    assert health["frontends"]["pseudocode"]["state"] == "warm"
+    assert health["caches"]["parse"]["size"] > 0
+
+    process.send_signal(signal.SIGTERM)
+    assert process.wait(timeout=15) == 0
+    for pid in pids:
+        with pytest.raises(ProcessLookupError):
+            os.kill(pid, 0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
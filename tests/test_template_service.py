@@ -0,0 +1,135 @@
+"""
+Tests para la biblioteca local de plantillas de algoritmos.
+"""
+import asyncio
+import time
+import pytest
+from app.models.schemas import AlgorithmTemplate
+from app.services.ast_service import validate_source
+from app.services.gemini_service import GeminiService
+from app.services.llm_cache import LLMCache
+from app.services.template_service import TemplateLibrary, tokenize
+
+
+@pytest.fixture
+def library(tmp_path):
+    return TemplateLibrary(store_path=tmp_path / "templates.json")
+
+
+def test_builtin_templates_pass_both_parsers(library):
+    """Test: todas las plantillas incluidas parsean en ambos frontends"""
+    for template in library.list():
+        assert validate_source(template.pseudocode, "pseudocode") is None, template.id
+        assert validate_source(template.python, "python") is None, template.id
+
+
+def test_tokenize_normalizes_accents_and_stems():
+    """Test: tildes, mayúsculas y variantes de una palabra coinciden"""
+    assert tokenize("Búsqueda BINARIA") == tokenize("busqueda binaria")
+    assert tokenize("ordenar")[0] == tokenize("ordenamiento")[0]
+
+
+@pytest.mark.parametrize("description, expected", [
+    ("Crea una función que ordene una lista de números usando el algoritmo de burbuja", "burbuja"),
+    ("Crea un algoritmo que calcule el factorial de un número", "factorial"),
+    ("bubble sort", "burbuja"),
+    ("calcular el n-ésimo término de fibonacci", "fibonacci"),
+    ("máximo común divisor", "mcd"),
+])
+def test_common_phrasings_match(library, description, expected):
+    found = library.match(description)
+    assert found is not None
+    assert found[0].id == expected
+
+
+@pytest.mark.parametrize("description", [
+    "algoritmo de dijkstra para caminos mínimos en un grafo",
+    "multiplicar dos matrices",
+    "ordenar con quicksort",
+    "torres de hanoi",
+    "binary search tree insertion",
+    "búsqueda binaria en un árbol",
+    "merge sort",
+    "quick sort",
+    "heap sort",
+])
+def test_unrelated_descriptions_do_not_match(library, description):
+    assert library.match(description) is None
+
+
+@pytest.mark.parametrize("description", [
+    "sort descending bubble",
+    "busqueda binaria recursiva",
+    "búsqueda binaria recursiva",
+])
+def test_uncovered_qualifier_is_rejected(library, description):
+    """Test: una palabra distintiva ausente de la plantilla (orden, variante) descarta el resultado"""
+    assert library.match(description) is None
+
+
+@pytest.mark.parametrize("description", ["binary search tree insertion", "merge sort", "quick sort"])
+def test_partial_overlap_is_rejected_even_with_a_lower_score(library, description):
+    """Test: bajar el umbral de similitud no basta si la petición no está cubierta"""
+    assert library.match(description, min_score=0.3) is None
+
+
+def test_match_is_sub_millisecond(library):
+    """Test: una búsqueda en el índice tarda mucho menos de 1 ms"""
+    started = time.perf_counter()
+    for _ in range(1000):
+        library.match("Crea una función que ordene una lista usando burbuja")
+    assert (time.perf_counter() - started) / 1000 < 0.001
+
+
+def test_add_template_at_runtime_persists(library, tmp_path):
+    """Test: una plantilla añadida se indexa y sobrevive a un reinicio"""
+    template = AlgorithmTemplate(
+        id="minimo",
+        title="Mínimo de un arreglo",
+        descriptions=["encontrar el elemento menor de un arreglo"],
+        pseudocode="minimo(A, n)\nbegin\n    menor 🡨 A[1]\n    for i 🡨 2 to n do\n    begin\n        if (A[i] < menor) then\n        begin\n            menor 🡨 A[i]\n        end\n    end\n    return menor\nend",
+        python="def minimo(A, n):\n    menor = A[0]\n    for i in range(1, n):\n        if A[i] < menor:\n            menor = A[i]\n    return menor"
+    )
+    library.add(template)
+    assert library.match("elemento menor de un arreglo")[0].id == "minimo"
+
+    reloaded = TemplateLibrary(store_path=tmp_path / "templates.json")
+    assert reloaded.match("elemento menor de un arreglo")[0].id == "minimo"
+
+    with pytest.raises(ValueError):
+        library.add(template)
+
+
+def test_add_rejects_code_that_does_not_parse(library):
+    template = AlgorithmTemplate(
+        id="roto",
+        title="Roto",
+        descriptions=["algo roto"],
+        pseudocode="roto(n)\nbegin\n    x = 1\nend",
+        python="def roto(n):\n    return n"
+    )
+    with pytest.raises(ValueError):
+        library.add(template)
+
+
+def test_service_answers_from_template_without_model(library, tmp_path):
+    """Test: una descripción reconocida no llega a Gemini"""
+    class _UnusedModel:
+        async def generate_content_async(self, prompt):
+            raise AssertionError("no se debía llamar al modelo")
+
+    service = GeminiService()
+    service.templates = library
+    service.cache = LLMCache(path=tmp_path / "llm.sqlite3", ttl_seconds=3600, max_entries=100)
+    service._get_model = lambda name: _UnusedModel()
+
+    result = asyncio.run(service.normalize_validated("factorial de un número"))
+    code = asyncio.run(service.generate_python_code("factorial de un número"))
+
+    assert result.model == "template:factorial"
+    assert result.error is None
+    assert code.startswith("def factorial(n):")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])